@@ -0,0 +1,273 @@
+"""
+stdio 부하 벤치마크 (툴별 calls/s, p50/p95/p99, 서버 RSS)
+
+  # 로컬 가짜 Storm API를 함께 띄워서 측정
+  python scripts/bench_load.py --fake --latency-ms 30 --calls 500 --concurrency 16
+
+  # 이미 떠 있는 API를 대상으로 측정 (STORM_API_BASE_URL)
+  python scripts/bench_load.py --base-url http://127.0.0.1:8765 \\
+      --tool list_agents --tool 'list_buckets={"agent_id": "agent-1"}'
+
+툴 인자의 문자열 안 `{i}`는 호출 번호로 치환된다 (예: 매번 다른 질문).
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_TOOLS = {
+    "list_agents": {},
+    "list_buckets": {"agent_id": "agent-1"},
+    "send_nonstream_chat": {"question": "benchmark question {i}"},
+    "upload_document_by_file": {
+        "bucket_id": "bucket-1",
+        "file_base64": base64.b64encode(b"x" * 64 * 1024).decode(),
+        "file_name": "bench-{i}.txt",
+    },
+}
+
+
+class StdioClient:
+    """MCP 서버 프로세스와 줄 단위 JSON-RPC로 통신 (요청 id별 응답 대기)"""
+
+    def __init__(self, env: Dict[str, str]):
+        self.env = env
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "storm_mcp_server.main",
+            cwd=ROOT,
+            env=self.env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=64 * 1024 * 1024,
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+        await self.request(
+            "initialize",
+            {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "bench-load", "version": "0"},
+            },
+        )
+        await self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def _write(self, message: dict) -> None:
+        self.proc.stdin.write((json.dumps(message) + "\n").encode())
+        await self.proc.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self._pending.values():
+            future.set_exception(RuntimeError("server exited"))
+
+    async def request(self, method: str, params: dict) -> dict:
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._write(
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        )
+        return await future
+
+    def rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.proc.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        try:
+            out = subprocess.run(
+                ["ps", "-o", "rss=", "-p", str(self.proc.pid)],
+                capture_output=True,
+                text=True,
+            )
+            return round(int(out.stdout.strip()) / 1024, 1)
+        except (OSError, ValueError):
+            return None
+
+    async def close(self) -> None:
+        self.proc.stdin.close()
+        try:
+            await asyncio.wait_for(self.proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.proc.kill()
+        self._reader.cancel()
+
+
+def _render(value: Any, i: int) -> Any:
+    if isinstance(value, str):
+        return value.replace("{i}", str(i))
+    if isinstance(value, dict):
+        return {k: _render(v, i) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, i) for v in value]
+    return value
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+async def run_tool(
+    client: StdioClient, name: str, arguments: dict, calls: int, concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(calls))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.request(
+                "tools/call", {"name": name, "arguments": _render(arguments, i)}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            if "error" in response or response.get("result", {}).get("isError"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "calls_per_sec": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "p50_ms": round(_percentile(ordered, 0.50), 2),
+        "p95_ms": round(_percentile(ordered, 0.95), 2),
+        "p99_ms": round(_percentile(ordered, 0.99), 2),
+        "rss_mb": client.rss_mb(),
+    }
+
+
+def _parse_tools(specs: List[str]) -> Dict[str, dict]:
+    if not specs:
+        return dict(DEFAULT_TOOLS)
+    tools = {}
+    for spec in specs:
+        name, _, raw = spec.partition("=")
+        tools[name] = json.loads(raw) if raw else DEFAULT_TOOLS.get(name, {})
+    return tools
+
+
+def _wait_port(host: str, port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"fake Storm API did not start on {host}:{port}")
+
+
+async def main_async(args) -> int:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    env.setdefault("STORM_API_KEY", "bench")
+    env["STORM_API_BASE_URL"] = args.base_url
+    if args.no_cache:
+        env["STORM_METADATA_CACHE_TTL"] = "0"
+        env["STORM_ANSWER_CACHE_TTL"] = "0"
+
+    client = StdioClient(env)
+    await client.start()
+    report = {"base_url": args.base_url, "rss_mb_start": client.rss_mb(), "tools": {}}
+    try:
+        for name, arguments in _parse_tools(args.tool).items():
+            if args.warmup:
+                await run_tool(client, name, arguments, args.warmup, 1)
+            report["tools"][name] = await run_tool(
+                client, name, arguments, args.calls, args.concurrency
+            )
+    finally:
+        await client.close()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="MCP stdio load benchmark")
+    parser.add_argument("--tool", action="append", help="NAME or NAME=JSON_ARGS")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--fake", action="store_true", help="start scripts/fake_storm_api.py"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--answer-bytes", type=int, default=2048)
+    args = parser.parse_args()
+
+    fake = None
+    if args.fake:
+        port = int(args.base_url.rsplit(":", 1)[-1].split("/")[0])
+        fake = subprocess.Popen(
+            [
+                sys.executable,
+                str(ROOT / "scripts" / "fake_storm_api.py"),
+                "--port",
+                str(port),
+                "--latency-ms",
+                str(args.latency_ms),
+                "--error-rate",
+                str(args.error_rate),
+                "--answer-bytes",
+                str(args.answer_bytes),
+            ],
+            cwd=ROOT,
+        )
+        _wait_port("127.0.0.1", port)
+    try:
+        return asyncio.run(main_async(args))
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait(timeout=5)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+콜드 스타트 벤치마크 (stdio)
+
+  python scripts/bench_startup.py [--runs 5] [--budget-import-ms 1000] ...
+
+매 회 새 프로세스로 측정:
+  - import      : `import storm_mcp_server.main` 소요 시간
+  - initialize  : 프로세스 시작 → initialize 응답 수신
+  - tools_list  : 프로세스 시작 → 첫 tools/list 응답 수신
+중앙값이 예산(ms)을 넘으면 종료 코드 1 (CI 회귀 검사용).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import storm_mcp_server.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    env.setdefault("STORM_API_KEY", "bench")
+    return env
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _send(proc: subprocess.Popen, message: dict) -> None:
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _wait_response(proc: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("server exited before responding")
+        try:
+            message = json.loads(line)
+        except ValueError:
+            # main.py의 시작 로그 등 JSON이 아닌 줄은 무시
+            continue
+        if message.get("id") == request_id:
+            return message
+
+
+def measure_session() -> dict:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "storm_mcp_server.main"],
+        cwd=ROOT,
+        env=_env(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        _send(
+            proc,
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": "2024-11-05",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench", "version": "0"},
+                },
+            },
+        )
+        _wait_response(proc, 1)
+        initialized = time.perf_counter()
+
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _wait_response(proc, 2)
+        listed = time.perf_counter()
+        if "error" in tools:
+            raise RuntimeError(f"tools/list failed: {tools['error']}")
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {
+        "initialize": (initialized - started) * 1000,
+        "tools_list": (listed - started) * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-import-ms", type=float, default=1000)
+    parser.add_argument("--budget-initialize-ms", type=float, default=1200)
+    parser.add_argument("--budget-tools-list-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    samples = {"import": [], "initialize": [], "tools_list": []}
+    for _ in range(args.runs):
+        samples["import"].append(measure_import())
+        for key, value in measure_session().items():
+            samples[key].append(value)
+
+    budgets = {
+        "import": args.budget_import_ms,
+        "initialize": args.budget_initialize_ms,
+        "tools_list": args.budget_tools_list_ms,
+    }
+    report = {}
+    failed = False
+    for key, values in samples.items():
+        median = statistics.median(values)
+        over = median > budgets[key]
+        failed |= over
+        report[key] = {
+            "median_ms": round(median, 1),
+            "min_ms": round(min(values), 1),
+            "max_ms": round(max(values), 1),
+            "budget_ms": budgets[key],
+            "ok": not over,
+        }
+
+    print(json.dumps({"runs": args.runs, "results": report}, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
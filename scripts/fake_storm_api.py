@@ -0,0 +1,211 @@
+"""
+로컬 Storm API 대역 (부하/지연 벤치마크용)
+
+  pip install -e '.[bench]'
+  python scripts/fake_storm_api.py --port 8765 --latency-ms 50 --error-rate 0.01
+  python scripts/fake_storm_api.py --throttle-rps 20   (초당 20건을 넘으면 429 + Retry-After)
+  STORM_API_BASE_URL=http://127.0.0.1:8765 python -m storm_mcp_server.main
+
+구현 엔드포인트:
+  POST /api/v2/answer               (isStreaming=true면 SSE 조각 스트림)
+  GET  /api/v2/agents               (page/size 페이지네이션)
+  GET  /api/v2/buckets              (agentId, page/size 페이지네이션)
+  POST /api/v2/documents/by-file    (multipart 본문을 스트리밍으로 읽고 크기만 확인)
+  GET  /api/v2/documents/{id}       (업로드 후 processing-ms(±50%) 동안 processing, 이후 completed)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeConfig:
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0
+    answer_bytes: int = 2048
+    stream_chunks: int = 20
+    agents: int = 50
+    buckets: int = 200
+    processing_ms: float = 3000.0
+    throttle_rps: float = 0.0
+
+
+config = FakeConfig()
+app = FastAPI(title="fake-storm-api")
+# documentId -> 처리 완료 시각 (time.monotonic)
+documents = {}
+
+
+# 초 단위 창별 요청 수 (throttle-rps)
+_window = {"second": 0, "count": 0}
+
+
+def _throttled():
+    now = time.time()
+    second = int(now)
+    if _window["second"] != second:
+        _window.update(second=second, count=0)
+    _window["count"] += 1
+    if _window["count"] <= config.throttle_rps:
+        return None
+    return JSONResponse(
+        {"status": "error", "message": "too many requests"},
+        status_code=429,
+        headers={"Retry-After": f"{second + 1 - now:.3f}"},
+    )
+
+
+async def _simulate():
+    """설정한 지연 + 오류율 적용, 오류를 내야 하면 응답을 반환"""
+    if config.throttle_rps:
+        throttled = _throttled()
+        if throttled is not None:
+            return throttled
+    delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+    await asyncio.sleep(max(0.0, delay) / 1000)
+    if config.error_rate and random.random() < config.error_rate:
+        return JSONResponse(
+            {"status": "error", "message": "injected failure"}, status_code=503
+        )
+    return None
+
+
+def _page(items, page: int, size: int):
+    start = (page - 1) * size
+    return {
+        "status": "success",
+        "data": {
+            "page": page,
+            "size": size,
+            "total": len(items),
+            "totalPages": math.ceil(len(items) / size) if size else 0,
+            "data": items[start : start + size],
+        },
+    }
+
+
+def _answer_text() -> str:
+    words = "storm fake answer benchmark payload".split()
+    text = " ".join(random.choice(words) for _ in range(config.answer_bytes // 6 + 1))
+    return text[: config.answer_bytes]
+
+
+@app.post("/api/v2/answer")
+async def answer(request: Request):
+    error = await _simulate()
+    if error is not None:
+        return error
+    body = await request.json()
+    text = _answer_text()
+    sources = [{"documentId": f"doc-{i}", "page": i} for i in range(3)]
+
+    if body.get("isStreaming"):
+        step = max(1, math.ceil(len(text) / config.stream_chunks))
+
+        async def events():
+            for start in range(0, len(text), step):
+                delta = json.dumps({"delta": text[start : start + step]})
+                yield f"data: {delta}\n\n"
+                await asyncio.sleep(config.latency_ms / 1000 / config.stream_chunks)
+            yield f"data: {json.dumps({'answer': text, 'sources': sources})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {
+        "status": "success",
+        "data": {
+            "answer": text,
+            "sources": sources,
+            "threadId": body.get("threadId") or uuid.uuid4().hex,
+        },
+    }
+
+
+@app.get("/api/v2/agents")
+async def agents(page: int = 1, size: int = 20):
+    error = await _simulate()
+    if error is not None:
+        return error
+    items = [{"id": f"agent-{i}", "name": f"Agent {i}"} for i in range(config.agents)]
+    return _page(items, page, size)
+
+
+@app.get("/api/v2/buckets")
+async def buckets(agentId: str, page: int = 1, size: int = 20):
+    error = await _simulate()
+    if error is not None:
+        return error
+    items = [
+        {"id": f"{agentId}-bucket-{i}", "name": f"Bucket {i}", "agentId": agentId}
+        for i in range(config.buckets)
+    ]
+    return _page(items, page, size)
+
+
+@app.post("/api/v2/documents/by-file")
+async def upload(request: Request):
+    # python-multipart 없이 본문을 조각 단위로 읽기만 함 (메모리 사용 일정)
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+    error = await _simulate()
+    if error is not None:
+        return error
+    document_id = uuid.uuid4().hex
+    processing = config.processing_ms * random.uniform(0.5, 1.5) / 1000
+    documents[document_id] = time.monotonic() + processing
+    return {
+        "status": "success",
+        "data": {"documentId": document_id, "receivedBytes": received},
+    }
+
+
+@app.get("/api/v2/documents/{document_id}")
+async def document(document_id: str):
+    error = await _simulate()
+    if error is not None:
+        return error
+    ready_at = documents.get(document_id)
+    if ready_at is None:
+        return JSONResponse(
+            {"status": "error", "message": "document not found"}, status_code=404
+        )
+    status = "completed" if time.monotonic() >= ready_at else "processing"
+    return {"status": "success", "data": {"documentId": document_id, "status": status}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Storm API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--answer-bytes", type=int, default=config.answer_bytes)
+    parser.add_argument("--stream-chunks", type=int, default=config.stream_chunks)
+    parser.add_argument("--agents", type=int, default=config.agents)
+    parser.add_argument("--buckets", type=int, default=config.buckets)
+    parser.add_argument("--processing-ms", type=float, default=config.processing_ms)
+    parser.add_argument("--throttle-rps", type=float, default=config.throttle_rps)
+    args = parser.parse_args()
+
+    for key in vars(FakeConfig):
+        if not key.startswith("_"):
+            setattr(config, key, getattr(args, key))
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import fnmatch
+import json
+import os
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+MANIFEST_NAME = ".storm_upload_manifest.jsonl"
+_WALK_BATCH = 256
+
+
+def _matches(rel_path: str, patterns: List[str]) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(
+        fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+def iter_directory_files(
+    root: Path, include: List[str] = None, exclude: List[str] = None
+) -> Iterator[os.DirEntry]:
+    """scandir 기반 지연 탐색 - 필터를 통과한 파일 DirEntry를 하나씩 반환"""
+    include = include or ["*"]
+    exclude = exclude or []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+                continue
+            if not entry.is_file() or entry.name == MANIFEST_NAME:
+                continue
+            rel_path = Path(entry.path).relative_to(root).as_posix()
+            if _matches(rel_path, include) and not _matches(rel_path, exclude):
+                yield entry
+
+
+async def aiter_directory_files(
+    root: Path, include: List[str] = None, exclude: List[str] = None
+) -> AsyncIterator[os.DirEntry]:
+    """디렉토리 탐색을 워커 스레드에서 배치 단위로 진행"""
+    it = iter_directory_files(root, include, exclude)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(it, _WALK_BATCH)))
+        if not batch:
+            return
+        for entry in batch:
+            yield entry
+
+
+class UploadManifest:
+    """
+    업로드 이력(JSON lines). 경로별로 마지막 기록이 유효하며,
+    같은 크기/mtime(또는 같은 해시)으로 이미 업로드된 파일은 재업로드하지 않는다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 중단 시 잘린 마지막 줄은 무시
+                    continue
+                self.records[record["path"]] = record
+
+    def is_uploaded(self, rel_path: str, size: int, mtime: float) -> bool:
+        record = self.records.get(rel_path)
+        return (
+            record is not None
+            and record.get("status") == "uploaded"
+            and record.get("size") == size
+            and record.get("mtime") == mtime
+        )
+
+    def uploaded_hash(self, rel_path: str) -> Optional[str]:
+        record = self.records.get(rel_path)
+        if record and record.get("status") == "uploaded":
+            return record.get("sha256")
+        return None
+
+    def _append(self, line: str) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def write(self, record: Dict[str, Any]) -> None:
+        async with self._lock:
+            self.records[record["path"]] = record
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            await asyncio.to_thread(self._append, line)
+
+
+def extract_document_id(response_data: Any) -> Optional[str]:
+    """업로드 응답에서 문서 ID 추출 (data 래핑 여부와 무관)"""
+    if not isinstance(response_data, dict):
+        return None
+    for key in ("documentId", "id"):
+        if response_data.get(key):
+            return response_data[key]
+    data = response_data.get("data")
+    if isinstance(data, dict):
+        return extract_document_id(data)
+    if isinstance(data, list) and data:
+        return extract_document_id(data[0])
+    return None
+
+
+class BulkUploadStats:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.scanned = 0
+        self.uploaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.failures: List[Dict[str, str]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "scanned": self.scanned,
+            "uploaded": self.uploaded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "filesPerSecond": round(self.uploaded / elapsed, 3) if elapsed else None,
+            "throughputMBps": round(self.bytes / elapsed / 1e6, 3) if elapsed else None,
+            # 응답이 너무 커지지 않도록 실패 목록은 앞부분만
+            "failures": self.failures[:50],
+        }
@@ -0,0 +1,297 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(api_key: str, endpoint: str, params: Dict[str, Any] = None) -> Tuple:
+    """(api key, endpoint, params) 로 캐시 키 생성 (API 키 원문은 보관하지 않음)"""
+    key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    canonical = json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+    return (key_hash, endpoint, canonical)
+
+
+class TTLCache:
+    """
+    LRU + TTL 인메모리 캐시 (stale-while-revalidate 지원)
+    - ttl 이내: fresh → 그대로 반환
+    - ttl ~ ttl + stale_ttl: stale → 값은 바로 반환하고, 백그라운드에서 갱신
+    - 그 이후: miss → fetch 결과를 기다림
+    fetch 도중 invalidate된 키는 세대(generation)가 바뀌므로 그 결과는 저장하지 않는다.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, stale_ttl: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        # fetch 진행 중인 키 -> 진행 중인 fetch 수 / invalidate된 횟수(세대)
+        self._inflight: Dict[Hashable, int] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None, "miss"
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age <= self.ttl:
+            self._data.move_to_end(key)
+            return value, "fresh"
+        if age <= self.ttl + self.stale_ttl:
+            self._data.move_to_end(key)
+            return value, "stale"
+        del self._data[key]
+        return None, "miss"
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """age: 이미 지난 시간(초) - 다른 계층에서 가져온 값은 남은 TTL만큼만 유지"""
+        self._data[key] = (time.monotonic() - max(0.0, age), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """predicate(key)가 참인 항목 삭제, 삭제한 개수를 반환"""
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        # 이미 보낸 요청의 결과가 무효화 이후에 다시 채워 넣지 않도록 세대를 올림
+        for k in self._inflight:
+            if predicate(k):
+                self._generations[k] = self._generations.get(k, 0) + 1
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """fetch 결과를 저장 (그 사이 invalidate됐으면 반환만 하고 저장하지 않음)"""
+        generation = self._generations.get(key, 0)
+        self._inflight[key] = self._inflight.get(key, 0) + 1
+        try:
+            value = await fetch()
+            if self._generations.get(key, 0) == generation:
+                self.set(key, value)
+            else:
+                self.discarded += 1
+            return value
+        finally:
+            remaining = self._inflight.pop(key) - 1
+            if remaining:
+                self._inflight[key] = remaining
+            else:
+                self._generations.pop(key, None)
+
+    async def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            await self._fetch(key, fetch)
+        except Exception:
+            # 백그라운드 갱신 실패 시 기존 stale 값을 유지
+            logger.warning("Background cache refresh failed", exc_info=True)
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if not self.enabled:
+            return await fetch()
+
+        value, state = self._lookup(key)
+        if state == "fresh":
+            self.hits += 1
+            return value
+        if state == "stale":
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(self._refresh(key, fetch))
+            return value
+
+        self.misses += 1
+        return await self._fetch(key, fetch)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "discarded": self.discarded,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            ),
+        }
+
+
+# ----------------------------------------------------------------------------
+# list_agents / list_buckets 응답 캐시
+#   - STORM_METADATA_CACHE_TTL   : fresh 유지 시간(초), 0이면 비활성 (기본 60)
+#   - STORM_METADATA_CACHE_STALE : 만료 후 stale 값을 돌려주며 갱신할 시간(초) (기본 300)
+#   - STORM_METADATA_CACHE_SIZE  : 최대 항목 수 (기본 256)
+# ----------------------------------------------------------------------------
+metadata_cache = TTLCache(
+    maxsize=int(os.getenv("STORM_METADATA_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("STORM_METADATA_CACHE_TTL", "60")),
+    stale_ttl=float(os.getenv("STORM_METADATA_CACHE_STALE", "300")),
+)
+
+
+def invalidate_endpoint(api_key: str, endpoint: str) -> int:
+    """해당 API 키의 endpoint 캐시 항목을 모두 무효화"""
+    key_hash = make_cache_key(api_key, endpoint)[0]
+    return metadata_cache.invalidate(lambda k: k[0] == key_hash and k[1] == endpoint)
+
+
+# ----------------------------------------------------------------------------
+# send_nonstream_chat 답변 캐시 (opt-in)
+#   - STORM_ANSWER_CACHE_TTL  : 답변 유지 시간(초), 0이면 비활성 (기본 0)
+#   - STORM_ANSWER_CACHE_SIZE : 메모리 계층 최대 항목 수 (기본 512)
+#   - STORM_ANSWER_CACHE_DB   : sqlite 파일 경로, 지정 시 재시작 후에도 유지
+# ----------------------------------------------------------------------------
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Unicode NFC + 공백 정리 + 대소문자 무시"""
+    question = unicodedata.normalize("NFC", question)
+    return _WHITESPACE_RE.sub(" ", question).strip().casefold()
+
+
+def make_answer_key(api_key: str, question: str, bucket_ids: List[str] = None) -> str:
+    canonical = json.dumps(
+        [normalize_question(question), sorted(bucket_ids or [])], ensure_ascii=False
+    )
+    return hashlib.sha256(f"{api_key or ''}\0{canonical}".encode()).hexdigest()
+
+
+class AnswerCache:
+    """메모리(LRU) + 선택적 sqlite 2계층 답변 캐시"""
+
+    def __init__(self, ttl: float = 0.0, maxsize: int = 512, db_path: str = None):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.db_path = db_path
+        self.disk_hits = 0
+        self.purged = 0
+        self._purged_at = 0.0
+        self._db: Optional[sqlite3.Connection] = None
+        # to_thread 워커 간 sqlite 커넥션 공유 보호
+        self._db_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS answers_stored_at ON answers (stored_at)"
+            )
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """(저장 후 지난 시간, 값) - 만료됐으면 지우고 None"""
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT stored_at, value FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            stored_at, value = row
+            age = time.time() - stored_at
+            if age > self.ttl:
+                db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                db.commit()
+                return None
+        return age, json.loads(value)
+
+    def _disk_set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO answers (key, stored_at, value) "
+                "VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(value, ensure_ascii=False)),
+            )
+            # 다시 읽히지 않는 만료 행이 쌓이지 않도록 쓰기 때 주기적으로 정리
+            # (간격은 TTL과 60초 중 짧은 쪽)
+            now = time.time()
+            if now - self._purged_at >= min(self.ttl, 60.0):
+                self._purged_at = now
+                self.purged += db.execute(
+                    "DELETE FROM answers WHERE stored_at < ?", (now - self.ttl,)
+                ).rowcount
+            db.commit()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value, state = self.memory._lookup(key)
+        if state == "fresh":
+            self.memory.hits += 1
+            return value
+        self.memory.misses += 1
+        if self.db_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                age, value = row
+                self.disk_hits += 1
+                # 디스크에 저장된 시각 기준으로 남은 TTL만큼만 메모리에 유지
+                self.memory.set(key, value, age=age)
+                return value
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value)
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "db_path": self.db_path,
+            "disk_hits": self.disk_hits,
+            "purged": self.purged,
+            **self.memory.stats(),
+        }
+
+
+answer_cache = AnswerCache(
+    ttl=float(os.getenv("STORM_ANSWER_CACHE_TTL", "0")),
+    maxsize=int(os.getenv("STORM_ANSWER_CACHE_SIZE", "512")),
+    db_path=os.getenv("STORM_ANSWER_CACHE_DB") or None,
+)
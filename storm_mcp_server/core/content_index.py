@@ -0,0 +1,288 @@
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# UTF-8 바이트 열에서 바로 후보를 찾고 (mmap에 그대로 적용, 파일 전체를 디코딩하지 않음)
+# 비 ASCII가 섞인 후보만 디코딩해서 검색어와 같은 \w+ 규칙으로 다시 나눈다.
+# (— “ ” NBSP 같은 문장 부호가 단어에 붙어 색인되지 않도록)
+_CANDIDATE_RE = re.compile(rb"[0-9A-Za-z_\x80-\xff]+")
+_TOKEN_RE = re.compile(r"\w+")
+# 토큰화 규칙(또는 오프셋 계산)이 바뀌면 올려서 기존 인덱스를 다시 만든다
+_SCHEMA_VERSION = 3
+_MAX_OFFSETS = 16
+_SNIPPET_BEFORE = 80
+_SNIPPET_AFTER = 160
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def default_index_path(base_path: Path) -> Path:
+    """base_path 별 인덱스 파일 경로 (STORM_CONTENT_INDEX_DIR, 기본 ~/.cache)"""
+    cache_dir = Path(
+        os.getenv("STORM_CONTENT_INDEX_DIR")
+        or Path.home() / ".cache" / "storm-mcp-server"
+    )
+    digest = hashlib.sha256(str(base_path).encode()).hexdigest()[:16]
+    return cache_dir / f"content_index_{digest}.sqlite"
+
+
+def _tokenize_query(query: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(query)]
+
+
+def _iter_tokens(data) -> Iterator[Tuple[str, int]]:
+    """bytes/mmap에서 (소문자 토큰, 바이트 오프셋) - _tokenize_query와 같은 규칙"""
+    for m in _CANDIDATE_RE.finditer(data):
+        raw = m.group()
+        if raw.isascii():
+            yield raw.decode().lower(), m.start()
+            continue
+        # surrogateescape: 깨진 바이트도 1바이트 = 1문자로 되돌릴 수 있어 오프셋이 정확함
+        text = raw.decode("utf-8", "surrogateescape")
+        offset, position = m.start(), 0
+        for sub in _TOKEN_RE.finditer(text):
+            # 직전 토큰 끝부터 이번 토큰 시작까지만 인코딩해서 오프셋을 누적 (O(n))
+            offset += len(
+                text[position : sub.start()].encode("utf-8", "surrogateescape")
+            )
+            token = sub.group()
+            yield token.lower(), offset
+            offset += len(token.encode("utf-8"))
+            position = sub.end()
+
+
+def _is_text(head: bytes) -> bool:
+    return b"\0" not in head
+
+
+class ContentIndex:
+    """
+    base_path 하위 텍스트 파일의 역색인 (token → 파일, tf, 바이트 오프셋)
+    - sqlite에 저장하므로 재시작 후에도 유지되고, 바뀐 파일(size/mtime)만 다시 색인
+    - 검색은 BM25 점수 순, 결과마다 첫 매치 주변 스니펫을 mmap으로 읽어서 반환
+    동기 메서드이므로 호출 측에서 워커 스레드 + 락으로 감싸서 사용한다.
+    """
+
+    def __init__(self, root: Path, db_path: Path = None, max_file_bytes: int = None):
+        self.root = root
+        self.db_path = Path(db_path or default_index_path(root))
+        self.max_file_bytes = max_file_bytes or int(
+            os.getenv("STORM_CONTENT_INDEX_MAX_BYTES", str(64 * 1024 * 1024))
+        )
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.updated_at: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            if db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                db.executescript(
+                    f"""
+                    DROP TABLE IF EXISTS postings;
+                    DROP TABLE IF EXISTS files;
+                    PRAGMA user_version = {_SCHEMA_VERSION};
+                    """
+                )
+            db.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    token TEXT NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    offsets TEXT NOT NULL,
+                    PRIMARY KEY (token, file_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+                """
+            )
+            self._db = db
+        return self._db
+
+    # ------------------------------------------------------------------
+    # 색인
+    # ------------------------------------------------------------------
+    def _iter_files(self):
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except OSError:
+                continue
+
+    def _index_file(self, db: sqlite3.Connection, rel_path: str, abs_path: str, st):
+        tokens: Dict[str, List] = {}
+        length = 0
+        # 바이너리/너무 큰 파일도 files에는 기록해서 다음 갱신 때 다시 열지 않음
+        if 0 < st.st_size <= self.max_file_bytes:
+            with open(abs_path, "rb") as f:
+                is_text = _is_text(f.read(4096))
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for token, offset in _iter_tokens(mm) if is_text else ():
+                        length += 1
+                        entry = tokens.get(token)
+                        if entry is None:
+                            tokens[token] = entry = [0, []]
+                        entry[0] += 1
+                        if len(entry[1]) < _MAX_OFFSETS:
+                            entry[1].append(offset)
+
+        self._forget(db, rel_path)
+        cur = db.execute(
+            "INSERT INTO files (path, size, mtime_ns, length) VALUES (?, ?, ?, ?)",
+            (rel_path, st.st_size, st.st_mtime_ns, length),
+        )
+        file_id = cur.lastrowid
+        db.executemany(
+            "INSERT INTO postings (token, file_id, tf, offsets) VALUES (?, ?, ?, ?)",
+            (
+                (token, file_id, tf, json.dumps(offsets))
+                for token, (tf, offsets) in tokens.items()
+            ),
+        )
+
+    def _forget(self, db: sqlite3.Connection, rel_path: str) -> None:
+        row = db.execute("SELECT id FROM files WHERE path = ?", (rel_path,)).fetchone()
+        if row is None:
+            return
+        db.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+        db.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    def update(self) -> Dict[str, int]:
+        """size/mtime이 바뀐 파일만 다시 색인하고, 사라진 파일은 제거"""
+        with self._lock:
+            db = self._connect()
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in db.execute(
+                    "SELECT path, size, mtime_ns FROM files"
+                )
+            }
+            seen = set()
+            indexed = 0
+            for entry in self._iter_files():
+                rel_path = Path(entry.path).relative_to(self.root).as_posix()
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                seen.add(rel_path)
+                if known.get(rel_path) == (st.st_size, st.st_mtime_ns):
+                    continue
+                try:
+                    self._index_file(db, rel_path, entry.path, st)
+                    indexed += 1
+                except (OSError, ValueError):
+                    continue
+            removed = set(known) - seen
+            for rel_path in removed:
+                self._forget(db, rel_path)
+            db.commit()
+            self.updated_at = time.time()
+            return {"indexed": indexed, "removed": len(removed), "files": len(seen)}
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def _snippet(self, rel_path: str, offset: int) -> str:
+        try:
+            with open(self.root / rel_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    start = max(0, offset - _SNIPPET_BEFORE)
+                    raw = mm[start : offset + _SNIPPET_AFTER]
+        except (OSError, ValueError):
+            return ""
+        return " ".join(raw.decode("utf-8", "ignore").split())
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        terms = list(dict.fromkeys(_tokenize_query(query)))
+        if not terms:
+            return []
+        with self._lock:
+            db = self._connect()
+            total_docs, total_length = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM files"
+            ).fetchone()
+            if not total_docs:
+                return []
+            avg_length = total_length / total_docs or 1.0
+
+            scores: Dict[int, float] = {}
+            first_hit: Dict[int, Tuple[float, int]] = {}
+            for term in terms:
+                rows = db.execute(
+                    "SELECT p.file_id, p.tf, p.offsets, f.length "
+                    "FROM postings p JOIN files f ON f.id = p.file_id "
+                    "WHERE p.token = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+                df = len(rows)
+                idf = math.log((total_docs - df + 0.5) / (df + 0.5) + 1)
+                for file_id, tf, offsets, length in rows:
+                    norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avg_length)
+                    scores[file_id] = scores.get(file_id, 0.0) + idf * (
+                        tf * (_BM25_K1 + 1) / (tf + norm)
+                    )
+                    # 스니펫은 가장 희귀한(idf가 큰) 단어의 첫 위치 기준
+                    if idf > first_hit.get(file_id, (-1.0, 0))[0]:
+                        first_hit[file_id] = (idf, json.loads(offsets)[0])
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            if not top:
+                return []
+            paths = dict(
+                db.execute(
+                    f"SELECT id, path FROM files WHERE id IN "
+                    f"({','.join('?' * len(top))})",
+                    [file_id for file_id, _ in top],
+                ).fetchall()
+            )
+
+        return [
+            {
+                "path": paths[file_id],
+                "score": round(score, 4),
+                "snippet": self._snippet(paths[file_id], first_hit[file_id][1]),
+            }
+            for file_id, score in top
+            if file_id in paths
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            db = self._connect()
+            files, tokens = db.execute(
+                "SELECT (SELECT COUNT(*) FROM files), (SELECT COUNT(*) FROM postings)"
+            ).fetchone()
+        return {
+            "db_path": str(self.db_path),
+            "files": files,
+            "postings": tokens,
+            "updated_at": self.updated_at,
+        }
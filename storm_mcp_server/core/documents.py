@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------------
+# 업로드한 문서들의 처리 완료 대기 (wait_for_documents)
+#   - STORM_DOCUMENT_STATUS_ENDPOINT : 문서 상태 조회 경로 (기본 /api/v2/documents/{id})
+#   - STORM_DOCUMENT_POLL_CONCURRENCY: 한 라운드에서 동시에 보낼 조회 수 (기본 8)
+#   - STORM_DOCUMENT_POLL_MIN        : 라운드 사이 최소 대기(초) (기본 1)
+#   - STORM_DOCUMENT_POLL_MAX        : 라운드 사이 최대 대기(초) (기본 30)
+# 라운드마다 아직 처리 중인 문서만 묶어서 조회하고, 끝난 문서는 추적에서 뺀다.
+# 대기 간격은 먼저 끝난 문서들의 처리 시간(제출 → 완료, 중앙값)으로 남은 문서가 끝날
+# 시점을 추정해서 정하고, 추정이 없거나 이미 지났으면 지수적으로 늘린다.
+# 제출 시각은 이 프로세스에서 업로드한 문서면 업로드 응답 시각, 아니면 상태 응답의
+# createdAt 등, 둘 다 없으면 처음 조회한 시각을 쓴다.
+# 조회가 4xx(408/429 제외)로 실패한 문서는 다시 물어도 같으므로 바로 failed로 처리한다.
+# ----------------------------------------------------------------------------
+_READY_STATUSES = {
+    "completed",
+    "complete",
+    "done",
+    "success",
+    "succeeded",
+    "ready",
+    "trained",
+    "indexed",
+}
+_FAILED_STATUSES = {"failed", "failure", "error", "cancelled", "canceled", "rejected"}
+_BACKOFF = 1.5
+# 4xx 중 다시 조회하면 성공할 수 있는 상태 코드
+_RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+_SUBMITTED_KEYS = ("createdAt", "created_at", "uploadedAt", "submittedAt")
+# 업로드 응답 시각을 기억할 최근 문서 수
+_SUBMISSIONS_MAX = 10000
+
+StatusFetcher = Callable[[str], Awaitable[Any]]
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+def document_status(payload: Any) -> Optional[str]:
+    """
+    상태 조회 응답에서 status 문자열 추출 (data 래핑 여부와 무관).
+    봉투의 status("success")보다 안쪽 문서 자체의 status를 우선한다.
+    """
+    status = None
+    while isinstance(payload, dict):
+        for key in ("status", "state", "documentStatus"):
+            if isinstance(payload.get(key), str):
+                status = payload[key].lower()
+                break
+        payload = payload.get("data")
+    return status
+
+
+# 문서 ID -> 업로드 응답을 받은 시각 (time.monotonic)
+_submissions: OrderedDict[str, float] = OrderedDict()
+
+
+def record_submission(document_id: Optional[str]) -> None:
+    """업로드가 끝난 시각을 기록 (wait_for_documents의 처리 시간 추정용)"""
+    if not document_id:
+        return
+    _submissions[document_id] = time.monotonic()
+    _submissions.move_to_end(document_id)
+    while len(_submissions) > _SUBMISSIONS_MAX:
+        _submissions.popitem(last=False)
+
+
+def submitted_at(payload: Any) -> Optional[float]:
+    """상태 응답의 createdAt 등(ISO 8601 또는 epoch 초/밀리초)을 time.monotonic 기준으로"""
+    while isinstance(payload, dict):
+        for key in _SUBMITTED_KEYS:
+            value = payload.get(key)
+            if isinstance(value, bool):
+                continue
+            try:
+                if isinstance(value, (int, float)):
+                    wall = value / 1000 if value > 1e12 else float(value)
+                elif isinstance(value, str):
+                    wall = datetime.fromisoformat(value).timestamp()
+                else:
+                    continue
+            except ValueError:
+                continue
+            # 시계 차이로 미래 시각이 오면 지금으로 취급
+            return time.monotonic() - max(0.0, time.time() - wall)
+        payload = payload.get("data")
+    return None
+
+
+def classify(status: Optional[str]) -> str:
+    if status in _READY_STATUSES:
+        return "ready"
+    if status in _FAILED_STATUSES:
+        return "failed"
+    return "pending"
+
+
+def is_permanent_error(exc: BaseException) -> bool:
+    """다시 조회해도 결과가 같은 오류인지 (404 없는 문서, 401/403 권한 등)"""
+    status_code = getattr(exc, "status_code", None)
+    return (
+        isinstance(status_code, int)
+        and 400 <= status_code < 500
+        and status_code not in _RETRYABLE_CLIENT_ERRORS
+    )
+
+
+def next_interval(
+    previous: float,
+    ages: List[float],
+    durations: List[float],
+    min_interval: float,
+    max_interval: float,
+) -> float:
+    """
+    ages: 남은 문서들이 제출된 뒤 지난 시간, durations: 끝난 문서들의 처리 시간.
+    처리 시간 중앙값으로 보아 가장 먼저 끝날 문서가 끝날 때까지 기다리고,
+    끝난 문서가 없거나 예상 시점이 이미 지난 문서가 있으면 이전 간격 x1.5
+    """
+    if durations and ages:
+        remaining = statistics.median(durations) - max(ages)
+        if remaining > 0:
+            return min(max(remaining, min_interval), max_interval)
+    return min(max(previous * _BACKOFF, min_interval), max_interval)
+
+
+async def wait_for_documents(
+    document_ids: List[str],
+    fetch_status: StatusFetcher,
+    timeout: float,
+    concurrency: int = None,
+    min_interval: float = None,
+    max_interval: float = None,
+    on_progress: ProgressCallback = None,
+) -> Dict[str, Any]:
+    if concurrency is None:
+        concurrency = int(os.getenv("STORM_DOCUMENT_POLL_CONCURRENCY", "8"))
+    if min_interval is None:
+        min_interval = float(os.getenv("STORM_DOCUMENT_POLL_MIN", "1"))
+    if max_interval is None:
+        max_interval = float(os.getenv("STORM_DOCUMENT_POLL_MAX", "30"))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    started = time.monotonic()
+    deadline = started + timeout
+    documents: Dict[str, Dict[str, Any]] = {
+        doc_id: {"documentId": doc_id, "state": "pending", "status": None, "polls": 0}
+        for doc_id in dict.fromkeys(document_ids)
+    }
+    pending = list(documents)
+    # 문서별 제출 시각 (업로드 기록이 없으면 상태 응답을 본 뒤 더 이른 값으로 고침)
+    submitted = {doc_id: _submissions.get(doc_id, started) for doc_id in documents}
+    durations: List[float] = []
+    interval = min_interval
+    rounds = 0
+
+    async def poll(doc_id: str) -> None:
+        record = documents[doc_id]
+        async with semaphore:
+            try:
+                payload = await fetch_status(doc_id)
+            except Exception as e:
+                record["error"] = str(e)
+                if is_permanent_error(e):
+                    record["state"] = "failed"
+                    record["elapsed"] = round(time.monotonic() - started, 3)
+                else:
+                    # 네트워크 오류/5xx/429 등은 다음 라운드에 다시 조회
+                    logger.debug("Status poll failed for %s", doc_id, exc_info=True)
+                return
+            finally:
+                record["polls"] += 1
+        record.pop("error", None)
+        if doc_id not in _submissions:
+            created = submitted_at(payload)
+            if created is not None:
+                submitted[doc_id] = min(submitted[doc_id], created)
+        record["status"] = document_status(payload)
+        record["state"] = classify(record["status"])
+        if record["state"] != "pending":
+            now = time.monotonic()
+            record["elapsed"] = round(now - started, 3)
+            if record["state"] == "ready":
+                durations.append(now - submitted[doc_id])
+            else:
+                record["detail"] = payload
+
+    while pending:
+        rounds += 1
+        await asyncio.gather(*(poll(doc_id) for doc_id in pending))
+        pending = [d for d in pending if documents[d]["state"] == "pending"]
+        if on_progress is not None:
+            await on_progress(len(documents) - len(pending), len(documents))
+
+        now = time.monotonic()
+        if not pending or now >= deadline:
+            break
+        interval = next_interval(
+            interval,
+            [now - submitted[d] for d in pending],
+            durations,
+            min_interval,
+            max_interval,
+        )
+        await asyncio.sleep(min(interval, deadline - now))
+
+    results = list(documents.values())
+    return {
+        "total": len(results),
+        "ready": sum(1 for r in results if r["state"] == "ready"),
+        "failed": sum(1 for r in results if r["state"] == "failed"),
+        "pending": len(pending),
+        "timedOut": bool(pending),
+        "elapsed": round(time.monotonic() - started, 3),
+        "rounds": rounds,
+        "polls": sum(r["polls"] for r in results),
+        "results": results,
+    }
@@ -0,0 +1,163 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+_NGRAM = 3
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i : i + _NGRAM] for i in range(len(text) - _NGRAM + 1)}
+
+
+class FileNameIndex:
+    """
+    base_path 하위 파일/디렉토리 이름에 대한 trigram 인덱스.
+    - 검색: 패턴의 trigram posting 교집합 → 후보만 실제 부분 문자열/접두사 확인
+    - 갱신: 디렉토리 mtime만 확인하고, 바뀐 디렉토리만 다시 scandir
+      (파일 추가/삭제/이름 변경은 부모 디렉토리 mtime을 바꾼다)
+    동기 메서드이므로 호출 측에서 워커 스레드 + 락으로 감싸서 사용한다.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._next_id = 0
+        # id -> (상대 경로, 소문자 이름, 디렉토리 여부)
+        self._entries: Dict[int, Tuple[str, str, bool]] = {}
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # 상대 디렉토리 경로 -> (mtime_ns, 자식 이름 집합)
+        self._dirs: Dict[str, Tuple[int, Set[str]]] = {}
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, rel_path: str, name: str, is_dir: bool) -> None:
+        if rel_path in self._ids:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        lowered = name.lower()
+        self._entries[entry_id] = (rel_path, lowered, is_dir)
+        self._ids[rel_path] = entry_id
+        for gram in _ngrams(lowered):
+            self._postings.setdefault(gram, set()).add(entry_id)
+
+    def _remove(self, rel_path: str) -> None:
+        entry_id = self._ids.pop(rel_path, None)
+        if entry_id is None:
+            return
+        _, lowered, is_dir = self._entries.pop(entry_id)
+        for gram in _ngrams(lowered):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self._postings[gram]
+        if is_dir:
+            # 하위 트리 전체 제거
+            _, children = self._dirs.pop(rel_path, (0, set()))
+            for child in children:
+                self._remove(f"{rel_path}/{child}")
+
+    def _scan_dir(self, rel_dir: str) -> List[str]:
+        """디렉토리 하나의 자식 목록을 맞추고, 새로 생긴 하위 디렉토리 목록을 반환"""
+        abs_dir = self.root / rel_dir if rel_dir else self.root
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+            with os.scandir(abs_dir) as it:
+                current = {
+                    entry.name: entry.is_dir(follow_symlinks=False) for entry in it
+                }
+        except OSError:
+            return []
+
+        _, previous = self._dirs.get(rel_dir, (0, set()))
+        self._dirs[rel_dir] = (mtime_ns, set(current))
+        prefix = f"{rel_dir}/" if rel_dir else ""
+
+        for name in previous - set(current):
+            self._remove(prefix + name)
+        new_dirs = []
+        for name, is_dir in current.items():
+            rel_path = prefix + name
+            if rel_path in self._ids:
+                continue
+            self._add(rel_path, name, is_dir)
+            if is_dir:
+                new_dirs.append(rel_path)
+        return new_dirs
+
+    def _sync(self, rel_dir: str) -> None:
+        # 깊은 트리에서도 재귀 한도에 걸리지 않도록 스택으로 탐색
+        stack = [rel_dir]
+        while stack:
+            stack.extend(self._scan_dir(stack.pop()))
+
+    def build(self) -> None:
+        self._next_id = 0
+        self._entries.clear()
+        self._ids.clear()
+        self._postings.clear()
+        self._dirs.clear()
+        self._sync("")
+        self.built_at = self.refreshed_at = time.time()
+
+    def refresh(self) -> int:
+        """mtime이 바뀐 디렉토리만 다시 스캔, 다시 스캔한 디렉토리 수를 반환"""
+        changed = []
+        for rel_dir, (mtime_ns, _) in list(self._dirs.items()):
+            abs_dir = self.root / rel_dir if rel_dir else self.root
+            try:
+                if os.stat(abs_dir).st_mtime_ns != mtime_ns:
+                    changed.append(rel_dir)
+            except OSError:
+                # 디렉토리 자체가 사라진 경우 → 부모 디렉토리 재스캔 시 제거됨
+                continue
+        for rel_dir in changed:
+            if rel_dir in self._dirs:
+                self._sync(rel_dir)
+        self.refreshed_at = time.time()
+        return len(changed)
+
+    def search(
+        self, pattern: str, limit: int = 100, offset: int = 0, prefix: bool = False
+    ) -> Tuple[int, List[dict]]:
+        """이름 부분 문자열(또는 접두사) 검색 → (전체 매치 수, 해당 페이지 항목)"""
+        pattern = pattern.lower()
+        grams = _ngrams(pattern)
+        if grams:
+            postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+            candidates = set.intersection(*postings) if postings[0] else set()
+        else:
+            # 3글자 미만 패턴은 trigram으로 좁힐 수 없으므로 전체 이름을 확인
+            candidates = self._entries.keys()
+
+        matched = []
+        for entry_id in candidates:
+            rel_path, lowered, is_dir = self._entries[entry_id]
+            if lowered.startswith(pattern) if prefix else pattern in lowered:
+                matched.append((rel_path, is_dir))
+        matched.sort()
+
+        page = matched[offset : offset + limit] if limit else matched[offset:]
+        items = [
+            {
+                "name": rel_path.rsplit("/", 1)[-1],
+                "path": rel_path,
+                "type": "directory" if is_dir else "file",
+            }
+            for rel_path, is_dir in page
+        ]
+        return len(matched), items
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "directories": len(self._dirs),
+            "ngrams": len(self._postings),
+            "built_at": self.built_at,
+            "refreshed_at": self.refreshed_at,
+        }
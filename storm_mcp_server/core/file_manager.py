@@ -1,9 +1,176 @@
-from pathlib import Path
-from typing import List
-import os
-import mimetypes
 import asyncio
 import base64
+import codecs
+import logging
+import mimetypes
+import mmap
+import os
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from storm_mcp_server.core.content_index import ContentIndex
+from storm_mcp_server.core.file_index import FileNameIndex
+
+logger = logging.getLogger(__name__)
+
+# 검색 시 인덱스 갱신(디렉토리 mtime 확인) 최소 간격(초)
+INDEX_REFRESH_INTERVAL = float(os.getenv("STORM_FILE_INDEX_REFRESH", "2"))
+# 내용 검색 시 역색인 갱신(파일 size/mtime 확인) 최소 간격(초)
+CONTENT_INDEX_REFRESH_INTERVAL = float(os.getenv("STORM_CONTENT_INDEX_REFRESH", "30"))
+# 리소스 한 번 읽기 최대 바이트 수 (넘으면 잘라서 반환하고 이어 읽을 위치를 알려줌)
+RESOURCE_MAX_BYTES = int(os.getenv("STORM_RESOURCE_MAX_BYTES", str(1024 * 1024)))
+# 디렉토리 목록 캐시에 보관할 디렉토리 수 (디렉토리 mtime이 바뀌면 다시 스캔)
+LISTING_CACHE_SIZE = int(os.getenv("STORM_LISTING_CACHE_SIZE", "256"))
+# 디렉토리 목록 캐시 최대 유지 시간(초). 파일 내용만 바뀌면 디렉토리 mtime이 그대로라
+# 목록의 size가 이 시간까지 이전 값일 수 있음 (0이면 매번 다시 스캔)
+LISTING_CACHE_TTL = float(os.getenv("STORM_LISTING_CACHE_TTL", "30"))
+# 목록 한 페이지 기본 항목 수 (list_directory 툴)
+LIST_PAGE_SIZE = int(os.getenv("STORM_LIST_PAGE_SIZE", "500"))
+
+_TEXT_MIME_TYPES = {
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/x-yaml",
+    "application/x-sh",
+    "application/sql",
+}
+
+
+def _is_text_mime(mime_type: str | None) -> bool:
+    return bool(mime_type) and (
+        mime_type.startswith("text/")
+        or mime_type in _TEXT_MIME_TYPES
+        or mime_type.endswith(("+json", "+xml"))
+    )
+
+
+def _looks_binary(head: bytes) -> bool:
+    if b"\0" in head:
+        return True
+    try:
+        # 끝에서 잘린 멀티바이트 문자는 무시
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def _line_range_to_bytes(full_path: Path, line_start: int, line_end: int | None):
+    """1부터 시작하는 줄 범위 [line_start, line_end]의 바이트 범위를 mmap으로 계산"""
+    size = full_path.stat().st_size
+    if size == 0:
+        return 0, 0
+    with open(full_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            for _ in range(line_start - 1):
+                nl = mm.find(b"\n", start)
+                if nl < 0:
+                    return size, size
+                start = nl + 1
+            if line_end is None:
+                return start, size
+            end = start
+            for _ in range(line_end - line_start + 1):
+                nl = mm.find(b"\n", end)
+                if nl < 0:
+                    return start, size
+                end = nl + 1
+            return start, end
+
+
+def _read_range_sync(
+    full_path: Path,
+    offset: int,
+    length: int | None,
+    line_start: int | None,
+    line_end: int | None,
+    mime_type: str | None,
+) -> dict:
+    size = full_path.stat().st_size
+    if line_start is not None:
+        offset, end = _line_range_to_bytes(full_path, max(1, line_start), line_end)
+        length = end - offset
+    offset = min(max(0, offset), size)
+    requested = size - offset if length is None else max(0, length)
+    to_read = min(requested, RESOURCE_MAX_BYTES)
+
+    with open(full_path, "rb") as f:
+        head = f.read(4096)
+        f.seek(offset)
+        data = f.read(to_read)
+
+    binary = not _is_text_mime(mime_type) and _looks_binary(head)
+    consumed = len(data)
+    if binary:
+        content = data
+    else:
+        skipped = 0
+        if offset > 0:
+            # 멀티바이트 문자 중간에서 시작하면 다음 문자 경계까지 건너뜀
+            while skipped < min(3, len(data)) and 0x80 <= data[skipped] <= 0xBF:
+                skipped += 1
+        at_eof = offset + consumed >= size
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        content = decoder.decode(data[skipped:], final=at_eof)
+        # 끝에서 잘린 문자는 다음 조각에서 다시 읽도록 되돌림
+        consumed -= len(decoder.getstate()[0])
+
+    end = offset + consumed
+    truncated = consumed < requested
+    return {
+        "content": content,
+        "mime_type": mime_type
+        or ("application/octet-stream" if binary else "text/plain"),
+        "binary": binary,
+        "offset": offset,
+        "length": consumed,
+        "size": size,
+        "truncated": truncated,
+        "next_offset": end if end < size else None,
+    }
+
+
+def _scan_directory_sync(full_path: Path, rel_dir: str) -> List[dict]:
+    """
+    os.scandir로 디렉토리 하나를 읽음 (이름순 정렬 - 페이지 cursor가 이름 기준).
+    종류는 DirEntry에 캐시된 d_type으로 판단하고 stat은 파일 크기가 필요할 때만 호출.
+    """
+    prefix = f"{rel_dir}{os.sep}" if rel_dir else ""
+    items = []
+    with os.scandir(full_path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                size = entry.stat().st_size if not is_dir and entry.is_file() else None
+            except OSError:
+                # 깨진 심볼릭 링크 등
+                is_dir, size = False, None
+            items.append(
+                {
+                    "name": entry.name,
+                    "path": prefix + entry.name,
+                    "type": "directory" if is_dir else "file",
+                    "size": size,
+                }
+            )
+    items.sort(key=lambda item: item["name"])
+    return items
+
+
+def encode_list_cursor(path: str) -> str:
+    return base64.urlsafe_b64encode(path.encode()).decode()
+
+
+def decode_list_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
 
 
 class FileSystemManager:
@@ -11,6 +178,17 @@ class FileSystemManager:
         self.base_path = Path(base_path).resolve()
         if not self.base_path.exists():
             self.base_path.mkdir(parents=True)
+        self.index = FileNameIndex(self.base_path)
+        self._index_lock = asyncio.Lock()
+        self._index_task: Optional[asyncio.Task] = None
+        self.content_index = ContentIndex(self.base_path)
+        self._content_lock = asyncio.Lock()
+        # 절대 경로 -> (디렉토리 mtime_ns, 스캔 시각, 항목 목록, 이름 목록)
+        self._listings: OrderedDict[str, Tuple[int, float, List[dict], List[str]]] = (
+            OrderedDict()
+        )
+        self.listing_hits = 0
+        self.listing_misses = 0
 
     def _validate_path(self, path: str | Path) -> Path:
         """주어진 경로가 base_path 내에 있는지 확인"""
@@ -19,16 +197,66 @@ class FileSystemManager:
             raise ValueError("Invalid path: Access denied")
         return full_path
 
-    async def read_file(self, path: str) -> tuple[str, str]:
-        """파일 읽기 (텍스트 파일 기준)"""
+    async def read_range(
+        self,
+        path: str,
+        offset: int = 0,
+        length: int | None = None,
+        line_start: int | None = None,
+        line_end: int | None = None,
+    ) -> dict:
+        """
+        파일 일부 읽기 (바이트 범위 또는 줄 범위)
+        - RESOURCE_MAX_BYTES를 넘으면 잘라서 반환하고 next_offset으로 이어 읽기 위치 제공
+        - 바이너리 파일은 bytes 그대로 반환 (MCP blob 리소스)
+        - 파일 전체를 메모리에 올리지 않으므로 파일 크기와 무관하게 메모리 사용량 일정
+        """
         full_path = self._validate_path(path)
         if not full_path.is_file():
             raise FileNotFoundError(f"File not found: {path}")
 
         mime_type, _ = mimetypes.guess_type(str(full_path))
-        # 텍스트 파일(UTF-8) 가정
-        content = await asyncio.to_thread(full_path.read_text)
-        return content, mime_type or "text/plain"
+        return await asyncio.to_thread(
+            _read_range_sync, full_path, offset, length, line_start, line_end, mime_type
+        )
+
+    async def _listing(self, full_path: Path) -> Tuple[List[dict], List[str]]:
+        """
+        디렉토리 목록 (캐시). 항목 추가/삭제/이름 변경은 디렉토리 mtime을 바꾸므로
+        mtime이 같고 LISTING_CACHE_TTL이 지나지 않았으면 캐시를 그대로 쓴다.
+        파일을 제자리에서 고쳐 쓰면 mtime이 바뀌지 않으므로 그 size는 TTL 동안 이전 값일 수 있다.
+        """
+        key = str(full_path)
+        try:
+            mtime_ns = os.stat(full_path).st_mtime_ns
+        except OSError:
+            self._listings.pop(key, None)
+            raise
+        now = time.monotonic()
+        cached = self._listings.get(key)
+        if (
+            cached is not None
+            and cached[0] == mtime_ns
+            and now - cached[1] < LISTING_CACHE_TTL
+        ):
+            self._listings.move_to_end(key)
+            self.listing_hits += 1
+            return cached[2], cached[3]
+
+        self.listing_misses += 1
+        rel_dir = (
+            ""
+            if full_path == self.base_path
+            else str(full_path.relative_to(self.base_path))
+        )
+        items = await asyncio.to_thread(_scan_directory_sync, full_path, rel_dir)
+        names = [item["name"] for item in items]
+        # 스캔 도중 바뀌었다면 다음 호출에서 mtime이 달라 다시 스캔된다
+        self._listings[key] = (mtime_ns, now, items, names)
+        self._listings.move_to_end(key)
+        while len(self._listings) > LISTING_CACHE_SIZE:
+            self._listings.popitem(last=False)
+        return items, names
 
     async def list_directory(self, path: str = "") -> List[dict]:
         """디렉토리 내용 나열"""
@@ -36,50 +264,153 @@ class FileSystemManager:
         if not full_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {path}")
 
-        items = []
-        for item in full_path.iterdir():
-            rel_path = str(item.relative_to(self.base_path))
-            items.append(
-                {
-                    "name": item.name,
-                    "path": rel_path,
-                    "type": "directory" if item.is_dir() else "file",
-                    "size": item.stat().st_size if item.is_file() else None,
-                }
+        items, _ = await self._listing(full_path)
+        return list(items)
+
+    async def walk_directory(
+        self, path: str = "", after: Optional[str] = None, recursive: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        이름순(재귀면 깊이 우선 전위 순회)으로 항목을 하나씩 yield.
+        하위 디렉토리는 순회가 그 위치에 도달했을 때 처음 스캔하므로 큰 트리도 필요한 만큼만 읽는다.
+        after(base_path 기준 상대 경로)를 주면 그 항목 다음부터 이어서 순회.
+        """
+        root = self._validate_path(path)
+        if not root.is_dir():
+            raise NotADirectoryError(f"Not a directory: {path}")
+
+        # 스택: [항목 목록, 다음 인덱스]
+        stack: List[list] = []
+        if after is None:
+            items, _ = await self._listing(root)
+            stack.append([items, 0])
+        else:
+            parts = self._cursor_parts(root, after)
+            directory = root
+            for depth, part in enumerate(parts):
+                try:
+                    items, names = await self._listing(directory)
+                except OSError:
+                    break
+                stack.append([items, bisect_right(names, part)])
+                if depth < len(parts) - 1 or recursive:
+                    # 이전 페이지의 마지막 항목이 디렉토리면 그 하위부터 이어감
+                    directory = directory / part
+                    if depth == len(parts) - 1:
+                        await self._push_children(stack, directory)
+
+        while stack:
+            frame = stack[-1]
+            items, index = frame
+            if index >= len(items):
+                stack.pop()
+                continue
+            frame[1] += 1
+            item = items[index]
+            yield item
+            if recursive and item["type"] == "directory":
+                await self._push_children(stack, self.base_path / item["path"])
+
+    def _cursor_parts(self, root: Path, after: str) -> List[str]:
+        # 항목 경로는 심볼릭 링크를 풀지 않은 상대 경로이므로 resolve하지 않고 그대로 비교
+        # (링크를 풀면 링크 디렉토리 안의 cursor가 root 밖으로 나가 버림)
+        parts = Path(after).parts
+        if not parts or Path(after).is_absolute() or ".." in parts:
+            raise ValueError("Invalid cursor")
+        root_parts = root.relative_to(self.base_path).parts
+        if parts[: len(root_parts)] != root_parts or len(parts) == len(root_parts):
+            raise ValueError("Invalid cursor")
+        return list(parts[len(root_parts) :])
+
+    async def _push_children(self, stack: List[list], directory: Path) -> None:
+        # 심볼릭 링크 디렉토리는 순환할 수 있으므로 내려가지 않음
+        if directory.is_symlink() or not directory.is_dir():
+            return
+        try:
+            items, _ = await self._listing(directory)
+        except OSError:
+            return
+        stack.append([items, 0])
+
+    async def list_directory_page(
+        self,
+        path: str = "",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        recursive: bool = False,
+    ) -> dict:
+        """
+        디렉토리 목록 한 페이지. next_cursor가 있으면 같은 인자 + cursor로 다음 페이지 조회.
+        cursor는 마지막으로 반환한 항목의 경로라서 그 사이 항목이 추가/삭제돼도 위치를 잃지 않는다.
+        """
+        limit = max(1, limit or LIST_PAGE_SIZE)
+        after = decode_list_cursor(cursor) if cursor else None
+        items: List[dict] = []
+        has_more = False
+        async for item in self.walk_directory(path, after=after, recursive=recursive):
+            if len(items) == limit:
+                has_more = True
+                break
+            items.append(item)
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_list_cursor(items[-1]["path"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def build_index(self) -> None:
+        """파일 이름 인덱스 전체 구축 (서버 시작 시 1회, 이미 구축됐으면 건너뜀)"""
+        async with self._index_lock:
+            if self.index.built_at is None:
+                await asyncio.to_thread(self.index.build)
+
+    def start_index_build(self) -> asyncio.Task:
+        """
+        서버 시작 시 인덱스를 백그라운드로 구축. 구축 중에 온 검색은 같은 락에서 기다리고,
+        구축이 실패하면 첫 검색이 _ensure_index에서 다시 구축한다.
+        """
+        if self._index_task is None:
+            self._index_task = asyncio.get_running_loop().create_task(
+                self._build_index_in_background()
             )
-        return items
-
-    async def search_files(self, pattern: str) -> List[dict]:
-        """파일 검색"""
-        results = []
-        async for path in self._walk_async(self.base_path):
-            if pattern.lower() in path.name.lower():
-                rel_path = str(path.relative_to(self.base_path))
-                results.append(
-                    {
-                        "name": path.name,
-                        "path": rel_path,
-                        "type": "directory" if path.is_dir() else "file",
-                    }
-                )
-        return results
-
-    async def _walk_async(self, path: Path):
-        """비동기 파일 시스템 탐색"""
-        dirs = []
-        files = []
-        async for entry in asyncio.to_thread(os.scandir, str(path)):
-            if entry.is_dir():
-                dirs.append(entry)
-            else:
-                files.append(entry)
-
-        for entry in files:
-            yield Path(entry.path)
-
-        for entry in dirs:
-            async for x in self._walk_async(Path(entry.path)):
-                yield x
+        return self._index_task
+
+    async def _build_index_in_background(self) -> None:
+        try:
+            await self.build_index()
+        except Exception:
+            logger.warning("Initial file index build failed", exc_info=True)
+
+    async def _ensure_index(self) -> None:
+        """_index_lock을 잡은 상태에서 호출 (시작 시 구축이 안 됐으면 여기서 구축)"""
+        if self.index.built_at is None:
+            await asyncio.to_thread(self.index.build)
+        elif time.time() - self.index.refreshed_at >= INDEX_REFRESH_INTERVAL:
+            # 바뀐 디렉토리만 다시 스캔
+            await asyncio.to_thread(self.index.refresh)
+
+    async def search_files(
+        self, pattern: str, limit: int = 100, offset: int = 0, prefix: bool = False
+    ) -> dict:
+        """파일 검색 (이름 부분 문자열/접두사, 페이지 단위)"""
+        # 워커 스레드의 갱신과 검색이 겹치지 않도록 같은 락 안에서 조회
+        async with self._index_lock:
+            await self._ensure_index()
+            total, items = self.index.search(
+                pattern, limit=limit, offset=offset, prefix=prefix
+            )
+        return {"total": total, "offset": offset, "items": items}
+
+    async def search_content(self, query: str, limit: int = 10) -> List[dict]:
+        """파일 내용 전문 검색 (BM25 순위 + 스니펫)"""
+        async with self._content_lock:
+            updated_at = self.content_index.updated_at
+            if (
+                updated_at is None
+                or time.time() - updated_at >= CONTENT_INDEX_REFRESH_INTERVAL
+            ):
+                # 바뀐 파일만 다시 색인
+                await asyncio.to_thread(self.content_index.update)
+        return await asyncio.to_thread(self.content_index.search, query, limit)
 
     # ------------------------------------------------------------------------
     # 새로 추가: 파일 업로드 로직 (Base64 컨텐츠 받기)
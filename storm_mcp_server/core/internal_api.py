@@ -1,54 +1,222 @@
+import importlib.util
+import json
 import os
+import time
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import requests
-from typing import Any, Dict, List
+import httpx
 
+from storm_mcp_server.core.metrics import observe_phase, observe_size, track
+from storm_mcp_server.core.resilience import (
+    circuit_guard,
+    parse_retry_after,
+    resilient_call,
+)
+from storm_mcp_server.core.scheduler import scheduler
+from storm_mcp_server.core.tenants import create_tenant_pool
 
-def call_internal_api(
+# STORM_API_BASE_URL로 다른 환경(스테이징, 로컬 가짜 API 등)을 가리킬 수 있음
+DEFAULT_BASE_URL = os.getenv(
+    "STORM_API_BASE_URL", "https://live-stargate.sionic.im"
+).rstrip("/")
+
+# ----------------------------------------------------------------------------
+# API 키(테넌트)별 HTTP 클라이언트 (keep-alive 커넥션 풀, core/tenants.py)
+#   - STORM_HTTP2=1                 : h2 패키지가 설치된 경우 HTTP/2 멀티플렉싱 사용
+#   - STORM_HTTP_MAX_CONNECTIONS    : 최대 동시 커넥션 수 (기본 100)
+#   - STORM_HTTP_MAX_KEEPALIVE      : 유지할 keep-alive 커넥션 수 (기본 20)
+#   - STORM_HTTP_KEEPALIVE_EXPIRY   : 유휴 커넥션 유지 시간(초) (기본 30)
+# 커넥션 수 설정은 테넌트 하나의 풀 기준이다.
+# gzip 응답은 httpx가 기본으로 해제하며, brotli 패키지가 있으면 br도 해제한다.
+# ----------------------------------------------------------------------------
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("STORM_HTTP2", "0").lower() not in ("1", "true", "yes"):
+        return False
+    # h2 패키지 없이 http2=True로 만들면 ImportError가 나므로 조용히 HTTP/1.1로 대체
+    return importlib.util.find_spec("h2") is not None
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("STORM_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("STORM_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("STORM_HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    return httpx.AsyncClient(
+        http2=_http2_enabled(),
+        limits=limits,
+        timeout=httpx.Timeout(30.0),
+    )
+
+
+tenants = create_tenant_pool(_new_http_client)
+
+
+async def close_http_client() -> None:
+    """서버 종료 시 모든 테넌트의 커넥션 풀 정리"""
+    await tenants.close_all()
+
+
+class StormAPIError(Exception):
+    """Storm API가 4xx/5xx로 응답한 경우 (재시도/서킷 판단용 status_code 포함)"""
+
+    def __init__(self, status_code: int, text: str, retry_after: float = None):
+        super().__init__(f"API error: {status_code} - {text}")
+        self.status_code = status_code
+        self.text = text
+        # 429/503의 Retry-After(초), 없으면 None
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, resp: httpx.Response) -> "StormAPIError":
+        retry_after = parse_retry_after(resp.headers.get("retry-after"))
+        return cls(resp.status_code, resp.text, retry_after)
+
+
+def _decode_response(
+    resp: httpx.Response, labels=None, sent_at: float = None
+) -> Dict[str, Any]:
+    """응답 JSON 디코딩 (계측 중이면 요청 왕복/디코딩 시간, 본문 크기 기록)"""
+    started = time.perf_counter()
+    # text/plain 응답 대비
+    try:
+        result = resp.json()
+    except ValueError:
+        # JSONDecodeError, UnicodeDecodeError 모두 ValueError
+        result = {"status": "success", "data": resp.text}
+    if labels is not None:
+        # 요청 왕복: 커넥션 획득 + 전송 + upstream 처리 + 본문 수신
+        observe_phase("upstream", labels, "request", started - sent_at)
+        observe_phase("upstream", labels, "decode", time.perf_counter() - started)
+        observe_size("upstream", labels, len(resp.content))
+    return result
+
+
+# HTTP(SSE) 모드에서는 세션(연결)마다 클라이언트가 보낸 API 키를 사용
+_session_api_key: ContextVar[Optional[str]] = ContextVar(
+    "storm_session_api_key", default=None
+)
+
+
+def use_session_api_key(api_key: Optional[str]) -> Token:
+    """현재 컨텍스트(세션 태스크와 그 하위 태스크)에서 쓸 API 키 설정"""
+    return _session_api_key.set(api_key or None)
+
+
+def reset_session_api_key(token: Token) -> None:
+    _session_api_key.reset(token)
+
+
+def get_api_key() -> str:
+    return _session_api_key.get() or os.getenv("STORM_API_KEY", "")
+
+
+async def call_internal_api(
     method: str,
     endpoint: str,
-    base_url: str = "https://live-stargate.sionic.im",
+    base_url: str = DEFAULT_BASE_URL,
     params: Dict[str, Any] = None,
     data: Dict[str, Any] = None,
     files: Dict[str, Any] = None,
+    route: str = None,
 ) -> Dict[str, Any]:
-    storm_api_key = os.getenv("STORM_API_KEY")
+    """
+    route: 계측/재시도/서킷 브레이커에서 쓸 endpoint 이름
+    (경로에 문서 ID 등이 들어가는 경우 "/api/v2/documents/{id}" 같은 템플릿을 넘김)
+    """
+    storm_api_key = get_api_key()
     url = f"{base_url}{endpoint}"
-    headers = {"Content-Type": "application/json", "storm-api-key": storm_api_key}
-
-    if method.upper() == "GET":
-        resp = requests.get(url, headers=headers, params=params, timeout=30)
-    elif method.upper() == "POST":
-        if files:
-            # 멀티파트
-            resp = requests.post(
-                url, headers=headers, data=data, files=files, timeout=60
-            )
-        else:
-            resp = requests.post(
-                url, headers=headers, json=data, params=params, timeout=30
-            )
-    elif method.upper() == "DELETE":
-        resp = requests.delete(url, headers=headers, params=params, timeout=30)
-    else:
+    headers = {"storm-api-key": storm_api_key}
+    method = method.upper()
+    if method not in ("GET", "POST", "DELETE"):
         raise ValueError(f"Unsupported HTTP method: {method}")
 
-    if resp.status_code >= 400:
-        raise Exception(f"API error: {resp.status_code} - {resp.text}")
+    name = f"{method} {route or endpoint}"
 
-    # text/plain 응답 대비
-    try:
-        return resp.json()
-    except Exception:
-        return {"status": "success", "data": resp.text}
+    async def send() -> Dict[str, Any]:
+        async with (
+            tenants.acquire(storm_api_key) as tenant,
+            scheduler.slot(name, tenant=tenant),
+        ):
+            client = tenant.client
+            with track("upstream", name) as labels:
+                sent_at = time.perf_counter()
+                if method == "GET":
+                    resp = await client.get(
+                        url, headers=headers, params=params, timeout=30
+                    )
+                elif method == "POST":
+                    if files:
+                        # 멀티파트 (Content-Type은 boundary 포함해서 httpx가 설정)
+                        resp = await client.post(
+                            url, headers=headers, data=data, files=files, timeout=60
+                        )
+                    else:
+                        resp = await client.post(
+                            url, headers=headers, json=data, params=params, timeout=30
+                        )
+                else:
+                    resp = await client.delete(
+                        url, headers=headers, params=params, timeout=30
+                    )
+
+                if resp.status_code >= 400:
+                    raise StormAPIError.from_response(resp)
+                return _decode_response(resp, labels, sent_at)
 
+    # GET/DELETE만 멱등으로 보고 재시도, 헤지 요청은 GET에만 적용
+    return await resilient_call(
+        name,
+        send,
+        idempotent=method in ("GET", "DELETE"),
+        hedge=method == "GET",
+    )
 
-def call_chat_api(
+
+async def call_upload_api(
+    endpoint: str,
+    content: AsyncIterator[bytes],
+    content_type: str,
+    content_length: int,
+    base_url: str = DEFAULT_BASE_URL,
+) -> Dict[str, Any]:
+    """
+    미리 만든 multipart 본문(비동기 조각 스트림)을 그대로 POST.
+    본문 전체를 메모리에 올리지 않으며, 조각 사이 대기만 write timeout으로 제한.
+    """
+    url = f"{base_url}{endpoint}"
+    storm_api_key = get_api_key()
+    headers = {
+        "storm-api-key": storm_api_key,
+        "Content-Type": content_type,
+        "Content-Length": str(content_length),
+    }
+    # 본문 스트림은 한 번만 읽을 수 있으므로 재시도 없이 서킷 브레이커만 적용
+    async with (
+        circuit_guard(f"POST {endpoint}"),
+        tenants.acquire(storm_api_key) as tenant,
+        scheduler.slot(f"POST {endpoint}", tenant=tenant),
+    ):
+        client = tenant.client
+        with track("upstream", f"POST {endpoint}") as labels:
+            sent_at = time.perf_counter()
+            resp = await client.post(
+                url, headers=headers, content=content, timeout=httpx.Timeout(60.0)
+            )
+            if resp.status_code >= 400:
+                raise StormAPIError.from_response(resp)
+            return _decode_response(resp, labels, sent_at)
+
+
+async def call_chat_api(
     question: str,
     bucket_ids: List[str] = None,
     thread_id: str = None,
     webhook_url: str = None,
-    base_url: str = "https://live-stargate.sionic.im",
+    base_url: str = DEFAULT_BASE_URL,
 ) -> Dict[str, Any]:
     """
     /api/v2/answer (non-stream) 호출 예시
@@ -56,9 +224,8 @@ def call_chat_api(
     - body: { "question": "...", "bucketIds": [...], "threadId": "...", "webhookUrl": "..." }
     """
     url = f"{base_url}/api/v2/answer"
-    storm_api_key = os.getenv("STORM_API_KEY")
+    storm_api_key = get_api_key()
     headers = {
-        "Content-Type": "application/json",
         "storm-api-key": storm_api_key,
     }
 
@@ -72,8 +239,103 @@ def call_chat_api(
     if webhook_url:
         body["webhookUrl"] = webhook_url
 
-    response = requests.post(url, headers=headers, json=body, timeout=30)
-    if response.status_code >= 400:
-        raise Exception(f"API error: {response.status_code} - {response.text}")
+    async def send() -> Dict[str, Any]:
+        async with (
+            tenants.acquire(storm_api_key) as tenant,
+            scheduler.slot("POST /api/v2/answer", tenant=tenant),
+        ):
+            client = tenant.client
+            with track("upstream", "POST /api/v2/answer") as labels:
+                sent_at = time.perf_counter()
+                response = await client.post(
+                    url, headers=headers, json=body, timeout=30
+                )
+                if response.status_code >= 400:
+                    raise StormAPIError.from_response(response)
+                return _decode_response(response, labels, sent_at)
+
+    # 답변 생성은 비싸고 read timeout/5xx는 upstream이 이미 생성 중일 수 있으므로
+    # 멱등으로 보지 않음 (연결 실패와 429처럼 요청이 닿지 않은 경우만 재시도)
+    return await resilient_call("POST /api/v2/answer", send, idempotent=False)
+
+
+def _parse_stream_line(line: str) -> Optional[Dict[str, Any]]:
+    """스트림 한 줄(SSE `data:` 또는 JSON lines)을 이벤트 dict로 변환"""
+    line = line.strip()
+    if not line or line.startswith(":") or line.startswith("event:"):
+        return None
+    if line.startswith("data:"):
+        line = line[len("data:") :].strip()
+    if line == "[DONE]":
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        # JSON이 아니면 텍스트 조각으로 취급
+        return {"text": line}
+    return event if isinstance(event, dict) else {"text": str(event)}
+
+
+def extract_stream_text(event: Dict[str, Any]) -> str:
+    """스트림 이벤트에서 답변 텍스트 조각을 추출"""
+    for key in ("delta", "content", "text"):
+        value = event.get(key)
+        if isinstance(value, str):
+            return value
+    data = event.get("data")
+    if isinstance(data, dict):
+        return extract_stream_text(data)
+    return ""
+
+
+async def stream_chat_api(
+    question: str,
+    bucket_ids: List[str] = None,
+    thread_id: str = None,
+    base_url: str = DEFAULT_BASE_URL,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    /api/v2/answer (isStreaming=true) 호출
+    - 응답 본문을 줄 단위로 읽으면서 이벤트 dict를 하나씩 yield
+    - 전체 생성 시간에는 제한을 두지 않고, 청크 사이 대기만 read timeout으로 제한
+    """
+    url = f"{base_url}/api/v2/answer"
+    storm_api_key = get_api_key()
+    headers = {
+        "storm-api-key": storm_api_key,
+        "Accept": "text/event-stream",
+    }
+
+    body = {
+        "question": question,
+        "isStreaming": True,
+    }
+    if bucket_ids:
+        body["bucketIds"] = bucket_ids
+    if thread_id:
+        body["threadId"] = thread_id
+
+    timeout = httpx.Timeout(
+        30.0, read=float(os.getenv("STORM_STREAM_READ_TIMEOUT", "60"))
+    )
+    # 이미 전달한 조각이 있을 수 있으므로 재시도 없이 서킷 브레이커만 적용.
+    # 스트리밍도 같은 /api/v2/answer이므로 서킷/429 Retry-After/스케줄러 한도를 같은
+    # endpoint 이름으로 나눠 씀 (계측 라벨만 (stream)으로 구분)
+    async with (
+        circuit_guard("POST /api/v2/answer"),
+        tenants.acquire(storm_api_key) as tenant,
+        scheduler.slot("POST /api/v2/answer", tenant=tenant),
+    ):
+        client = tenant.client
+        with track("upstream", "POST /api/v2/answer (stream)"):
+            async with client.stream(
+                "POST", url, headers=headers, json=body, timeout=timeout
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise StormAPIError.from_response(response)
 
-    return response.json()
+                async for line in response.aiter_lines():
+                    event = _parse_stream_line(line)
+                    if event is not None:
+                        yield event
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# ----------------------------------------------------------------------------
+# 툴/upstream 계측 (지연 히스토그램, 오류 카운터, 페이로드 크기, in-flight 게이지)
+#   - STORM_METRICS       : 0이면 비활성 - 계측 지점은 enabled 확인 한 번만 하고 반환
+#   - STORM_METRICS_PORT  : 지정 시 http://127.0.0.1:<port>/metrics 로 Prometheus 텍스트 노출
+# MCP 리소스 metrics://storm (JSON), metrics://storm/prometheus (텍스트)로도 조회 가능
+# ----------------------------------------------------------------------------
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # 마지막 칸은 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def observe(
+        self,
+        name: str,
+        labels: Labels,
+        value: float,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram(buckets)
+        histogram.observe(value)
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def gauge_add(self, name: str, labels: Labels, delta: float) -> None:
+        self.gauges[(name, labels)] = self.gauges.get((name, labels), 0) + delta
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+        self.gauges.clear()
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """MCP 리소스용 JSON (히스토그램은 count/sum/근사 p50·p95·p99)"""
+
+        def key(name: str, labels: Labels) -> str:
+            if not labels:
+                return name
+            return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+        histograms = {}
+        for (name, labels), h in self.histograms.items():
+            histograms[key(name, labels)] = {
+                "count": h.count,
+                "sum": round(h.sum, 6),
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+                "p99": h.quantile(0.99),
+            }
+        return {
+            "enabled": self.enabled,
+            "histograms": histograms,
+            "counters": {key(n, ls): v for (n, ls), v in self.counters.items()},
+            "gauges": {key(n, ls): v for (n, ls), v in self.gauges.items()},
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+        described = set()
+
+        def header(name: str, kind: str) -> None:
+            if name in described:
+                return
+            described.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), h in sorted(self.histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{fmt(labels, (('le', repr(float(bound))),))} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{name}_bucket{fmt(labels, (('le', '+Inf'),))} {h.count}")
+            lines.append(f"{name}_sum{fmt(labels)} {h.sum}")
+            lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.getenv("STORM_METRICS", "1").lower() not in ("0", "false"))
+
+metrics.describe("storm_tool_duration_seconds", "MCP tool call latency")
+metrics.describe("storm_tool_phase_seconds", "Tool call latency by phase")
+metrics.describe("storm_tool_errors_total", "Failed MCP tool calls")
+metrics.describe("storm_tool_in_flight", "MCP tool calls in progress")
+metrics.describe("storm_tool_response_bytes", "Encoded tool result size")
+metrics.describe("storm_upstream_duration_seconds", "Storm API request latency")
+metrics.describe("storm_upstream_phase_seconds", "Storm API latency by phase")
+metrics.describe("storm_upstream_errors_total", "Failed Storm API requests")
+metrics.describe("storm_upstream_in_flight", "Storm API requests in progress")
+metrics.describe("storm_upstream_response_bytes", "Storm API response body size")
+
+
+@contextmanager
+def track(kind: str, name: str) -> Iterator[Optional[Labels]]:
+    """
+    kind("tool"/"upstream") 단위 호출 하나를 계측: in-flight, 지연, 오류(예외 타입/상태 코드)
+    비활성 상태면 None을 넘기고 아무것도 기록하지 않음
+    """
+    if not metrics.enabled:
+        yield None
+        return
+    labels: Labels = ((kind if kind == "tool" else "endpoint", name),)
+    metrics.gauge_add(f"storm_{kind}_in_flight", labels, 1)
+    started = time.perf_counter()
+    try:
+        yield labels
+    except Exception as e:
+        status = getattr(e, "status_code", None)
+        error = str(status) if status is not None else type(e).__name__
+        metrics.inc(f"storm_{kind}_errors_total", labels + (("error", error),))
+        raise
+    finally:
+        metrics.gauge_add(f"storm_{kind}_in_flight", labels, -1)
+        metrics.observe(
+            f"storm_{kind}_duration_seconds", labels, time.perf_counter() - started
+        )
+
+
+def observe_phase(kind: str, labels: Optional[Labels], phase: str, seconds: float):
+    if labels is not None:
+        metrics.observe(
+            f"storm_{kind}_phase_seconds", labels + (("phase", phase),), seconds
+        )
+
+
+def observe_size(kind: str, labels: Optional[Labels], size: int) -> None:
+    if labels is not None:
+        metrics.observe(f"storm_{kind}_response_bytes", labels, size, SIZE_BUCKETS)
+
+
+# ----------------------------------------------------------------------------
+# Prometheus 스크레이프용 최소 HTTP 엔드포인트 (STORM_METRICS_PORT)
+# ----------------------------------------------------------------------------
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request_line = await reader.readline()
+        # 헤더는 읽고 버림
+        while (await reader.readline()).strip():
+            pass
+        path = request_line.split()[1] if len(request_line.split()) > 1 else b"/"
+        if path.split(b"?")[0] in (b"/metrics", b"/"):
+            status, body = b"200 OK", metrics.prometheus().encode()
+        else:
+            status, body = b"404 Not Found", b"not found\n"
+        writer.write(
+            b"HTTP/1.1 " + status + b"\r\n"
+            b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    return await asyncio.start_server(_serve_metrics, host, port)
@@ -0,0 +1,296 @@
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from storm_mcp_server.core.cache import make_cache_key
+from storm_mcp_server.core.pagination import find_items, replace_items
+
+try:
+    import orjson
+except ImportError:  # 옵션 의존성 - 없으면 표준 json
+    orjson = None
+
+# ----------------------------------------------------------------------------
+# 툴 결과 인코딩 (compact JSON / 필드 projection / 크기 제한 + 이어받기 cursor)
+#   - STORM_OUTPUT_PRETTY        : 1이면 예전처럼 indent=2 (기본은 공백 없는 JSON)
+#   - STORM_OUTPUT_MAX_CHARS     : 결과 텍스트 최대 길이, 0이면 제한 없음 (기본 100000)
+#   - STORM_OUTPUT_FIELDS        : 목록 항목(또는 답변 객체)에 남길 기본 필드 (예: id,name)
+#   - STORM_OUTPUT_MAX_SOURCES   : 답변 sources를 앞에서 N개만 남김, 0이면 전체 (기본 0)
+#   - STORM_OUTPUT_CURSOR_TTL    : 잘린 결과를 이어받을 수 있는 시간(초) (기본 600)
+# FIELDS/MAX_SOURCES는 툴별로 덮어쓸 수 있다. 예) STORM_OUTPUT_FIELDS_LIST_BUCKETS=id,name
+# 툴 인자 fields / max_sources / max_output_chars 가 환경변수보다 우선한다.
+# orjson이 설치돼 있으면 인코딩에 사용한다.
+# ----------------------------------------------------------------------------
+_CURSOR_MAX = 128
+
+
+def _env(name: str, tool: Optional[str], default: str) -> str:
+    if tool:
+        value = os.getenv(f"{name}_{tool.upper()}")
+        if value is not None:
+            return value
+    return os.getenv(name, default)
+
+
+def encode(data: Any, pretty: bool = None) -> str:
+    if pretty is None:
+        pretty = os.getenv("STORM_OUTPUT_PRETTY", "0").lower() in ("1", "true", "yes")
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(data, option=option).decode()
+        except TypeError:
+            # orjson이 직렬화하지 못하는 타입 (큰 정수 등) → 표준 json으로 재시도
+            pass
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# ----------------------------------------------------------------------------
+# projection
+# ----------------------------------------------------------------------------
+def _pick(value: Any, fields: List[str]) -> Any:
+    if not isinstance(value, dict):
+        return value
+    return {field: value[field] for field in fields if field in value}
+
+
+def _record_path(payload: Any) -> List[Dict[str, Any]]:
+    """payload → payload["data"] → ... 순서의 dict 경로 (마지막이 실제 레코드)"""
+    path = []
+    node = payload
+    while isinstance(node, dict):
+        path.append(node)
+        node = node.get("data")
+    return path
+
+
+def _replace_record(payload: Any, record: Dict[str, Any]) -> Any:
+    path = _record_path(payload)
+    if not path:
+        return payload
+    for parent in reversed(path[:-1]):
+        record = {**parent, "data": record}
+    return record
+
+
+def _limit_sources(value: Any, limit: int) -> Any:
+    """중첩된 dict/list 안의 sources 목록을 앞에서 limit개로 (바뀐 부분만 새 객체)"""
+    if isinstance(value, list):
+        limited = [_limit_sources(item, limit) for item in value]
+        changed = any(a is not b for a, b in zip(limited, value))
+        return limited if changed else value
+    if not isinstance(value, dict):
+        return value
+    result = value
+    for key, item in value.items():
+        if key == "sources" and isinstance(item, list) and len(item) > limit:
+            new_item = item[:limit]
+        else:
+            new_item = _limit_sources(item, limit)
+        if new_item is not item:
+            if result is value:
+                result = dict(value)
+            result[key] = new_item
+    return result
+
+
+def _batch_results(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    """send_chat_batch / bucket_ids 업로드처럼 results[]에 항목별 result/error가 든 응답"""
+    results = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(results, list) or not results:
+        return None
+    if not all(
+        isinstance(r, dict) and ("result" in r or "error" in r) for r in results
+    ):
+        return None
+    if not any("result" in r for r in results):
+        return None
+    return results
+
+
+def project(payload: Any, fields: List[str] = None, max_sources: int = None) -> Any:
+    """
+    목록 응답이면 각 항목을, 아니면 가장 안쪽 레코드(답변 등)를 fields로 줄이고
+    sources는 앞에서 max_sources개만 남김. 원본(캐시에 공유된 객체)은 바꾸지 않는다.
+    일괄/팬아웃 응답은 봉투가 아니라 항목마다의 result에 적용한다.
+    """
+    results = _batch_results(payload)
+    if results is not None:
+        return {
+            **payload,
+            "results": [
+                {**r, "result": project(r["result"], fields, max_sources)}
+                if "result" in r
+                else r
+                for r in results
+            ],
+        }
+    if max_sources:
+        payload = _limit_sources(payload, max_sources)
+    if fields:
+        container, key = find_items(payload)
+        if container is not None:
+            payload = replace_items(
+                payload, [_pick(item, fields) for item in container[key]]
+            )
+        else:
+            path = _record_path(payload)
+            if path:
+                payload = _replace_record(payload, _pick(path[-1], fields))
+    return payload
+
+
+# ----------------------------------------------------------------------------
+# 크기 제한 + 이어받기
+# ----------------------------------------------------------------------------
+class OutputCursors:
+    """잘린 결과 원본을 cursor id로 보관 (LRU + TTL, API 키별로 분리)"""
+
+    def __init__(self, maxsize: int = _CURSOR_MAX, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, Tuple[float, Tuple, Any]] = OrderedDict()
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+
+    def put(self, owner: Tuple, value: Any) -> str:
+        cursor_id = secrets.token_urlsafe(12)
+        self._data[cursor_id] = (time.monotonic(), owner, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        self.created += 1
+        return cursor_id
+
+    def get(self, owner: Tuple, cursor_id: str) -> Any:
+        entry = self._data.get(cursor_id)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._data[cursor_id]
+            entry = None
+        if entry is None or entry[1] != owner:
+            self.expired += 1
+            raise ValueError("output_cursor has expired or is unknown")
+        self._data.move_to_end(cursor_id)
+        self.resumed += 1
+        return entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "created": self.created,
+            "resumed": self.resumed,
+            "expired": self.expired,
+        }
+
+
+output_cursors = OutputCursors(
+    ttl=float(os.getenv("STORM_OUTPUT_CURSOR_TTL", "600")),
+)
+
+
+def _fit_items(payload: Any, items: List[Any], start: int, max_chars: int):
+    """start부터 max_chars 안에 들어가는 최대 항목 수 (이진 탐색, 최소 1개)"""
+    low, high = 1, len(items) - start
+    best = encode(replace_items(payload, items[start : start + 1]))
+    count = 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        text = encode(replace_items(payload, items[start : start + mid]))
+        if len(text) <= max_chars:
+            low, best, count = mid, text, mid
+        else:
+            high = mid - 1
+    return best, count
+
+
+def _page(
+    owner: Tuple, cursor_id: str, value: Any, offset: int, max_chars: int
+) -> List[str]:
+    """
+    value를 offset부터 max_chars 안으로 잘라 [본문] 또는 [본문, 이어받기 안내]로 반환.
+    목록 응답은 항목 단위로 잘라 본문이 항상 올바른 JSON이 되고,
+    그 밖의 응답은 인코딩한 텍스트를 글자 단위로 잘라 {"partial_text": ...}로 감싼다.
+    """
+    container, key = find_items(value)
+    if isinstance(value, str) or container is None:
+        text = value if isinstance(value, str) else encode(value)
+        if offset == 0 and (not max_chars or len(text) <= max_chars):
+            return [text]
+        if cursor_id is None:
+            cursor_id = output_cursors.put(owner, text)
+        end = offset + max_chars if max_chars else len(text)
+        # 잘린 JSON을 그대로 보내면 파싱할 수 없으므로 문자열 필드로 감싼다
+        part = encode({"partial_text": text[offset:end]}, pretty=False)
+        return _with_notice([part], cursor_id, end, len(text), "chars")
+
+    items = container[key]
+    if offset == 0:
+        text = encode(value)
+        if not max_chars or len(text) <= max_chars:
+            return [text]
+    if not max_chars:
+        return [encode(replace_items(value, items[offset:]))]
+    text, count = _fit_items(value, items, offset, max_chars)
+    if offset + count >= len(items):
+        return [text]
+    if cursor_id is None:
+        cursor_id = output_cursors.put(owner, value)
+    return _with_notice([text], cursor_id, offset + count, len(items), "items")
+
+
+def _with_notice(
+    parts: List[str], cursor_id: str, next_offset: int, total: int, unit: str
+) -> List[str]:
+    if next_offset >= total:
+        return parts
+    notice = {
+        "truncated": True,
+        "unit": unit,
+        "returned_until": next_offset,
+        "total": total,
+        "output_cursor": f"{cursor_id}:{next_offset}",
+        "hint": "같은 툴을 output_cursor 인자로 다시 호출하면 이어서 받습니다",
+    }
+    return parts + [encode(notice, pretty=False)]
+
+
+def _owner(api_key: str, tool: str) -> Tuple:
+    return make_cache_key(api_key, tool)
+
+
+def _max_chars(tool: str, arguments: Dict[str, Any]) -> int:
+    value = arguments.get("max_output_chars")
+    if value is None:
+        value = int(_env("STORM_OUTPUT_MAX_CHARS", tool, "100000"))
+    return max(0, value)
+
+
+def render(tool: str, data: Any, arguments: Dict[str, Any], api_key: str) -> List[str]:
+    """툴 결과 → TextContent로 보낼 문자열 목록"""
+    fields = arguments.get("fields")
+    if fields is None:
+        raw = _env("STORM_OUTPUT_FIELDS", tool, "")
+        fields = [f.strip() for f in raw.split(",") if f.strip()]
+    max_sources = arguments.get("max_sources")
+    if max_sources is None:
+        max_sources = int(_env("STORM_OUTPUT_MAX_SOURCES", tool, "0"))
+
+    data = project(data, fields, max_sources)
+    return _page(_owner(api_key, tool), None, data, 0, _max_chars(tool, arguments))
+
+
+def resume(tool: str, arguments: Dict[str, Any], api_key: str) -> List[str]:
+    """output_cursor로 잘린 결과의 다음 부분을 반환 (upstream 재호출 없음)"""
+    cursor_id, _, offset = arguments["output_cursor"].rpartition(":")
+    if not cursor_id or not offset.isdigit():
+        raise ValueError("output_cursor is malformed")
+    owner = _owner(api_key, tool)
+    value = output_cursors.get(owner, cursor_id)
+    return _page(owner, cursor_id, value, int(offset), _max_chars(tool, arguments))
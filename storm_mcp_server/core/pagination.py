@@ -0,0 +1,100 @@
+import copy
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# 목록 응답 봉투(envelope) 형태가 엔드포인트/버전마다 조금씩 달라서 흔한 키를 순서대로 확인
+_ITEM_KEYS = ("data", "items", "content", "list", "agents", "buckets", "results")
+_TOTAL_KEYS = ("total", "totalCount", "totalElements", "totalItems", "count")
+_PAGE_KEYS = ("page", "pageNumber", "currentPage")
+_SIZE_KEYS = ("size", "pageSize", "limit")
+_TOTAL_PAGES_KEYS = ("totalPages", "pageCount")
+
+
+def _containers(payload: Any):
+    """payload 자신과 payload["data"] (dict인 경우) 순서로 반환"""
+    if isinstance(payload, dict):
+        yield payload
+        inner = payload.get("data")
+        if isinstance(inner, dict):
+            yield from _containers(inner)
+
+
+def find_items(payload: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """목록이 들어 있는 (dict, key)를 찾음"""
+    for container in _containers(payload):
+        for key in _ITEM_KEYS:
+            if isinstance(container.get(key), list):
+                return container, key
+    return None, None
+
+
+def _find_int(payload: Any, keys) -> Optional[int]:
+    for container in _containers(payload):
+        for key in keys:
+            value = container.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+
+def page_info(payload: Any, requested_size: int = None) -> Dict[str, Optional[int]]:
+    """
+    첫 페이지 응답에서 (page, size, total, total_pages) 추정.
+    upstream이 페이지 크기를 줄여서 줄 수 있으므로 요청한 size보다 응답 값을 우선하고,
+    뒤에 항목이 더 있는데 덜 찬 페이지가 왔으면 실제 받은 개수를 페이지 크기로 본다.
+    """
+    container, key = find_items(payload)
+    items = container[key] if container else []
+    page = _find_int(payload, _PAGE_KEYS)
+    size = _find_int(payload, _SIZE_KEYS) or requested_size
+    total = _find_int(payload, _TOTAL_KEYS)
+    if items and (
+        size is None or (len(items) < size and total is not None and total > len(items))
+    ):
+        size = len(items)
+    total_pages = _find_int(payload, _TOTAL_PAGES_KEYS)
+    if total_pages is None and total is not None and size:
+        total_pages = math.ceil(total / size)
+    return {"page": page, "size": size, "total": total, "total_pages": total_pages}
+
+
+def merge_pages(first: Any, pages: List[Any]) -> Any:
+    """
+    첫 페이지 봉투를 유지하고 목록만 전체 페이지 항목으로 교체.
+    병합 결과에 맞지 않는 page/size/totalPages는 지우고 total만 남긴다.
+    """
+    merged = copy.deepcopy(first)
+    container, key = find_items(merged)
+    if container is None:
+        return merged
+    for payload in pages:
+        page_container, page_key = find_items(payload)
+        if page_container is not None:
+            container[key].extend(page_container[page_key])
+    for node in _containers(merged):
+        for name in (*_PAGE_KEYS, *_SIZE_KEYS, *_TOTAL_PAGES_KEYS):
+            if name in node and not isinstance(node[name], (list, dict)):
+                del node[name]
+    return merged
+
+
+def replace_items(payload: Any, items: List[Any]) -> Any:
+    """봉투는 얕은 복사로 유지하고 목록만 items로 바꾼 새 payload (원본은 그대로)"""
+    container, key = find_items(payload)
+    if container is None:
+        return payload
+
+    def rebuild(node: Dict[str, Any]) -> Dict[str, Any]:
+        copied = dict(node)
+        if node is container:
+            copied[key] = items
+        else:
+            copied["data"] = rebuild(node["data"])
+        return copied
+
+    return rebuild(payload)
+
+
+def item_count(payload: Any) -> int:
+    container, key = find_items(payload)
+    return len(container[key]) if container else 0
@@ -0,0 +1,363 @@
+import asyncio
+import email.utils
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from storm_mcp_server.core.scheduler import scheduler
+
+# ----------------------------------------------------------------------------
+# Storm API 호출 복원력 계층 (재시도 / 서킷 브레이커 / 헤지 요청)
+#   - STORM_RETRY_ATTEMPTS     : 최대 시도 횟수, 1이면 재시도 없음 (기본 3)
+#   - STORM_RETRY_BASE_DELAY   : 지수 백오프 기본 대기(초) (기본 0.2)
+#   - STORM_RETRY_MAX_DELAY    : 백오프 최대 대기(초) (기본 5)
+#   - STORM_RETRY_AFTER_MAX    : 429 Retry-After가 이보다 길면 기다리지 않고 실패(초) (기본 30)
+#   - STORM_HEDGE_PERCENTILE   : GET 응답이 이 백분위 지연을 넘으면 같은 요청을
+#                                한 번 더 보냄 (예: 0.95), 0이면 비활성 (기본 0)
+#   - STORM_CIRCUIT_FAILURES   : 연속 실패 N회면 endpoint 차단, 0이면 비활성 (기본 5)
+#   - STORM_CIRCUIT_RESET      : 차단 후 시험 요청까지 대기(초) (기본 30)
+# 재시도/헤지 설정은 툴별로 덮어쓸 수 있다. 예) STORM_RETRY_ATTEMPTS_LIST_BUCKETS=5
+# ----------------------------------------------------------------------------
+_LATENCY_WINDOW = 256
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_after_max: float = 30.0
+    hedge_percentile: float = 0.0
+    hedge_min_samples: int = 20
+
+
+def _env(name: str, tool: Optional[str], default: str) -> str:
+    if tool:
+        value = os.getenv(f"{name}_{tool.upper()}")
+        if value is not None:
+            return value
+    return os.getenv(name, default)
+
+
+_policies: Dict[Optional[str], ResiliencePolicy] = {}
+
+
+def get_policy(tool: str = None) -> ResiliencePolicy:
+    """툴별 정책 (툴 전용 환경변수 → 전역 환경변수 → 기본값 순)"""
+    policy = _policies.get(tool)
+    if policy is None:
+        policy = _policies[tool] = ResiliencePolicy(
+            attempts=max(1, int(_env("STORM_RETRY_ATTEMPTS", tool, "3"))),
+            base_delay=float(_env("STORM_RETRY_BASE_DELAY", tool, "0.2")),
+            max_delay=float(_env("STORM_RETRY_MAX_DELAY", tool, "5")),
+            retry_after_max=float(_env("STORM_RETRY_AFTER_MAX", tool, "30")),
+            hedge_percentile=float(_env("STORM_HEDGE_PERCENTILE", tool, "0")),
+        )
+    return policy
+
+
+# 현재 처리 중인 툴의 정책 (handle_call_tool에서 설정, 하위 태스크로 전파됨)
+_current_policy: ContextVar[Optional[ResiliencePolicy]] = ContextVar(
+    "storm_resilience_policy", default=None
+)
+
+
+def use_tool_policy(tool: str) -> Token:
+    return _current_policy.set(get_policy(tool))
+
+
+def reset_tool_policy(token: Token) -> None:
+    _current_policy.reset(token)
+
+
+def current_policy() -> ResiliencePolicy:
+    return _current_policy.get() or get_policy()
+
+
+class CircuitOpenError(Exception):
+    """endpoint가 차단(open) 상태라 요청을 보내지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패 N회) → open → (reset_timeout 경과) → half_open
+    half_open에서는 시험 요청 1건만 통과시키고, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0 or self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def release(self) -> None:
+        """upstream 응답 없이 끝난 호출(취소, 로컬 오류) - 상태는 그대로 두고 시험 자리만 반납"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or (
+            self.failure_threshold > 0 and self.failures >= self.failure_threshold
+        ):
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class EndpointState:
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("STORM_CIRCUIT_FAILURES", "5")),
+            reset_timeout=float(os.getenv("STORM_CIRCUIT_RESET", "30")),
+        )
+        self.latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "short_circuited": self.short_circuited,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "circuit": self.breaker.state,
+            "circuit_opens": self.breaker.opens,
+            "p50_ms": ms(self.percentile(0.5)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+        }
+
+
+_endpoints: Dict[str, EndpointState] = {}
+
+
+def _endpoint_state(endpoint: str) -> EndpointState:
+    state = _endpoints.get(endpoint)
+    if state is None:
+        state = _endpoints[endpoint] = EndpointState()
+    return state
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """서버 측 장애(타임아웃/연결 실패/5xx/429)인지 - 4xx는 upstream 정상으로 간주"""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status is not None and (status >= 500 or status == 429)
+
+
+def _record_error(breaker: CircuitBreaker, exc: BaseException) -> None:
+    if _is_upstream_failure(exc):
+        breaker.record_failure()
+    elif getattr(exc, "status_code", None) is not None:
+        # 4xx - upstream은 정상적으로 응답함
+        breaker.record_success()
+    else:
+        # 스케줄러 대기열 초과 등 upstream에 닿지 않은 오류는 성공/실패로 세지 않음
+        breaker.release()
+
+
+def is_retryable(exc: BaseException, idempotent: bool) -> bool:
+    # 연결 자체가 안 된 경우와 429(처리 전에 거절)는 요청이 반영되지 않았으므로 항상 재시도 가능
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return idempotent and _is_upstream_failure(exc)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜) → 기다릴 시간(초)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _throttled_for(endpoint: str, exc: BaseException) -> Optional[float]:
+    """429 응답이면 Retry-After만큼 스케줄러에서 endpoint를 멈추고 그 시간을 반환"""
+    if getattr(exc, "status_code", None) != 429:
+        return None
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        scheduler.defer(endpoint, retry_after)
+    return retry_after
+
+
+def backoff_delay(policy: ResiliencePolicy, attempt: int) -> float:
+    """full jitter 지수 백오프: [0, min(max, base * 2^attempt)]"""
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2**attempt))
+
+
+async def _hedged(fn: Callable[[], Awaitable[Any]], state: EndpointState, p: float):
+    threshold = state.percentile(p)
+    tasks = [asyncio.ensure_future(fn())]
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=threshold)
+        if done:
+            return tasks[0].result()
+
+        state.hedges += 1
+        tasks.append(asyncio.ensure_future(fn()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is tasks[1]:
+                        state.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # 먼저 끝난 쪽을 사용하고 나머지(또는 호출 취소 시 전부)는 취소
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def resilient_call(
+    endpoint: str,
+    fn: Callable[[], Awaitable[Any]],
+    idempotent: bool = True,
+    hedge: bool = False,
+) -> Any:
+    """
+    fn()을 현재 툴 정책에 따라 호출.
+    - 재시도: 재시도 가능한 오류면 jitter 지수 백오프 후 다시 시도
+      (429면 Retry-After 이상 기다리고, 같은 endpoint의 다른 요청도 스케줄러에서 멈춤)
+    - 서킷 브레이커: endpoint가 open이면 요청 없이 CircuitOpenError
+    - 헤지: hedge=True이고 지연 표본이 충분하면 백분위 지연 초과 시 중복 요청
+    """
+    policy = current_policy()
+    state = _endpoint_state(endpoint)
+    for attempt in range(policy.attempts):
+        if not state.breaker.allow():
+            state.short_circuited += 1
+            raise CircuitOpenError(
+                f"Circuit open for {endpoint} (upstream failing, retry later)"
+            )
+        state.calls += 1
+        started_at = time.perf_counter()
+        try:
+            if (
+                hedge
+                and policy.hedge_percentile > 0
+                and len(state.latencies) >= policy.hedge_min_samples
+            ):
+                result = await _hedged(fn, state, policy.hedge_percentile)
+            else:
+                result = await fn()
+        except Exception as e:
+            state.failures += 1
+            _record_error(state.breaker, e)
+            retry_after = _throttled_for(endpoint, e)
+            if attempt + 1 >= policy.attempts or not is_retryable(e, idempotent):
+                raise
+            delay = backoff_delay(policy, attempt)
+            if retry_after is not None:
+                if retry_after > policy.retry_after_max:
+                    raise
+                # 서버가 알려준 시간보다 먼저 다시 보내지 않음
+                delay = max(delay, retry_after)
+            state.retries += 1
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # 취소된 시험 요청이 half_open 자리를 계속 잡고 있지 않도록
+            state.breaker.release()
+            raise
+        state.breaker.record_success()
+        state.latencies.append(time.perf_counter() - started_at)
+        return result
+
+
+@asynccontextmanager
+async def circuit_guard(endpoint: str):
+    """
+    재시도할 수 없는 호출(스트리밍 응답, 1회용 업로드 본문)용 - 서킷 브레이커만 적용
+    """
+    state = _endpoint_state(endpoint)
+    if not state.breaker.allow():
+        state.short_circuited += 1
+        raise CircuitOpenError(
+            f"Circuit open for {endpoint} (upstream failing, retry later)"
+        )
+    state.calls += 1
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        state.failures += 1
+        _record_error(state.breaker, e)
+        _throttled_for(endpoint, e)
+        raise
+    except BaseException:
+        state.breaker.release()
+        raise
+    state.breaker.record_success()
+    state.latencies.append(time.perf_counter() - started_at)
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {
+        "policies": {
+            tool or "default": asdict(policy) for tool, policy in _policies.items()
+        },
+        "endpoints": {name: state.stats() for name, state in _endpoints.items()},
+    }
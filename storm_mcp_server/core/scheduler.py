@@ -0,0 +1,340 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+
+from storm_mcp_server.core.metrics import metrics
+
+# ----------------------------------------------------------------------------
+# upstream 요청 스케줄러 (우선순위 + endpoint별 token bucket + 부하 차단)
+#   - STORM_UPSTREAM_CONCURRENCY   : 전체 동시 upstream 요청 수 (기본 64)
+#   - STORM_SCHEDULER_QUEUE_SIZE   : 우선순위별 대기열 크기, 가득 차면 즉시 실패 (기본 256)
+#                                    예) STORM_SCHEDULER_QUEUE_SIZE_BULK=32
+#   - STORM_RATE_LIMIT             : endpoint별 초당 요청 수, 0이면 제한 없음 (기본 0)
+#   - STORM_RATE_BURST             : 한 번에 몰아 보낼 수 있는 요청 수 (기본 rate와 같음)
+#   - STORM_RATE_LIMITS            : endpoint별 덮어쓰기 "endpoint=rate[:burst];..."
+#                                    예) "POST /api/v2/answer=5:10;POST /api/v2/documents/by-file=2"
+#   - STORM_PRIORITY_<TOOL>        : 툴의 우선순위 클래스 (interactive|listing|bulk)
+# 슬롯이나 토큰이 모자라면 interactive(채팅) → listing(조회) → bulk(업로드/일괄) 순으로
+# 먼저 보낸다. 429의 Retry-After를 받으면 그 endpoint는 그동안 보내지 않는다.
+# tenant를 넘기면 테넌트별 동시 요청 제한(running < concurrency)도 슬롯을 줄 때 확인한다.
+# 제한에 걸린 테넌트의 요청은 건너뛰고 다른 요청을 먼저 보내며, 기다리는 동안에는
+# 아무 슬롯도 잡지 않는다.
+# ----------------------------------------------------------------------------
+PRIORITIES = ("interactive", "listing", "bulk")
+
+_DEFAULT_PRIORITIES = {
+    "send_nonstream_chat": "interactive",
+    "send_stream_chat": "interactive",
+    "send_chat_batch": "bulk",
+    "upload_document_by_file": "bulk",
+    "upload_documents_by_directory": "bulk",
+}
+
+metrics.describe("storm_scheduler_queue_depth", "Upstream requests waiting for a slot")
+metrics.describe("storm_scheduler_wait_seconds", "Time spent waiting for a slot")
+metrics.describe(
+    "storm_scheduler_shed_total", "Upstream requests rejected (queue full)"
+)
+metrics.describe("storm_scheduler_active", "Upstream requests holding a slot")
+
+
+class SchedulerOverloadedError(Exception):
+    """대기열이 가득 차서 요청을 보내지 않고 바로 실패 (잠시 후 다시 시도)"""
+
+
+def priority_for(tool: str) -> str:
+    priority = os.getenv(f"STORM_PRIORITY_{tool.upper()}") or _DEFAULT_PRIORITIES.get(
+        tool, "listing"
+    )
+    return priority if priority in PRIORITIES else "listing"
+
+
+# 현재 처리 중인 툴의 우선순위 (handle_call_tool에서 설정, 하위 태스크로 전파됨)
+_current_priority: ContextVar[Optional[str]] = ContextVar(
+    "storm_scheduler_priority", default=None
+)
+
+
+def use_tool_priority(tool: str) -> Token:
+    return _current_priority.set(priority_for(tool))
+
+
+def reset_tool_priority(token: Token) -> None:
+    _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get() or "listing"
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 모이는 토큰 (rate 0이면 제한 없음)"""
+
+    def __init__(self, rate: float = 0.0, burst: float = 0.0):
+        self.rate = rate
+        self.burst = max(1.0, burst or rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, now: float) -> float:
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (0이면 바로 가능)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate > 0:
+            self.tokens -= 1
+
+    def defer(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class _Waiter:
+    __slots__ = ("endpoint", "tenant", "future")
+
+    def __init__(self, endpoint: str, tenant: Any, future: asyncio.Future):
+        self.endpoint = endpoint
+        self.tenant = tenant
+        self.future = future
+
+
+def _parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    limits = {}
+    for entry in spec.split(";"):
+        endpoint, _, value = entry.rpartition("=")
+        if not endpoint.strip() or not value.strip():
+            continue
+        rate, _, burst = value.partition(":")
+        limits[endpoint.strip()] = (float(rate), float(burst or 0))
+    return limits
+
+
+class UpstreamScheduler:
+    def __init__(
+        self,
+        concurrency: int = 64,
+        queue_sizes: Dict[str, int] = None,
+        rate: float = 0.0,
+        burst: float = 0.0,
+        rate_limits: Dict[str, Tuple[float, float]] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.queue_sizes = {**{p: 256 for p in PRIORITIES}, **(queue_sizes or {})}
+        self.rate = rate
+        self.burst = burst
+        self.rate_limits = rate_limits or {}
+        self.active = 0
+        self._queues: Dict[str, deque] = {p: deque() for p in PRIORITIES}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = math.inf
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.shed = {p: 0 for p in PRIORITIES}
+        self.waited = {p: 0.0 for p in PRIORITIES}
+        self.deferrals = 0
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            rate, burst = self.rate_limits.get(endpoint, (self.rate, self.burst))
+            bucket = self._buckets[endpoint] = TokenBucket(rate, burst)
+        return bucket
+
+    def defer(self, endpoint: str, seconds: float) -> None:
+        """429 Retry-After 동안 이 endpoint로는 보내지 않음"""
+        self._bucket(endpoint).defer(seconds)
+        self.deferrals += 1
+
+    def _try_grant(self, endpoint: str, now: float, tenant: Any = None):
+        """
+        슬롯과 토큰을 잡으면 0, 아니면 다시 볼 때까지 기다릴 시간.
+        테넌트 제한에 걸리면 None (그 테넌트 요청이 끝날 때 다시 봄)
+        """
+        if self.active >= self.concurrency:
+            return math.inf
+        if tenant is not None and tenant.running >= tenant.concurrency:
+            return None
+        bucket = self._bucket(endpoint)
+        delay = bucket.delay(now)
+        if delay > 0:
+            return delay
+        bucket.take()
+        self._set_active(1)
+        if tenant is not None:
+            tenant.running += 1
+        return 0.0
+
+    def _set_active(self, delta: int) -> None:
+        self.active += delta
+        if metrics.enabled:
+            metrics.gauge_add("storm_scheduler_active", (), delta)
+
+    def _queue_gauge(self, priority: str, delta: int) -> None:
+        if metrics.enabled:
+            metrics.gauge_add(
+                "storm_scheduler_queue_depth", (("priority", priority),), delta
+            )
+
+    def _dispatch(self) -> None:
+        """우선순위 순서대로 보낼 수 있는 대기 요청을 깨움"""
+        now = time.monotonic()
+        retry_in = math.inf
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            for waiter in list(queue):
+                if waiter.future.done():
+                    # 기다리다 취소된 요청
+                    queue.remove(waiter)
+                    self._queue_gauge(priority, -1)
+                    continue
+                delay = self._try_grant(waiter.endpoint, now, waiter.tenant)
+                if delay is None:
+                    continue
+                if delay == math.inf:
+                    break
+                if delay > 0:
+                    retry_in = min(retry_in, delay)
+                    continue
+                queue.remove(waiter)
+                self._queue_gauge(priority, -1)
+                waiter.future.set_result(None)
+            if self.active >= self.concurrency:
+                break
+        if retry_in < math.inf:
+            self._wake_after(retry_in)
+
+    def _wake_after(self, delay: float) -> None:
+        # 토큰이 채워지거나 Retry-After가 끝나는 시점에 다시 dispatch
+        at = time.monotonic() + delay
+        if self._timer is not None and self._timer_at <= at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = at
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._timer_at = math.inf
+        self._dispatch()
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues[p] for p in PRIORITIES)
+
+    async def _admit(self, endpoint: str, priority: str, tenant: Any = None) -> None:
+        started = time.monotonic()
+        # 기다리는 요청이 없으면 대기열을 거치지 않음
+        if not self._has_waiters() and self._try_grant(endpoint, started, tenant) == 0:
+            self.admitted[priority] += 1
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_sizes[priority]:
+            self.shed[priority] += 1
+            if metrics.enabled:
+                metrics.inc("storm_scheduler_shed_total", (("priority", priority),))
+            raise SchedulerOverloadedError(
+                f"Upstream queue for {priority} requests is full "
+                f"({len(queue)} waiting), retry later"
+            )
+
+        waiter = _Waiter(endpoint, tenant, asyncio.get_running_loop().create_future())
+        queue.append(waiter)
+        self._queue_gauge(priority, 1)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 슬롯을 받은 직후 취소됨 → 바로 반납
+                self._release(tenant)
+            elif waiter in queue:
+                queue.remove(waiter)
+                self._queue_gauge(priority, -1)
+            raise
+
+        waited = time.monotonic() - started
+        self.admitted[priority] += 1
+        self.waited[priority] += waited
+        if metrics.enabled:
+            metrics.observe(
+                "storm_scheduler_wait_seconds", (("priority", priority),), waited
+            )
+
+    def _release(self, tenant: Any = None) -> None:
+        self._set_active(-1)
+        if tenant is not None:
+            tenant.running -= 1
+        if self._has_waiters():
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str, priority: str = None, tenant: Any = None):
+        """
+        endpoint로 요청 하나를 보내는 동안 슬롯을 잡음 (대기열이 가득 차면 실패).
+        tenant: running/concurrency 속성을 가진 테넌트 컨텍스트 (core/tenants.py)
+        """
+        await self._admit(endpoint, priority or current_priority(), tenant)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "deferrals": self.deferrals,
+            "priorities": {
+                p: {
+                    "waiting": len(self._queues[p]),
+                    "queue_size": self.queue_sizes[p],
+                    "admitted": self.admitted[p],
+                    "shed": self.shed[p],
+                    "avg_wait_ms": round(
+                        self.waited[p] * 1000 / max(1, self.admitted[p]), 1
+                    ),
+                }
+                for p in PRIORITIES
+            },
+            "endpoints": {
+                name: {
+                    "rate": bucket.rate,
+                    "burst": bucket.burst,
+                    "tokens": round(bucket.tokens, 2) if bucket.rate > 0 else None,
+                    "blocked_for": round(max(0.0, bucket.blocked_until - now), 3),
+                }
+                for name, bucket in self._buckets.items()
+            },
+        }
+
+
+def _queue_sizes() -> Dict[str, int]:
+    default = os.getenv("STORM_SCHEDULER_QUEUE_SIZE", "256")
+    return {
+        p: int(os.getenv(f"STORM_SCHEDULER_QUEUE_SIZE_{p.upper()}", default))
+        for p in PRIORITIES
+    }
+
+
+scheduler = UpstreamScheduler(
+    concurrency=int(os.getenv("STORM_UPSTREAM_CONCURRENCY", "64")),
+    queue_sizes=_queue_sizes(),
+    rate=float(os.getenv("STORM_RATE_LIMIT", "0")),
+    burst=float(os.getenv("STORM_RATE_BURST", "0")),
+    rate_limits=_parse_rate_limits(os.getenv("STORM_RATE_LIMITS", "")),
+)
@@ -0,0 +1,86 @@
+from typing import Any, Callable, Dict, List
+
+# inputSchema에서 실제로 쓰는 JSON Schema 부분집합만 지원
+# (type / properties / required / items / enum)
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+Validator = Callable[[Any, str], None]
+
+
+class SchemaError(ValueError):
+    """툴 인자가 inputSchema와 맞지 않음"""
+
+
+def _compile_type(expected: str) -> Validator:
+    py_type = _TYPES[expected]
+    numeric = expected in ("integer", "number")
+
+    def check(value: Any, path: str) -> None:
+        # bool은 int의 하위 타입이므로 숫자 타입에서는 따로 거른다
+        if not isinstance(value, py_type) or (numeric and isinstance(value, bool)):
+            raise SchemaError(f"{path} must be {expected}")
+
+    return check
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    스키마를 한 번만 해석해서 검증 함수(클로저)로 변환.
+    호출 시에는 스키마 dict를 다시 탐색하지 않는다.
+    """
+    checks: List[Validator] = []
+
+    if "type" in schema:
+        checks.append(_compile_type(schema["type"]))
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value: Any, path: str) -> None:
+            if value not in allowed:
+                raise SchemaError(f"{path} must be one of {allowed}")
+
+        checks.append(check_enum)
+
+    if "properties" in schema or "required" in schema:
+        properties = {
+            name: compile_schema(sub)
+            for name, sub in schema.get("properties", {}).items()
+        }
+        required = tuple(schema.get("required", ()))
+
+        def check_object(value: Any, path: str) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if value.get(name) is None:
+                    raise SchemaError(f"{path}.{name} is required")
+            for name, item in value.items():
+                # 옵션 인자에 null을 보내는 클라이언트가 있어 생략과 동일하게 취급
+                if item is not None and name in properties:
+                    properties[name](item, f"{path}.{name}")
+
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_check = compile_schema(schema["items"])
+
+        def check_items(value: Any, path: str) -> None:
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]")
+
+        checks.append(check_items)
+
+    def validate(value: Any, path: str = "arguments") -> None:
+        for check in checks:
+            check(value, path)
+
+    return validate
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 upstream 호출로 합친다.
+    - 첫 호출이 태스크를 만들고, 진행 중에 들어온 같은 키의 호출은 그 결과(또는 예외)를 공유
+    - 완료되면 키를 지우므로 캐시와 달리 이후 호출은 항상 새로 실행
+    - 기다리는 호출이 모두 취소된 경우에만 실제 태스크도 취소
+    """
+
+    def __init__(self):
+        # key -> [태스크, 기다리는 호출 수]
+        self._flights: Dict[Hashable, List] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
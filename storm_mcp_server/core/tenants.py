@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Set
+
+import httpx
+
+from storm_mcp_server.core.cache import make_cache_key, metadata_cache
+from storm_mcp_server.core.metrics import metrics
+
+# ----------------------------------------------------------------------------
+# API 키(테넌트)별 upstream 호출 컨텍스트
+#   - STORM_TENANT_MAX_CLIENTS : 동시에 유지할 테넌트 수, 넘으면 LRU로 정리 (기본 64)
+#   - STORM_TENANT_IDLE_TTL    : 이 시간(초) 동안 호출이 없던 테넌트는 정리 (기본 600)
+#   - STORM_TENANT_CONCURRENCY : 테넌트별 동시 upstream 요청 수, 넘으면 대기 (기본 32)
+# 테넌트마다 keep-alive 커넥션 풀(STORM_HTTP_* 설정)과 동시 요청 제한을 따로 가지므로
+# 한 키의 폭주가 다른 키의 커넥션/슬롯을 빼앗지 않는다. 동시 요청 제한은 스케줄러가
+# 슬롯을 줄 때 함께 확인하므로(scheduler.slot(tenant=...)), 대기 중인 요청은 테넌트
+# 슬롯을 잡고 있지 않고 같은 테넌트 안에서도 우선순위가 지켜진다. 캐시는 키 해시로 구분되고,
+# 테넌트를 정리할 때 해당 키의 메타데이터 캐시도 함께 비운다.
+# 요청을 처리 중(대기 포함)인 테넌트는 정리하지 않는다.
+# ----------------------------------------------------------------------------
+metrics.describe("storm_tenants", "Tenant client contexts currently open")
+metrics.describe("storm_tenant_evictions_total", "Tenant client contexts evicted")
+
+
+class TenantContext:
+    """API 키 하나의 커넥션 풀 + 동시 요청 제한"""
+
+    def __init__(self, key_hash: str, client: httpx.AsyncClient, concurrency: int):
+        self.key_hash = key_hash
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.running = 0  # 스케줄러 슬롯을 받아 upstream에 보내고 있는 요청 수
+        self.active = 0  # 보내고 있거나 슬롯을 기다리는 요청 수 (정리 대상에서 제외)
+        self.requests = 0
+        self.last_used = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenant": self.key_hash[:8],
+            "active": self.active,
+            "running": self.running,
+            "requests": self.requests,
+            "idle": round(time.monotonic() - self.last_used, 3),
+        }
+
+
+class TenantPool:
+    def __init__(
+        self,
+        client_factory: Callable[[], httpx.AsyncClient],
+        maxsize: int = 64,
+        idle_ttl: float = 600.0,
+        concurrency: int = 32,
+    ):
+        self.client_factory = client_factory
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.concurrency = concurrency
+        self._tenants: OrderedDict[str, TenantContext] = OrderedDict()
+        self._closing: Set[asyncio.Task] = set()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, api_key: str) -> TenantContext:
+        """테넌트 컨텍스트 반환 (없으면 생성, 오래 안 쓴 다른 테넌트는 정리)"""
+        key_hash = make_cache_key(api_key, "")[0]
+        tenant = self._tenants.get(key_hash)
+        if tenant is None:
+            tenant = TenantContext(key_hash, self.client_factory(), self.concurrency)
+            self._tenants[key_hash] = tenant
+            self.created += 1
+            if metrics.enabled:
+                metrics.gauge_add("storm_tenants", (), 1)
+        self._tenants.move_to_end(key_hash)
+        tenant.last_used = time.monotonic()
+        self._evict(keep=key_hash)
+        return tenant
+
+    @asynccontextmanager
+    async def acquire(self, api_key: str) -> AsyncIterator[TenantContext]:
+        """
+        요청 하나 동안 테넌트를 정리 대상에서 빼고 넘겨줌 (기다리지 않음).
+        동시 요청 제한은 scheduler.slot(endpoint, tenant=...)에서 적용한다.
+        """
+        # get과 active 증가 사이에 await가 없어야 대기 중에 정리되지 않음
+        tenant = self.get(api_key)
+        tenant.active += 1
+        tenant.requests += 1
+        try:
+            yield tenant
+        finally:
+            tenant.active -= 1
+            tenant.last_used = time.monotonic()
+
+    def _evict(self, keep: str) -> None:
+        now = time.monotonic()
+        # OrderedDict 앞쪽이 가장 오래 안 쓴 테넌트
+        for key_hash, tenant in list(self._tenants.items()):
+            if key_hash == keep or tenant.active:
+                continue
+            if (
+                len(self._tenants) > self.maxsize
+                or now - tenant.last_used > self.idle_ttl
+            ):
+                self._drop(key_hash)
+
+    def _drop(self, key_hash: str) -> None:
+        tenant = self._tenants.pop(key_hash)
+        metadata_cache.invalidate(lambda k: k[0] == key_hash)
+        self.evicted += 1
+        if metrics.enabled:
+            metrics.gauge_add("storm_tenants", (), -1)
+            metrics.inc("storm_tenant_evictions_total", ())
+        task = asyncio.get_running_loop().create_task(tenant.client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def close_all(self) -> None:
+        """서버 종료 시 모든 테넌트의 커넥션 풀 정리"""
+        tenants = list(self._tenants.values())
+        self._tenants.clear()
+        if metrics.enabled and tenants:
+            metrics.gauge_add("storm_tenants", (), -len(tenants))
+        for tenant in tenants:
+            await tenant.client.aclose()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenants": len(self._tenants),
+            "maxsize": self.maxsize,
+            "idle_ttl": self.idle_ttl,
+            "concurrency": self.concurrency,
+            "created": self.created,
+            "evicted": self.evicted,
+            # 최근에 쓴 테넌트부터 (API 키 원문 대신 해시 앞부분만)
+            "clients": [t.stats() for t in reversed(self._tenants.values())],
+        }
+
+
+def create_tenant_pool(
+    client_factory: Callable[[], httpx.AsyncClient],
+) -> TenantPool:
+    return TenantPool(
+        client_factory,
+        maxsize=int(os.getenv("STORM_TENANT_MAX_CLIENTS", "64")),
+        idle_ttl=float(os.getenv("STORM_TENANT_IDLE_TTL", "600")),
+        concurrency=int(os.getenv("STORM_TENANT_CONCURRENCY", "32")),
+    )
@@ -0,0 +1,255 @@
+import asyncio
+import base64
+import contextlib
+import dataclasses
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+# ----------------------------------------------------------------------------
+# 메모리 사용량이 문서 크기와 무관하도록 업로드 본문을 조각 단위로 생성
+#   - STORM_UPLOAD_CHUNK_SIZE : 한 번에 읽고/디코딩할 바이트 수 (기본 1 MiB)
+#   - STORM_UPLOAD_MAX_BYTES  : 업로드 허용 최대 크기 (기본 512 MiB, 0이면 무제한)
+#   - STORM_UPLOAD_SHARED_MEMORY_MAX : 여러 버킷 업로드 시 base64 디코딩 결과를 메모리에
+#                                      둘 최대 크기, 넘으면 임시 파일 + mmap (기본 32 MiB)
+# ----------------------------------------------------------------------------
+CHUNK_SIZE = int(os.getenv("STORM_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("STORM_UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+SHARED_MEMORY_MAX = int(
+    os.getenv("STORM_UPLOAD_SHARED_MEMORY_MAX", str(32 * 1024 * 1024))
+)
+
+_B64_WHITESPACE = (" ", "\t", "\r", "\n")
+
+
+def base64_decoded_size(b64_content: str) -> int:
+    """디코딩하지 않고 base64 문자열의 원본 바이트 수를 계산"""
+    length = len(b64_content) - sum(b64_content.count(c) for c in _B64_WHITESPACE)
+    tail = b64_content.rstrip("".join(_B64_WHITESPACE))[-2:]
+    return length // 4 * 3 - tail.count("=")
+
+
+def iter_base64_chunks(
+    b64_content: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """base64 문자열을 4글자 단위로 맞춰 잘라가며 조금씩 디코딩"""
+    # 디코딩 결과가 대략 chunk_size가 되도록 입력을 자름 (4의 배수)
+    step = max(4, chunk_size // 3 * 4)
+    pending = ""
+    for start in range(0, len(b64_content), step):
+        piece = b64_content[start : start + step]
+        if any(c in piece for c in _B64_WHITESPACE):
+            piece = "".join(piece.split())
+        piece = pending + piece
+        usable = len(piece) - len(piece) % 4
+        pending = piece[usable:]
+        if usable:
+            yield base64.b64decode(piece[:usable], validate=True)
+    if pending:
+        raise ValueError("Invalid base64 content: incorrect padding")
+
+
+async def aiter_file_chunks(
+    file_path: str, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """로컬 파일을 워커 스레드에서 조각 단위로 읽기 (이벤트 루프 블로킹 방지)"""
+    f = await asyncio.to_thread(open, file_path, "rb")
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def aiter_sync_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+        # 큰 base64 디코딩 중에도 다른 요청이 처리되도록 양보
+        await asyncio.sleep(0)
+
+
+async def aiter_buffer_chunks(
+    buffer: Any, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """이미 읽어 둔 버퍼(bytes 또는 mmap)를 조각 단위로 (디스크 읽기/디코딩 없음)"""
+    for start in range(0, len(buffer), chunk_size):
+        yield buffer[start : start + chunk_size]
+        await asyncio.sleep(0)
+
+
+def check_upload_size(size: int) -> None:
+    if MAX_UPLOAD_BYTES and size > MAX_UPLOAD_BYTES:
+        raise ValueError(
+            f"File too large: {size} bytes (max {MAX_UPLOAD_BYTES} bytes, "
+            "STORM_UPLOAD_MAX_BYTES)"
+        )
+
+
+def _quote_header_value(value: str) -> str:
+    return value.replace("\r", "%0D").replace("\n", "%0A").replace('"', "%22")
+
+
+@dataclass
+class MultipartBody:
+    """
+    multipart/form-data 본문을 한 번에 만들지 않고 조각 단위로 생성.
+    Content-Length를 미리 계산하므로 chunked 인코딩 없이 전송된다.
+    """
+
+    fields: Dict[str, str]
+    file_name: str
+    file_size: int
+    file_chunks: AsyncIterator[bytes]
+    file_content_type: str = "application/octet-stream"
+    boundary: str = field(default_factory=lambda: uuid.uuid4().hex)
+    bytes_sent: int = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _preamble(self) -> bytes:
+        parts = []
+        for name, value in self.fields.items():
+            parts.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{_quote_header_value(name)}"'
+                f"\r\n\r\n{value}\r\n"
+            )
+        parts.append(
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; '
+            f'filename="{_quote_header_value(self.file_name)}"\r\n'
+            f"Content-Type: {self.file_content_type}\r\n\r\n"
+        )
+        return "".join(parts).encode("utf-8")
+
+    def _epilogue(self) -> bytes:
+        return f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_length(self) -> int:
+        return len(self._preamble()) + self.file_size + len(self._epilogue())
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._preamble()
+        async for chunk in self.file_chunks:
+            self.bytes_sent += len(chunk)
+            if self.bytes_sent > self.file_size:
+                raise ValueError("File grew while uploading")
+            yield chunk
+        yield self._epilogue()
+
+
+@dataclass
+class UploadSource:
+    """업로드할 파일 (로컬 경로 또는 base64 문자열)"""
+
+    file_name: str
+    size: int
+    file_path: Optional[str] = None
+    b64_content: Optional[str] = None
+    # 지정하면 전송하는 조각으로 해시를 함께 계산 (추가 읽기 없음)
+    hasher: Any = None
+    # shared_source()가 채우는 공유 버퍼 (bytes 또는 mmap)
+    buffer: Any = None
+
+    @classmethod
+    async def from_path(cls, file_path: str) -> "UploadSource":
+        size = (await asyncio.to_thread(os.stat, file_path)).st_size
+        return cls(
+            file_name=os.path.basename(file_path), size=size, file_path=file_path
+        )
+
+    @classmethod
+    def from_base64(cls, b64_content: str, file_name: str) -> "UploadSource":
+        return cls(
+            file_name=file_name,
+            size=base64_decoded_size(b64_content),
+            b64_content=b64_content,
+        )
+
+    def chunks(self) -> AsyncIterator[bytes]:
+        if self.buffer is not None:
+            chunks = aiter_buffer_chunks(self.buffer)
+        elif self.file_path is not None:
+            chunks = aiter_file_chunks(self.file_path)
+        else:
+            chunks = aiter_sync_chunks(iter_base64_chunks(self.b64_content))
+        if self.hasher is None:
+            return chunks
+        return _aiter_hashed(chunks, self.hasher)
+
+
+def _load_shared_buffer(source: UploadSource, stack: contextlib.ExitStack) -> Any:
+    """원본을 한 번만 읽어서/디코딩해서 여러 업로드가 함께 읽을 버퍼로 (워커 스레드)"""
+    # mmap은 파일 디스크립터를 따로 잡으므로 매핑 후 파일은 바로 닫아도 됨
+    if source.file_path is not None:
+        with open(source.file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            # 페이지 캐시를 직접 읽으므로 버킷 수만큼 다시 read하지 않음
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return stack.enter_context(buffer)
+
+    if source.size <= SHARED_MEMORY_MAX:
+        return b"".join(iter_base64_chunks(source.b64_content))
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in iter_base64_chunks(source.b64_content):
+            tmp.write(chunk)
+        tmp.flush()
+        if tmp.tell() == 0:
+            return b""
+        buffer = mmap.mmap(tmp.fileno(), 0, access=mmap.ACCESS_READ)
+    return stack.enter_context(buffer)
+
+
+@contextlib.asynccontextmanager
+async def shared_source(source: UploadSource) -> AsyncIterator[UploadSource]:
+    """
+    같은 파일을 여러 버킷에 올릴 때 사용. 블록 안에서 만든 source의 chunks()는
+    공유 버퍼에서 읽으므로 동시에 여러 번 호출해도 된다.
+    """
+    with contextlib.ExitStack() as stack:
+        buffer = await asyncio.to_thread(_load_shared_buffer, source, stack)
+        yield dataclasses.replace(source, size=len(buffer), buffer=buffer, hasher=None)
+
+
+async def _aiter_hashed(chunks: AsyncIterator[bytes], hasher) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+
+
+def hash_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """파일 sha256 (워커 스레드에서 호출)"""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# 프로세스 전체 업로드 누적 통계 (운영용 리소스로 노출)
+upload_stats: Dict[str, Any] = {"uploads": 0, "bytes": 0, "seconds": 0.0}
+
+
+def record_upload(size: int, started_at: float) -> Dict[str, Any]:
+    """업로드 1건의 바이트/처리량을 기록하고 반환"""
+    elapsed = time.perf_counter() - started_at
+    upload_stats["uploads"] += 1
+    upload_stats["bytes"] += size
+    upload_stats["seconds"] += elapsed
+    return {
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        "throughputMBps": round(size / elapsed / 1e6, 3) if elapsed > 0 else None,
+    }
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import secrets
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from storm_mcp_server.core.cache import make_cache_key
+
+# ----------------------------------------------------------------------------
+# 내장 웹훅 수신기 (업로드 처리/답변 완료 콜백을 폴링 없이 기다리기)
+#   - STORM_WEBHOOK_PORT        : stdio 모드에서 수신기를 띄울 포트 (없으면 비활성)
+#   - STORM_WEBHOOK_HOST        : 수신기 바인드 주소 (기본 127.0.0.1)
+#   - STORM_WEBHOOK_PUBLIC_URL  : Storm이 호출할 외부 주소 (기본 http://<host>:<port>)
+#   - STORM_WEBHOOK_TTL         : 등록/결과 보관 시간(초) (기본 3600)
+# HTTP(SSE) 모드에서는 같은 서버의 POST /webhooks/{id} 로 받는다.
+# 툴 호출마다 추측할 수 없는 correlation ID를 만들어 webhookUrl에 넣고,
+# wait_for_completion 툴이 해당 콜백을 기다린다.
+# ----------------------------------------------------------------------------
+# 콜백 본문 최대 크기 (넘으면 413)
+MAX_WEBHOOK_BODY = 1024 * 1024
+# 이 상태로 온 콜백은 중간 경과로 보고 계속 기다림
+_PENDING_STATUSES = {"pending", "queued", "processing", "in_progress", "running"}
+
+
+def _status_of(payload: Any) -> Optional[str]:
+    for container in (
+        payload,
+        payload.get("data") if isinstance(payload, dict) else None,
+    ):
+        if isinstance(container, dict) and isinstance(container.get("status"), str):
+            return container["status"].lower()
+    return None
+
+
+class _Pending:
+    __slots__ = ("kind", "owner", "created", "future", "events")
+
+    def __init__(self, kind: str, owner: Tuple):
+        self.kind = kind
+        self.owner = owner
+        self.created = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.events: List[Any] = []
+
+
+class WebhookRegistry:
+    def __init__(self, ttl: float = 3600.0):
+        self.ttl = ttl
+        self.public_url: Optional[str] = None
+        self._pending: Dict[str, _Pending] = {}
+        self.registered = 0
+        self.delivered = 0
+        self.unmatched = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.public_url is not None
+
+    def configure(self, public_url: str) -> None:
+        self.public_url = public_url.rstrip("/")
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [
+            cid for cid, p in self._pending.items() if now - p.created > self.ttl
+        ]
+        for cid in expired:
+            pending = self._pending.pop(cid)
+            if not pending.future.done():
+                pending.future.cancel()
+
+    def register(self, kind: str, api_key: str) -> Tuple[str, str]:
+        """correlation ID와 이 ID로 콜백을 받을 webhookUrl 반환"""
+        if not self.enabled:
+            raise RuntimeError(
+                "Webhook listener is disabled (set STORM_WEBHOOK_PORT or use sse mode)"
+            )
+        self._prune()
+        correlation_id = secrets.token_urlsafe(16)
+        self._pending[correlation_id] = _Pending(kind, make_cache_key(api_key, kind))
+        self.registered += 1
+        return correlation_id, f"{self.public_url}/webhooks/{correlation_id}"
+
+    def unregister(self, correlation_id: Optional[str]) -> None:
+        """요청이 실패해서 콜백이 오지 않을 correlation ID 정리"""
+        pending = self._pending.pop(correlation_id, None) if correlation_id else None
+        if pending is not None and not pending.future.done():
+            pending.future.cancel()
+
+    def deliver(self, correlation_id: str, body: bytes) -> bool:
+        pending = self._pending.get(correlation_id)
+        if pending is None:
+            self.unmatched += 1
+            return False
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {"data": body.decode("utf-8", "replace")}
+        pending.events.append(payload)
+        self.delivered += 1
+        if not pending.future.done() and _status_of(payload) not in _PENDING_STATUSES:
+            pending.future.set_result(payload)
+        return True
+
+    def _describe(self, correlation_id: str, pending: _Pending) -> Dict[str, Any]:
+        done = pending.future.done() and not pending.future.cancelled()
+        result = {
+            "correlationId": correlation_id,
+            "kind": pending.kind,
+            "status": "completed" if done else "pending",
+            "elapsed": round(time.monotonic() - pending.created, 3),
+            "events": len(pending.events),
+        }
+        if done:
+            result["payload"] = pending.future.result()
+        elif pending.events:
+            result["lastEvent"] = pending.events[-1]
+        return result
+
+    async def wait(
+        self,
+        correlation_ids: List[str],
+        api_key: str,
+        timeout: float,
+        return_when: str = "all",
+    ) -> Dict[str, Any]:
+        """
+        콜백 future를 timeout까지 기다림 (return_when="any"면 하나만 끝나도 반환).
+        시간 안에 안 온 항목은 pending으로 반환하며 이후 다시 기다릴 수 있다.
+        """
+        entries: Dict[str, _Pending] = {}
+        unknown = []
+        for cid in correlation_ids:
+            pending = self._pending.get(cid)
+            # 다른 API 키로 등록된 ID는 없는 것으로 취급
+            if pending is None or pending.owner != make_cache_key(
+                api_key, pending.kind
+            ):
+                unknown.append(cid)
+            else:
+                entries[cid] = pending
+
+        waiting = [p.future for p in entries.values() if not p.future.done()]
+        if waiting and timeout > 0:
+            await asyncio.wait(
+                [asyncio.shield(f) for f in waiting],
+                timeout=timeout,
+                return_when=(
+                    asyncio.FIRST_COMPLETED
+                    if return_when == "any"
+                    else asyncio.ALL_COMPLETED
+                ),
+            )
+
+        results = [self._describe(cid, p) for cid, p in entries.items()]
+        return {
+            "completed": sum(1 for r in results if r["status"] == "completed"),
+            "pending": sum(1 for r in results if r["status"] == "pending"),
+            "unknown": unknown,
+            "results": results,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "public_url": self.public_url,
+            "tracked": len(self._pending),
+            "registered": self.registered,
+            "delivered": self.delivered,
+            "unmatched": self.unmatched,
+        }
+
+
+webhooks = WebhookRegistry(ttl=float(os.getenv("STORM_WEBHOOK_TTL", "3600")))
+
+
+# ----------------------------------------------------------------------------
+# stdio 모드용 최소 HTTP 수신기 (POST /webhooks/{id}, Content-Length 본문만 지원)
+# ----------------------------------------------------------------------------
+async def _serve_webhook(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        parts = (await reader.readline()).split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).strip()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get(b"content-length", b"0") or 0)
+        path = parts[1].split(b"?")[0].decode() if len(parts) > 1 else "/"
+        if len(parts) < 2 or parts[0] != b"POST" or not path.startswith("/webhooks/"):
+            status = b"404 Not Found"
+        elif length > MAX_WEBHOOK_BODY:
+            status = b"413 Payload Too Large"
+        else:
+            body = await reader.readexactly(length) if length else b""
+            delivered = webhooks.deliver(path[len("/webhooks/") :], body)
+            status = b"202 Accepted" if delivered else b"404 Not Found"
+        writer.write(
+            b"HTTP/1.1 "
+            + status
+            + b"\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+        )
+        await writer.drain()
+    except (ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_webhook_server(port: int, host: str = None):
+    host = host or os.getenv("STORM_WEBHOOK_HOST", "127.0.0.1")
+    server = await asyncio.start_server(_serve_webhook, host, port)
+    webhooks.configure(os.getenv("STORM_WEBHOOK_PUBLIC_URL") or f"http://{host}:{port}")
+    return server
@@ -0,0 +1,249 @@
+"""
+HTTP(SSE) 전송 모드
+
+  python -m storm_mcp_server.main --transport sse --port 8000 [--workers 4]
+
+  GET  /sse                 : MCP 세션 연결 (세션마다 독립된 ServerSession)
+  POST /messages/?session_id: 클라이언트 → 서버 메시지
+  GET  /healthz, /metrics   : 상태 확인, Prometheus 텍스트 (STORM_METRICS=0이면 404)
+  POST /webhooks/{id}       : Storm 웹훅 콜백 수신 (wait_for_completion)
+
+세션 API 키는 SSE 연결 요청의 `storm-api-key` 헤더(없으면 STORM_API_KEY)로 정한다.
+루프백이 아닌 주소에 바인드하면 헤더 없는 세션은 401로 거절한다. 누구나 운영자의
+STORM_API_KEY를 쓰게 하려면 --allow-env-key(STORM_MCP_ALLOW_ENV_KEY=1)로 명시한다.
+HTTP 커넥션 풀, 캐시, singleflight, 서킷 브레이커는 워커 프로세스 안에서 모든 세션이 공유한다.
+"""
+
+import ipaddress
+import multiprocessing
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import anyio
+import uvicorn
+from mcp.server import Server
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+from storm_mcp_server.core.internal_api import (
+    close_http_client,
+    reset_session_api_key,
+    use_session_api_key,
+)
+from storm_mcp_server.core.metrics import metrics
+from storm_mcp_server.core.webhooks import MAX_WEBHOOK_BODY, webhooks
+
+metrics.describe("storm_http_sessions", "Open MCP SSE sessions")
+
+
+def _session_writers(transport: SseServerTransport) -> Dict[Any, Any]:
+    """
+    세션 ID -> 메시지 writer 표. mcp 1.3.0의 SseServerTransport는 이 표를 공개 API 없이
+    _read_stream_writers로만 갖고 있고 세션이 끝나도 항목을 지우지 않는다.
+    내부 구조에 기대는 곳은 여기 하나뿐이며, 속성이 없는 버전에서는 빈 표로 취급한다.
+    """
+    return getattr(transport, "_read_stream_writers", {})
+
+
+class SseEndpoint:
+    """GET /sse ASGI 앱: 연결 하나 = MCP 세션 하나"""
+
+    def __init__(
+        self,
+        mcp_server: Server,
+        transport: SseServerTransport,
+        require_api_key: bool = False,
+    ):
+        self.server = mcp_server
+        self.transport = transport
+        self.require_api_key = require_api_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        headers = dict(scope.get("headers") or [])
+        api_key = headers.get(b"storm-api-key", b"").decode() or None
+        if api_key is None and self.require_api_key:
+            response = PlainTextResponse(
+                "storm-api-key header is required\n", status_code=401
+            )
+            await response(scope, receive, send)
+            return
+        disconnected = anyio.Event()
+
+        async def watch_receive():
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            return message
+
+        async def cancel_on_disconnect(cancel_scope: anyio.CancelScope) -> None:
+            await disconnected.wait()
+            cancel_scope.cancel()
+
+        # 세션 태스크에서 만든 하위 태스크(요청 핸들러)는 이 컨텍스트를 물려받는다
+        token = use_session_api_key(api_key)
+        if metrics.enabled:
+            metrics.gauge_add("storm_http_sessions", (), 1)
+        try:
+            async with self.transport.connect_sse(scope, watch_receive, send) as (
+                read_stream,
+                write_stream,
+            ):
+                # mcp 1.3.0은 클라이언트가 끊겨도 server.run이 끝나지 않으므로 직접 취소
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(cancel_on_disconnect, tg.cancel_scope)
+                    await self.server.run(
+                        read_stream,
+                        write_stream,
+                        self.server.create_initialization_options(),
+                    )
+                    tg.cancel_scope.cancel()
+                await read_stream.aclose()
+                await write_stream.aclose()
+        finally:
+            self._forget_closed_sessions()
+            if metrics.enabled:
+                metrics.gauge_add("storm_http_sessions", (), -1)
+            reset_session_api_key(token)
+
+    def _forget_closed_sessions(self) -> None:
+        # 끝난 세션의 writer가 남아 있으면 메모리가 계속 늘어나므로 정리 (이후 POST는 404)
+        writers = _session_writers(self.transport)
+        for session_id, writer in list(writers.items()):
+            if writer.statistics().open_receive_streams == 0:
+                writers.pop(session_id, None)
+
+
+async def _healthz(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("ok\n")
+
+
+async def _metrics(request: Request) -> PlainTextResponse:
+    if not metrics.enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(
+        metrics.prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+async def _webhook(request: Request) -> PlainTextResponse:
+    too_large = PlainTextResponse("payload too large\n", status_code=413)
+    try:
+        if int(request.headers.get("content-length") or 0) > MAX_WEBHOOK_BODY:
+            return too_large
+    except ValueError:
+        return PlainTextResponse("invalid content-length\n", status_code=400)
+    # Content-Length 없이(chunked) 오는 본문도 MAX_WEBHOOK_BODY까지만 읽음
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_WEBHOOK_BODY:
+            return too_large
+    body = bytes(body)
+    if not webhooks.deliver(request.path_params["correlation_id"], body):
+        return PlainTextResponse("unknown correlation id\n", status_code=404)
+    return PlainTextResponse("accepted\n", status_code=202)
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette):
+    yield
+    await close_http_client()
+
+
+def create_app(
+    mcp_server: Server = None, public_url: str = None, require_api_key: bool = False
+) -> Starlette:
+    if mcp_server is None:
+        from storm_mcp_server.main import server as mcp_server
+    if public_url:
+        webhooks.configure(public_url)
+
+    transport = SseServerTransport("/messages/")
+    routes: List = [
+        Route(
+            "/sse",
+            endpoint=SseEndpoint(mcp_server, transport, require_api_key),
+            methods=["GET"],
+        ),
+        Mount("/messages/", app=transport.handle_post_message),
+        Route("/healthz", endpoint=_healthz),
+        Route("/metrics", endpoint=_metrics),
+        Route("/webhooks/{correlation_id}", endpoint=_webhook, methods=["POST"]),
+    ]
+    return Starlette(routes=routes, lifespan=_lifespan)
+
+
+# ----------------------------------------------------------------------------
+# 실행
+#   - STORM_MCP_HOST     : 바인드 주소 (기본 127.0.0.1)
+#   - STORM_MCP_PORT     : 포트 (기본 8000)
+#   - STORM_MCP_WORKERS  : 워커 프로세스 수 (기본 1)
+#   - STORM_MCP_ALLOW_ENV_KEY : 1이면 루프백이 아닌 주소에서도 헤더 없는 세션에
+#                               STORM_API_KEY를 사용 (기본 0, 거절)
+# SSE 세션은 GET /sse를 받은 워커의 메모리에만 있어서, 한 포트를 여러 워커가 나눠 받으면
+# POST /messages/가 다른 워커로 갈 수 있다. 그래서 워커 i는 PORT+i에 따로 바인드하고,
+# 앞단 로드밸런서는 연결을 포트 단위로 분배(세션 고정)해야 한다.
+# ----------------------------------------------------------------------------
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _serve(
+    host: str, port: int, mcp_server: Server = None, allow_env_key: bool = False
+) -> None:
+    # 웹훅 콜백은 등록한 워커로 와야 하므로 STORM_WEBHOOK_PUBLIC_URL의 {port}는 워커 포트로 치환
+    public_url = os.getenv("STORM_WEBHOOK_PUBLIC_URL", f"http://{host}:{port}")
+    uvicorn.run(
+        create_app(
+            mcp_server,
+            public_url=public_url.replace("{port}", str(port)),
+            require_api_key=not (allow_env_key or is_loopback(host)),
+        ),
+        host=host,
+        port=port,
+        log_level=os.getenv("STORM_MCP_LOG_LEVEL", "info"),
+    )
+
+
+def run_http(
+    host: str,
+    port: int,
+    workers: int = 1,
+    mcp_server: Server = None,
+    allow_env_key: bool = False,
+) -> None:
+    if workers <= 1:
+        _serve(host, port, mcp_server, allow_env_key)
+        return
+
+    # spawn: 워커마다 새 인터프리터에서 서버/풀/캐시를 만든다
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_serve, args=(host, port + i, None, allow_env_key), daemon=True
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=5)
@@ -1,12 +1,49 @@
+import argparse
 import asyncio
-from mcp.server.stdio import stdio_server
-from mcp.server import Server
+import os
+import sys
+from typing import Any, Dict, List
 
-from storm_mcp_server.tools.tool_handlers import handle_list_tools, handle_call_tool
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource, TextContent, Tool
 
 # MCP 서버 인스턴스 생성
 server = Server("storm-platform")
 
+
+# --------------------------------------------------------------------------
+# 툴/리소스 핸들러 모듈(캐시, 업로드, HTTP 클라이언트 등)은 처음 사용할 때 import.
+# initialize 응답은 mcp 패키지만으로 처리되므로 콜드 스타트가 짧아진다.
+# --------------------------------------------------------------------------
+def _tool_handlers():
+    from storm_mcp_server.tools import tool_handlers
+
+    return tool_handlers
+
+
+def _resource_handlers():
+    from storm_mcp_server.tools import resource_handlers
+
+    return resource_handlers
+
+
+async def handle_list_tools() -> List[Tool]:
+    return await _tool_handlers().handle_list_tools()
+
+
+async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    return await _tool_handlers().handle_call_tool(name, arguments)
+
+
+async def handle_list_resources() -> List[Resource]:
+    return await _resource_handlers().handle_list_resources()
+
+
+async def handle_read_resource(uri) -> List[ReadResourceContents]:
+    return await _resource_handlers().handle_read_resource(uri)
+
+
 # --------------------------------------------------------------------------
 # 1) MCP 쪽에서 'tools/list' 이벤트가 들어오면
 #    handle_list_tools 함수를 호출하도록 등록
@@ -19,15 +56,85 @@ server.list_tools()(handle_list_tools)
 # --------------------------------------------------------------------------
 server.call_tool()(handle_call_tool)
 
+# --------------------------------------------------------------------------
+# 3) 운영용 리소스 (캐시 통계 등) 'resources/list', 'resources/read' 등록
+# --------------------------------------------------------------------------
+server.list_resources()(handle_list_resources)
+server.read_resource()(handle_read_resource)
+
 
 async def main():
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream, write_stream, server.create_initialization_options()
-        )
+    from mcp.server.stdio import stdio_server
+
+    # Prometheus 스크레이프 엔드포인트 (옵션)
+    metrics_port = os.getenv("STORM_METRICS_PORT")
+    if metrics_port:
+        from storm_mcp_server.core.metrics import start_metrics_server
+
+        await start_metrics_server(int(metrics_port))
+
+    # 업로드/답변 완료 콜백 수신기 (옵션, wait_for_completion 툴에서 사용)
+    webhook_port = os.getenv("STORM_WEBHOOK_PORT")
+    if webhook_port:
+        from storm_mcp_server.core.webhooks import start_webhook_server
+
+        await start_webhook_server(int(webhook_port))
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream, write_stream, server.create_initialization_options()
+            )
+    finally:
+        # 공유 HTTP 커넥션 풀 정리 (한 번도 호출하지 않았으면 import하지 않음)
+        internal_api = sys.modules.get("storm_mcp_server.core.internal_api")
+        if internal_api is not None:
+            await internal_api.close_http_client()
+
+
+def _parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """
+    전송 방식 선택 (인자가 없으면 환경 변수, 그것도 없으면 stdio)
+    - STORM_MCP_TRANSPORT : stdio | sse
+    - STORM_MCP_HOST / STORM_MCP_PORT / STORM_MCP_WORKERS : sse 모드 바인드 설정
+    - STORM_MCP_ALLOW_ENV_KEY : 루프백이 아닌 주소에서 헤더 없는 세션에 STORM_API_KEY 허용
+    """
+    parser = argparse.ArgumentParser(description="Storm MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "sse"),
+        default=os.getenv("STORM_MCP_TRANSPORT", "stdio"),
+    )
+    parser.add_argument("--host", default=os.getenv("STORM_MCP_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("STORM_MCP_PORT", "8000"))
+    )
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("STORM_MCP_WORKERS", "1"))
+    )
+    parser.add_argument(
+        "--allow-env-key",
+        action="store_true",
+        default=os.getenv("STORM_MCP_ALLOW_ENV_KEY", "0") == "1",
+        help="sse: let sessions without a storm-api-key header use STORM_API_KEY "
+        "even when bound to a non-loopback address",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = _parse_args()
     print(f"Starting {__name__}")
 
-    asyncio.run(main())
+    if args.transport == "sse":
+        from storm_mcp_server.http_server import run_http
+
+        run_http(
+            args.host,
+            args.port,
+            args.workers,
+            mcp_server=server,
+            allow_env_key=args.allow_env_key,
+        )
+    else:
+        asyncio.run(main())
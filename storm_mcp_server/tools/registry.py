@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.types import Tool
+
+from storm_mcp_server.core.schema import Validator, compile_schema
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class RegisteredTool:
+    tool: Tool
+    validate: Validator
+    handler: ToolHandler
+
+
+class ToolRegistry:
+    """
+    툴 정의(TOOLS_DEFINITION)와 핸들러를 이름으로 묶어두는 레지스트리.
+    - 스키마는 등록 시점(import 시) 검증 함수로 컴파일
+    - tools/list 응답용 Tool 목록은 한 번만 만들어 재사용
+    - tools/call은 dict 조회 한 번으로 핸들러를 찾음
+    """
+
+    def __init__(self, definitions: List[Dict[str, Any]]):
+        self._definitions = {d["name"]: d for d in definitions}
+        self._order = [d["name"] for d in definitions]
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._tool_list: Optional[List[Tool]] = None
+
+    def register(self, name: str) -> Callable[[ToolHandler], ToolHandler]:
+        definition = self._definitions.get(name)
+        if definition is None:
+            raise KeyError(f"Tool '{name}' is not defined in TOOLS_DEFINITION")
+
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            self._tools[name] = RegisteredTool(
+                tool=Tool(
+                    name=name,
+                    description=definition["description"],
+                    inputSchema=definition["inputSchema"],
+                ),
+                validate=compile_schema(definition["inputSchema"]),
+                handler=handler,
+            )
+            self._tool_list = None
+            return handler
+
+        return decorator
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        return self._tools.get(name)
+
+    def list_tools(self) -> List[Tool]:
+        if self._tool_list is None:
+            self._tool_list = [
+                self._tools[name].tool for name in self._order if name in self._tools
+            ]
+        return self._tool_list
+
+    def missing(self) -> List[str]:
+        """정의는 있는데 핸들러가 등록되지 않은 툴"""
+        return [name for name in self._order if name not in self._tools]
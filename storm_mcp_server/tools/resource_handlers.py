@@ -0,0 +1,108 @@
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource
+
+from storm_mcp_server.core.cache import answer_cache, metadata_cache
+from storm_mcp_server.core.internal_api import tenants
+from storm_mcp_server.core.metrics import metrics
+from storm_mcp_server.core.output import output_cursors
+from storm_mcp_server.core.resilience import resilience_stats
+from storm_mcp_server.core.scheduler import scheduler
+from storm_mcp_server.core.upload import upload_stats
+from storm_mcp_server.core.webhooks import webhooks
+from storm_mcp_server.tools.tool_handlers import tool_flights
+
+# uri -> (이름, 설명, MIME 타입, 현재 값을 만드는 함수)
+# 운영자가 MCP 클라이언트에서 서버 상태를 확인할 수 있도록 노출하는 리소스
+# (JSON 리소스는 dict를, 텍스트 리소스는 str을 반환)
+RESOURCES: Dict[str, Tuple[str, str, str, Callable[[], Any]]] = {
+    "cache://storm/metadata": (
+        "metadata-cache",
+        "list_agents / list_buckets 응답 캐시 통계 (hit/miss/eviction)",
+        "application/json",
+        metadata_cache.stats,
+    ),
+    "cache://storm/answers": (
+        "answer-cache",
+        "send_nonstream_chat 답변 캐시 통계 (메모리/디스크 hit, miss)",
+        "application/json",
+        answer_cache.stats,
+    ),
+    "upload://storm/stats": (
+        "upload-stats",
+        "upload_document_by_file 누적 업로드 건수/바이트/소요 시간",
+        "application/json",
+        lambda: dict(upload_stats),
+    ),
+    "resilience://storm/stats": (
+        "resilience-stats",
+        "Storm API endpoint별 재시도/서킷 브레이커 상태/헤지 요청/지연(p50~p99)",
+        "application/json",
+        resilience_stats,
+    ),
+    "tenant://storm/stats": (
+        "tenant-stats",
+        "API 키(테넌트)별 커넥션 풀 현황 (활성 요청 수, 누적 요청, 유휴 시간, LRU 정리 수)",
+        "application/json",
+        tenants.stats,
+    ),
+    "scheduler://storm/stats": (
+        "scheduler-stats",
+        "upstream 스케줄러 우선순위별 대기열 길이/평균 대기 시간/차단 수, endpoint별 토큰 상태",
+        "application/json",
+        scheduler.stats,
+    ),
+    "singleflight://storm/stats": (
+        "singleflight-stats",
+        "동시에 들어온 같은 툴 호출을 합친 횟수 (calls/coalesced/in_flight)",
+        "application/json",
+        tool_flights.stats,
+    ),
+    "output://storm/cursors": (
+        "output-cursors",
+        "잘린 툴 결과 이어받기(output_cursor) 보관 현황 (created/resumed/expired)",
+        "application/json",
+        output_cursors.stats,
+    ),
+    "webhook://storm/stats": (
+        "webhook-stats",
+        "내장 웹훅 수신기 상태 (대기 중인 correlation ID 수, 수신/미매칭 콜백 수)",
+        "application/json",
+        webhooks.stats,
+    ),
+    "metrics://storm": (
+        "metrics",
+        "툴/upstream endpoint별 지연 히스토그램, 단계별 시간, 오류, 페이로드 크기, in-flight",
+        "application/json",
+        metrics.snapshot,
+    ),
+    "metrics://storm/prometheus": (
+        "metrics-prometheus",
+        "metrics://storm 과 같은 값을 Prometheus 텍스트 형식으로",
+        "text/plain",
+        metrics.prometheus,
+    ),
+}
+
+
+async def handle_list_resources() -> List[Resource]:
+    """MCP에서 'resources/list' 이벤트가 오면 운영용 리소스 목록을 반환."""
+    return [
+        Resource(uri=uri, name=name, description=description, mimeType=mime_type)
+        for uri, (name, description, mime_type, _) in RESOURCES.items()
+    ]
+
+
+async def handle_read_resource(uri) -> List[ReadResourceContents]:
+    """MCP에서 'resources/read' 이벤트가 오면 해당 리소스의 현재 값을 반환."""
+    entry = RESOURCES.get(str(uri))
+    if entry is None:
+        raise ValueError(f"Resource '{uri}' not found.")
+
+    _, _, mime_type, render = entry
+    value = render()
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, indent=2)
+    return [ReadResourceContents(content=value, mime_type=mime_type)]
@@ -1,5 +1,36 @@
 # https://sionic-storm-openapi.apidog.io/api-10613460
 
+# 모든 툴 공통 - 결과 크기 줄이기/이어받기 (core/output.py)
+OUTPUT_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": (
+            "목록 항목(또는 답변 객체)에 남길 필드만 지정 (예: ['id', 'name'], 옵션)"
+        ),
+    },
+    "max_sources": {
+        "type": "integer",
+        "description": "답변 출처(sources)를 앞에서 N개만 반환 (옵션)",
+    },
+    "max_output_chars": {
+        "type": "integer",
+        "description": "결과 최대 글자 수, 넘으면 잘라서 output_cursor를 함께 반환 (옵션)",
+    },
+    "output_cursor": {
+        "type": "string",
+        "description": "잘린 이전 결과의 output_cursor - 다른 인자 없이 이어서 받기 (옵션)",
+    },
+}
+
+# 모든 툴 공통 - 호출별 API 키 (없으면 세션 헤더 또는 STORM_API_KEY, core/tenants.py)
+API_KEY_PROPERTIES = {
+    "api_key": {
+        "type": "string",
+        "description": "storm-api-key 헤더로 보낼 API 키 (옵션)",
+    },
+}
+
 TOOLS_DEFINITION = [
     {
         "name": "send_nonstream_chat",
@@ -10,10 +41,6 @@ TOOLS_DEFINITION = [
         "inputSchema": {
             "type": "object",
             "properties": {
-                "api_key": {
-                    "type": "string",
-                    "description": "storm-api-key 헤더로 보낼 API 키",
-                },
                 "question": {"type": "string", "description": "채팅 질문 텍스트"},
                 "bucketIds": {
                     "type": "array",
@@ -28,8 +55,92 @@ TOOLS_DEFINITION = [
                     "type": "string",
                     "description": "결과를 받을 웹훅 URL (옵션)",
                 },
+                "bypassCache": {
+                    "type": "boolean",
+                    "description": "true면 답변 캐시를 건너뛰고 항상 새로 생성 (옵션)",
+                },
+                "use_webhook": {
+                    "type": "boolean",
+                    "description": (
+                        "true면 내장 웹훅 수신기 주소를 webhookUrl로 넣고 correlationId를 "
+                        "반환 - wait_for_completion으로 결과를 기다림 (옵션)"
+                    ),
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
+            },
+            # api_key가 없으면 세션 키 또는 환경변수 STORM_API_KEY를 사용하므로 필수 아님
+            "required": ["question"],
+        },
+    },
+    {
+        "name": "send_stream_chat",
+        "description": (
+            "/api/v2/answer 를 스트리밍(isStreaming)으로 호출하여 질문(question)에 대한 "
+            "답변을 받아옵니다. 생성 중인 답변 조각은 MCP 알림(progress/log)으로 먼저 "
+            "전달되고, 최종 답변과 출처(sources)가 결과로 반환됩니다."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "question": {"type": "string", "description": "채팅 질문 텍스트"},
+                "bucketIds": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "질문 대상 버킷 ID 리스트 (옵션)",
+                },
+                "threadId": {
+                    "type": "string",
+                    "description": "채팅을 전송할 스레드 ID (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
+            },
+            "required": ["question"],
+        },
+    },
+    {
+        "name": "send_chat_batch",
+        "description": (
+            "여러 질문을 한 번에 /api/v2/answer (non-stream)로 보내 답변을 받아옵니다. "
+            "동일한 질문(같은 버킷)은 한 번만 호출하고, 동시성 제한 안에서 병렬로 "
+            "처리하며, 항목별 결과/에러를 입력 순서대로 반환합니다."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "questions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "question": {"type": "string"},
+                            "bucketIds": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                            },
+                        },
+                        "required": ["question"],
+                    },
+                    "description": "질문 목록 (항목별 bucketIds 옵션)",
+                },
+                "bucketIds": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "항목에 bucketIds가 없을 때 사용할 기본 버킷 ID 리스트 (옵션)",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "동시에 보낼 최대 요청 수 (옵션, 기본 8)",
+                },
+                "bypassCache": {
+                    "type": "boolean",
+                    "description": "true면 답변 캐시를 건너뜀 (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
             },
-            "required": ["api_key", "question"],  # 필수: api_key, question
+            "required": ["questions"],
         },
     },
     {
@@ -51,6 +162,12 @@ TOOLS_DEFINITION = [
                     "type": "integer",
                     "description": "페이지 크기 (옵션)",
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "true면 전체 페이지를 병렬로 조회해 한 번에 반환 (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
             },
             "required": [],  # 모두 옵션
         },
@@ -68,13 +185,23 @@ TOOLS_DEFINITION = [
                 "agent_id": {"type": "string", "description": "조회할 에이전트 ID"},
                 "page": {"type": "integer", "description": "페이지 번호 (옵션)"},
                 "size": {"type": "integer", "description": "페이지 크기 (옵션)"},
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "true면 전체 페이지를 병렬로 조회해 한 번에 반환 (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
             },
             "required": ["agent_id"],  # agent_id만 필수
         },
     },
     {
         "name": "upload_document_by_file",
-        "description": "파일을 /api/v2/documents/by-file 엔드포인트에 업로드",
+        "description": (
+            "파일을 /api/v2/documents/by-file 엔드포인트에 업로드. "
+            "bucket_ids로 여러 버킷을 주면 파일을 한 번만 읽어 버킷별로 동시에 "
+            "업로드하고 버킷별 결과를 반환합니다."
+        ),
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -82,6 +209,15 @@ TOOLS_DEFINITION = [
                     "type": "string",
                     "description": "학습된 문서를 저장할 버킷 ID",
                 },
+                "bucket_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "같은 파일을 올릴 버킷 ID 목록 (옵션, bucket_id와 함께 사용 가능)",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "bucket_ids 사용 시 동시 업로드 수 (옵션, 기본 4)",
+                },
                 "file_path": {
                     "type": "string",
                     "description": "업로드할 로컬 파일 경로 (옵션)",
@@ -98,10 +234,127 @@ TOOLS_DEFINITION = [
                     "type": "string",
                     "description": "결과를 받을 웹훅 URL (옵션)",
                 },
+                "use_webhook": {
+                    "type": "boolean",
+                    "description": (
+                        "true면 내장 웹훅 수신기로 처리 완료 콜백을 받고 correlationId를 "
+                        "반환 - wait_for_completion으로 완료를 기다림 (옵션)"
+                    ),
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
+            },
+            # bucket_id/bucket_ids 중 하나, file_path/file_base64 중 하나는 있어야 함 (핸들러에서 검증)
+            "required": [],
+        },
+    },
+    {
+        "name": "upload_documents_by_directory",
+        "description": (
+            "로컬 디렉토리 하위 파일들을 /api/v2/documents/by-file 로 병렬 업로드합니다. "
+            "include/exclude glob으로 대상을 고르고, 업로드 결과를 manifest 파일에 "
+            "기록하여 중단 후 다시 실행하면 이미 올린 파일은 건너뜁니다. "
+            "끝나면 전체 처리량 통계를 반환합니다."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "bucket_id": {
+                    "type": "string",
+                    "description": "학습된 문서를 저장할 버킷 ID",
+                },
+                "directory": {
+                    "type": "string",
+                    "description": "업로드할 로컬 디렉토리 경로",
+                },
+                "include": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "포함할 glob 패턴 목록 (예: ['*.pdf', 'docs/*.md'], 옵션)",
+                },
+                "exclude": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "제외할 glob 패턴 목록 (옵션)",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "동시 업로드 워커 수 (옵션, 기본 4)",
+                },
+                "manifest_path": {
+                    "type": "string",
+                    "description": (
+                        "manifest 파일 경로 "
+                        "(옵션, 기본 <directory>/.storm_upload_manifest.jsonl)"
+                    ),
+                },
+                "webhook_url": {
+                    "type": "string",
+                    "description": "결과를 받을 웹훅 URL (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
+            },
+            "required": ["bucket_id", "directory"],
+        },
+    },
+    {
+        "name": "wait_for_completion",
+        "description": (
+            "use_webhook으로 호출한 업로드/채팅의 웹훅 콜백을 기다립니다. "
+            "timeout 안에 도착한 결과는 completed, 아직 안 온 것은 pending으로 반환하므로 "
+            "다른 작업을 하다가 다시 호출해도 됩니다. (STORM_WEBHOOK_PORT 또는 sse 모드 필요)"
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "correlation_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "기다릴 correlationId 목록",
+                },
+                "timeout": {
+                    "type": "number",
+                    "description": "최대 대기 시간(초) (옵션, 기본 30, 최대 600)",
+                },
+                "return_when": {
+                    "type": "string",
+                    "enum": ["all", "any"],
+                    "description": "all: 모두 완료될 때까지, any: 하나라도 완료되면 반환 (옵션)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
+            },
+            "required": ["correlation_ids"],
+        },
+    },
+    {
+        "name": "wait_for_documents",
+        "description": (
+            "업로드 결과로 받은 여러 문서 ID의 처리 상태를 한 번에 추적합니다. "
+            "아직 처리 중인 문서만 묶어서 조회하고, 먼저 끝난 문서들의 처리 시간을 보고 "
+            "조회 간격을 조절하며, 모두 끝나거나 timeout이 지나면 문서별 상태를 반환합니다."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "document_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "추적할 문서 ID 목록 (업로드 응답의 documentId)",
+                },
+                "timeout": {
+                    "type": "number",
+                    "description": "최대 대기 시간(초) (옵션, 기본 120, 최대 1800)",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "동시에 보낼 상태 조회 수 (옵션, 기본 8)",
+                },
+                **API_KEY_PROPERTIES,
+                **OUTPUT_PROPERTIES,
             },
-            "required": [
-                "bucket_id"
-            ],  # bucket_id는 반드시 필요, file_path 또는 file_base64는 둘 중 하나 이상 있어야 함
+            "required": ["document_ids"],
         },
     },
 ]
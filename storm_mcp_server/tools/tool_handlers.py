@@ -1,200 +1,805 @@
 import asyncio
-import base64
-import json
-from io import BytesIO
-from typing import List, Dict, Any
-from mcp.types import Tool, TextContent
-
-from storm_mcp_server.core.internal_api import call_internal_api, call_chat_api
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import quote
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.types import TextContent, Tool
+
+from storm_mcp_server.core.bulk_upload import (
+    MANIFEST_NAME,
+    BulkUploadStats,
+    UploadManifest,
+    aiter_directory_files,
+    extract_document_id,
+)
+from storm_mcp_server.core.cache import (
+    answer_cache,
+    invalidate_endpoint,
+    make_answer_key,
+    make_cache_key,
+    metadata_cache,
+    normalize_question,
+)
+from storm_mcp_server.core.documents import record_submission, wait_for_documents
+from storm_mcp_server.core.internal_api import (
+    call_chat_api,
+    call_internal_api,
+    call_upload_api,
+    extract_stream_text,
+    get_api_key,
+    reset_session_api_key,
+    stream_chat_api,
+    use_session_api_key,
+)
+from storm_mcp_server.core.metrics import observe_phase, observe_size, track
+from storm_mcp_server.core.output import render, resume
+from storm_mcp_server.core.pagination import (
+    item_count,
+    merge_pages,
+    page_info,
+)
+from storm_mcp_server.core.resilience import reset_tool_policy, use_tool_policy
+from storm_mcp_server.core.scheduler import reset_tool_priority, use_tool_priority
+from storm_mcp_server.core.singleflight import SingleFlight
+from storm_mcp_server.core.upload import (
+    MultipartBody,
+    UploadSource,
+    check_upload_size,
+    hash_file,
+    record_upload,
+    shared_source,
+)
+from storm_mcp_server.core.webhooks import webhooks
+from storm_mcp_server.tools.registry import ToolRegistry
 from storm_mcp_server.tools.tool_definitions import TOOLS_DEFINITION
 
+logger = logging.getLogger(__name__)
+registry = ToolRegistry(TOOLS_DEFINITION)
+
 
 async def handle_list_tools() -> List[Tool]:
     """
     MCP에서 'tools/list' 이벤트가 오면,
-    우리가 보유한 툴(TOOLS_DEFINITION)을 반환.
-    """
-    tool_objects: List[Tool] = []
-    for tdef in TOOLS_DEFINITION:
-        tool_objects.append(
-            Tool(
-                name=tdef["name"],
-                description=tdef["description"],
-                inputSchema=tdef["inputSchema"],
-            )
-        )
-    return tool_objects
+    우리가 보유한 툴(TOOLS_DEFINITION)을 반환 (import 시 한 번 만든 목록 재사용).
+    """
+    return registry.list_tools()
 
 
-async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+async def _get_cached(endpoint: str, params: Dict[str, Any]) -> Any:
+    """GET 목록 호출 - 캐시 (api key, endpoint, params) → 만료 전이면 왕복 없이 반환"""
+    return await metadata_cache.get_or_fetch(
+        make_cache_key(get_api_key(), endpoint, params),
+        lambda: call_internal_api(method="GET", endpoint=endpoint, params=params),
+    )
+
+
+async def _fetch_all_pages(
+    endpoint: str, params: Dict[str, Any], concurrency: int = None
+) -> Any:
     """
-    MCP에서 'tool/call' 이벤트로 특정 툴(name)을 호출하면,
-    여기서 그 이름에 맞게 실제 비즈니스 로직(call_chat_api, call_internal_api 등)을 실행.
+    목록의 전체 페이지를 한 번에 조회해서 하나의 응답으로 병합.
+    - 첫 페이지로 전체 개수/페이지 크기를 파악한 뒤 나머지 페이지는 동시성 제한 병렬 조회
+    - 전체 개수가 응답에 없으면 빈(또는 덜 찬) 페이지가 나올 때까지 순차 조회
+    - progressToken이 있으면 받은 페이지 수를 notifications/progress로 전송
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv("STORM_PAGE_PREFETCH_CONCURRENCY", "4"))
+    max_pages = int(os.getenv("STORM_PAGE_MAX_PAGES", "1000"))
+
+    first = await _get_cached(endpoint, params)
+    info = page_info(first, params.get("size"))
+    # page 0도 유효한 페이지 번호 (0부터 시작하는 API)
+    first_page = params.get("page")
+    if first_page is None:
+        first_page = info["page"] if info["page"] is not None else 1
+    size = info["size"]
+
+    ctx = request_ctx.get(None)
+    progress_token = ctx.meta.progressToken if ctx and ctx.meta else None
+    done = 1
+
+    async def report(total_pages: int = None) -> None:
+        if ctx is not None and progress_token is not None:
+            await ctx.session.send_progress_notification(
+                progress_token, done, total_pages
+            )
 
-    반환값은 List[TextContent] 형태여야 하며, MCP에 문자열 형태로 전달된다.
+    total_pages = info["total_pages"]
+    if total_pages is not None:
+        # 페이지 번호가 0부터 시작하는 응답(page=0)도 지원
+        base = 0 if first_page == 0 else 1
+        last_page = min(base + total_pages - 1, first_page + max_pages - 1)
+        await report(last_page - first_page + 1)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(page: int) -> Any:
+            nonlocal done
+            async with semaphore:
+                payload = await _get_cached(endpoint, {**params, "page": page})
+            done += 1
+            await report(last_page - first_page + 1)
+            return payload
+
+        pages = list(
+            await asyncio.gather(
+                *(fetch(page) for page in range(first_page + 1, last_page + 1))
+            )
+        )
+        # total보다 적게 모였으면 (페이지 수를 적게 추정했거나 그 사이 항목이 늘어남)
+        # 빈 페이지가 나올 때까지 이어서 조회
+        fetched = item_count(first) + sum(item_count(p) for p in pages)
+        page = last_page
+        while (
+            info["total"] is not None and fetched < info["total"] and done < max_pages
+        ):
+            page += 1
+            payload = await _get_cached(endpoint, {**params, "page": page})
+            count = item_count(payload)
+            if not count:
+                break
+            pages.append(payload)
+            fetched += count
+            done += 1
+            await report()
+    else:
+        pages = []
+        page, count = first_page, item_count(first)
+        while count and (size is None or count >= size) and done < max_pages:
+            page += 1
+            payload = await _get_cached(endpoint, {**params, "page": page})
+            count = item_count(payload)
+            if not count:
+                break
+            pages.append(payload)
+            done += 1
+            await report()
+
+    return merge_pages(first, pages)
+
+
+async def _send_chat(
+    question: str,
+    bucket_ids: List[str] = None,
+    thread_id: str = None,
+    webhook_url: str = None,
+    bypass_cache: bool = False,
+) -> Dict[str, Any]:
+    """/api/v2/answer (non-stream) 호출 (답변 캐시 경유)"""
+    # 스레드(대화 맥락)나 웹훅(비동기 전달)이 있으면 캐시 대상에서 제외
+    cache_key = None
+    if answer_cache.enabled and not thread_id and not webhook_url and not bypass_cache:
+        cache_key = make_answer_key(get_api_key(), question, bucket_ids)
+        cached = await answer_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # 실제 호출
+    response_data = await call_chat_api(
+        question=question,
+        bucket_ids=bucket_ids,
+        thread_id=thread_id,
+        webhook_url=webhook_url,
+    )
+    if cache_key is not None:
+        await answer_cache.set(cache_key, response_data)
+    return response_data
+
+
+async def _send_chat_batch(
+    items: List[Dict[str, Any]],
+    default_bucket_ids: List[str] = None,
+    concurrency: int = None,
+    bypass_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    여러 질문을 동시성 제한을 두고 병렬로 호출.
+    - (정규화된 질문, 버킷 집합)이 같은 항목은 한 번만 호출하고 결과를 공유
+    - 결과/에러는 입력 순서대로 반환
     """
+    if concurrency is None:
+        concurrency = int(os.getenv("STORM_BATCH_CONCURRENCY", "8"))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(question: str, bucket_ids: List[str]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await _send_chat(
+                    question=question, bucket_ids=bucket_ids, bypass_cache=bypass_cache
+                )
+                return {"result": result}
+            except Exception as e:
+                # 한 질문이 실패해도 나머지는 계속, 에러는 결과에 담아 반환
+                logger.warning("Batch question failed", exc_info=True)
+                return {"error": str(e)}
+
+    tasks: Dict[tuple, asyncio.Task] = {}
+    entries = []
     try:
-        if name == "send_nonstream_chat":
-            # --------------------------------------------------------
-            # (1) /api/v2/answer (non-stream) - Storm API Key 기반
-            # --------------------------------------------------------
-            question = arguments.get("question", "").strip()
-            bucket_ids = arguments.get("bucketIds", None)
-            thread_id = arguments.get("threadId", None)
-            webhook_url = arguments.get("webhookUrl", None)
-
+        for index, item in enumerate(items):
+            question = (item.get("question") or "").strip()
+            bucket_ids = item.get("bucketIds", default_bucket_ids)
             if not question:
-                raise ValueError("question is required")
-
-            # 실제 호출
-            response_data = await asyncio.to_thread(
-                call_chat_api,
-                question=question,
-                bucket_ids=bucket_ids,
-                thread_id=thread_id,
-                webhook_url=webhook_url,
-            )
-            result_text = json.dumps(response_data, ensure_ascii=False, indent=2)
-            return [TextContent(type="text", text=result_text)]
-
-        elif name == "list_agents":
-            page = arguments.get("page", None)
-            size = arguments.get("size", None)
-
-            params = {}
-            if page is not None:
-                params["page"] = page
-            if size is not None:
-                params["size"] = size
-
-            response_data = await asyncio.to_thread(
-                call_internal_api,
-                method="GET",
-                endpoint="/api/v2/agents",
-                params=params,
-            )
-            result_text = json.dumps(response_data, ensure_ascii=False, indent=2)
-            return [TextContent(type="text", text=result_text)]
-
-        elif name == "list_buckets":
-            # --------------------------------------------------------
-            # (3) /api/v2/buckets (GET) - Storm API Key
-            # --------------------------------------------------------
-            agent_id = arguments.get("agent_id", "").strip()
-            if not agent_id:
-                raise ValueError("agent_id is required")
-
-            page = arguments.get("page", None)
-            size = arguments.get("size", None)
-
-            params = {"agentId": agent_id}
-            if page is not None:
-                params["page"] = page
-            if size is not None:
-                params["size"] = size
-
-            response_data = await asyncio.to_thread(
-                call_internal_api,
-                method="GET",
-                endpoint="/api/v2/buckets",
-                params=params,
-            )
-            result_text = json.dumps(response_data, ensure_ascii=False, indent=2)
-            return [TextContent(type="text", text=result_text)]
-
-        elif name == "upload_document_by_file":
-            # --------------------------------------------------------
-
-            #  /api/v2/documents/by-file (POST)
-
-            #   - file_path (로컬 경로)
-
-            #   - file_base64 (Base64)
-
-            #   - file_name (Base64 시 파일명)
-
-            # --------------------------------------------------------
-
-            bucket_id = arguments.get("bucket_id", "").strip()
-
-            file_path = arguments.get("file_path", "").strip()
-
-            file_base64 = arguments.get("file_base64", None)
-
-            file_name = arguments.get("file_name", None)
-
-            webhook_url = arguments.get("webhook_url", None)
-
-            if not bucket_id:
-                raise ValueError("bucket_id is required")
-
-            # file_path, file_base64 둘 다 없으면 에러
-
-            if not file_path and not file_base64:
-                raise ValueError("Either file_path or file_base64 must be provided")
+                entries.append((index, question, None))
+                continue
+            dedup_key = (normalize_question(question), tuple(sorted(bucket_ids or [])))
+            if dedup_key not in tasks:
+                tasks[dedup_key] = asyncio.ensure_future(run_one(question, bucket_ids))
+            entries.append((index, question, tasks[dedup_key]))
+
+        results = []
+        for index, question, task in entries:
+            outcome = await task if task else {"error": "question is required"}
+            results.append({"index": index, "question": question, **outcome})
+        return results
+    finally:
+        # 취소되거나 중간에 실패하면 남은 호출을 취소하고 끝날 때까지 기다림
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _upload_document(
+    bucket_id: str, source: UploadSource, webhook_url: str = None
+) -> Dict[str, Any]:
+    """
+    /api/v2/documents/by-file 로 스트리밍 multipart 업로드.
+    - 원본 크기와 무관하게 CHUNK_SIZE 단위로만 메모리에 올림
+    - 응답에 uploadStats(바이트/소요 시간/처리량)를 덧붙여 반환
+    """
+    check_upload_size(source.size)
+
+    fields = {"bucketId": bucket_id}
+    if webhook_url:
+        fields["webhookUrl"] = webhook_url
+
+    # MIME 타입은 일단 "application/octet-stream"으로 가정
+    body = MultipartBody(
+        fields=fields,
+        file_name=source.file_name,
+        file_size=source.size,
+        file_chunks=source.chunks(),
+    )
+    started_at = time.perf_counter()
+    response_data = await call_upload_api(
+        endpoint="/api/v2/documents/by-file",
+        content=body,
+        content_type=body.content_type,
+        content_length=body.content_length,
+    )
+
+    # 업로드 성공 → 버킷 목록(문서 수 등) 캐시 무효화
+    invalidate_endpoint(get_api_key(), "/api/v2/buckets")
+    # wait_for_documents가 문서별 처리 시간을 제출 시각부터 재도록
+    record_submission(extract_document_id(response_data))
+
+    stats = record_upload(source.size, started_at)
+    if isinstance(response_data, dict):
+        response_data = {**response_data, "uploadStats": stats}
+    return response_data
+
+
+async def _upload_to_buckets(
+    bucket_ids: List[str],
+    source: UploadSource,
+    webhook_targets: Dict[str, tuple],
+    concurrency: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    같은 파일을 여러 버킷에 동시 업로드.
+    - 원본은 shared_source로 한 번만 읽고/디코딩해서 모든 업로드가 같은 버퍼를 사용
+    - 버킷별 결과/에러를 입력 순서대로 반환 (일부 실패해도 나머지는 계속)
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv("STORM_UPLOAD_FANOUT_CONCURRENCY", "4"))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    check_upload_size(source.size)
+
+    async def run_one(bucket_id: str, shared: UploadSource) -> Dict[str, Any]:
+        correlation_id, webhook_url = webhook_targets.get(bucket_id, (None, None))
+        async with semaphore:
+            try:
+                result = await _upload_document(bucket_id, shared, webhook_url)
+                return {
+                    "bucketId": bucket_id,
+                    "result": _with_correlation(result, correlation_id),
+                }
+            except Exception as e:
+                # 한 버킷이 실패해도 나머지는 계속, 에러는 결과에 담아 반환
+                logger.warning("Upload to bucket %s failed", bucket_id, exc_info=True)
+                # 실패한 버킷의 콜백은 오지 않으므로 등록 해제
+                webhooks.unregister(correlation_id)
+                return {"bucketId": bucket_id, "error": str(e)}
+
+    async with shared_source(source) as shared:
+        return await asyncio.gather(*(run_one(b, shared) for b in bucket_ids))
+
+
+async def _upload_directory(
+    bucket_id: str,
+    directory: str,
+    include: List[str] = None,
+    exclude: List[str] = None,
+    concurrency: int = None,
+    manifest_path: str = None,
+    webhook_url: str = None,
+) -> Dict[str, Any]:
+    """
+    디렉토리 하위 파일을 N개 워커로 병렬 업로드.
+    - 탐색은 지연(lazy) 방식으로 진행하며 큐 크기로 앞서 읽는 양을 제한
+    - manifest(JSON lines)에 결과를 기록하고, 재실행 시 이미 올린 파일은 건너뜀
+    """
+    root = Path(directory).expanduser().resolve()
+    if not root.is_dir():
+        raise NotADirectoryError(f"Not a directory: {directory}")
+
+    if concurrency is None:
+        concurrency = int(os.getenv("STORM_BULK_UPLOAD_CONCURRENCY", "4"))
+    concurrency = max(1, concurrency)
+
+    manifest = UploadManifest(
+        Path(manifest_path).expanduser() if manifest_path else root / MANIFEST_NAME
+    )
+    await asyncio.to_thread(manifest.load)
+    stats = BulkUploadStats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def process(entry: os.DirEntry) -> None:
+        rel_path = Path(entry.path).relative_to(root).as_posix()
+        st = await asyncio.to_thread(entry.stat)
+        record = {"path": rel_path, "size": st.st_size, "mtime": st.st_mtime}
+
+        if manifest.is_uploaded(rel_path, st.st_size, st.st_mtime):
+            stats.skipped += 1
+            return
+        previous_hash = manifest.uploaded_hash(rel_path)
+        if previous_hash:
+            # mtime만 바뀐 경우 (내용 동일) → 재업로드 없이 기록만 갱신
+            digest = await asyncio.to_thread(hash_file, entry.path)
+            if digest == previous_hash:
+                prev = manifest.records[rel_path]
+                await manifest.write({**prev, **record})
+                stats.skipped += 1
+                return
+
+        hasher = hashlib.sha256()
+        try:
+            source = await UploadSource.from_path(entry.path)
+            source.hasher = hasher
+            response_data = await _upload_document(bucket_id, source, webhook_url)
+        except Exception as e:
+            logger.warning("Upload of %s failed", rel_path, exc_info=True)
+            stats.failed += 1
+            stats.failures.append({"path": rel_path, "error": str(e)})
+            await manifest.write({**record, "status": "failed", "error": str(e)})
+            return
+
+        stats.uploaded += 1
+        stats.bytes += st.st_size
+        await manifest.write(
+            {
+                **record,
+                "sha256": hasher.hexdigest(),
+                "documentId": extract_document_id(response_data),
+                "status": "uploaded",
+            }
+        )
 
-            data = {"bucketId": bucket_id}
+    async def worker() -> None:
+        while True:
+            entry = await queue.get()
+            try:
+                if entry is None:
+                    return
+                await process(entry)
+            except Exception as e:
+                # stat/해시 실패 등 (파일이 중간에 삭제된 경우) → 해당 파일만 실패 처리
+                logger.warning("Skipping %s", entry.path, exc_info=True)
+                stats.failed += 1
+                stats.failures.append({"path": entry.path, "error": str(e)})
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        async for entry in aiter_directory_files(root, include, exclude):
+            stats.scanned += 1
+            await queue.put(entry)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+
+    return {"manifest": str(manifest.path), **stats.summary()}
+
+
+async def _collect_stream_answer(
+    question: str, bucket_ids: List[str] = None, thread_id: str = None
+) -> Dict[str, Any]:
+    """
+    스트리밍 답변을 읽으면서 조각(delta)을 MCP 클라이언트에 바로 전달하고,
+    끝나면 최종 답변/출처를 모아서 반환.
+    - progressToken이 있으면 notifications/progress (받은 조각 수)
+    - 조각 텍스트는 notifications/message (logger=storm.send_stream_chat)
+    """
+    ctx = request_ctx.get(None)
+    progress_token = ctx.meta.progressToken if ctx and ctx.meta else None
+
+    chunks: List[str] = []
+    final_answer = None
+    sources = None
+    async for event in stream_chat_api(
+        question=question, bucket_ids=bucket_ids, thread_id=thread_id
+    ):
+        payload = event.get("data") if isinstance(event.get("data"), dict) else event
+        if isinstance(payload.get("answer"), str):
+            # 마지막 이벤트에 전체 답변이 오는 경우 그대로 사용
+            final_answer = payload["answer"]
+        if payload.get("sources"):
+            sources = payload["sources"]
+
+        delta = extract_stream_text(event)
+        if not delta:
+            continue
+        chunks.append(delta)
+        if ctx is None:
+            continue
+        if progress_token is not None:
+            await ctx.session.send_progress_notification(progress_token, len(chunks))
+        await ctx.session.send_log_message(
+            level="info", data={"delta": delta}, logger="storm.send_stream_chat"
+        )
 
-            if webhook_url:
-                data["webhookUrl"] = webhook_url
+    return {
+        "answer": final_answer if final_answer is not None else "".join(chunks),
+        "sources": sources or [],
+    }
 
-            # ---------------------------
 
-            # 1) file_path 있는 경우 → 로컬 파일 열기
+# 부작용이 없는 조회성 툴만 동시 호출 합치기 대상
+# (업로드/스트리밍은 호출마다 독립적으로 실행되어야 함)
+_COALESCE_TOOLS = {
+    "send_nonstream_chat",
+    "send_chat_batch",
+    "list_agents",
+    "list_buckets",
+}
 
-            # ---------------------------
+tool_flights = SingleFlight()
 
-            if file_path:
-                # 로컬 파일 읽어 multipart 전송
 
-                with open(file_path, "rb") as f:
-                    # MIME 타입은 일단 "application/octet-stream"으로 가정
+def _coalesce_key(name: str, arguments: Dict[str, Any]):
+    if name not in _COALESCE_TOOLS:
+        return None
+    # 대화 스레드/웹훅이 있는 채팅은 같은 인자라도 별개의 요청
+    if (
+        arguments.get("threadId")
+        or arguments.get("webhookUrl")
+        or arguments.get("use_webhook")
+    ):
+        return None
+    return make_cache_key(get_api_key(), name, arguments)
 
-                    files = {"file": (file_path, f, "application/octet-stream")}
 
-                    response_data = await asyncio.to_thread(
-                        call_internal_api,
-                        method="POST",
-                        endpoint="/api/v2/documents/by-file",
-                        data=data,
-                        files=files,
-                    )
+async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """
+    동시에 들어온 같은 툴 호출(툴 이름 + 정규화된 인자)은 하나의 실행 결과를 공유.
+    api_key 인자가 있으면 이 호출 동안 세션/환경변수 키 대신 사용 (테넌트별 풀/캐시)
+    """
+    arguments = dict(arguments or {})
+    api_key = (arguments.pop("api_key", None) or "").strip()
+    token = use_session_api_key(api_key) if api_key else None
+    try:
+        key = _coalesce_key(name, arguments)
+        if key is None:
+            return await _call_tool(name, arguments)
+        return await tool_flights.do(key, lambda: _call_tool(name, arguments))
+    finally:
+        if token is not None:
+            reset_session_api_key(token)
 
-            # ---------------------------
 
-            # 2) file_base64 있는 경우 → 메모리에서 BytesIO
+async def _call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """
+    MCP에서 'tool/call' 이벤트로 특정 툴(name)을 호출하면,
+    레지스트리에서 핸들러를 찾아 인자를 검증한 뒤 실제 비즈니스 로직을 실행.
 
-            # ---------------------------
+    반환값은 List[TextContent] 형태여야 하며, MCP에 문자열 형태로 전달된다.
+    (결과가 잘리면 두 번째 TextContent에 이어받기용 output_cursor 안내가 붙음)
+    """
+    # 툴별 재시도/헤지 정책 (STORM_RETRY_ATTEMPTS_<TOOL> 등)과 upstream 우선순위
+    policy_token = use_tool_policy(name)
+    priority_token = use_tool_priority(name)
+    try:
+        entry = registry.get(name)
+        if entry is None:
+            raise ValueError(f"Tool '{name}' not found.")
 
+        # 단계별(인자 검증 / 핸들러 / JSON 인코딩) 소요 시간 계측
+        with track("tool", name) as labels:
+            started = time.perf_counter()
+            if arguments.get("output_cursor"):
+                # 잘린 이전 결과 이어받기 - 핸들러(upstream 호출) 없이 보관본에서
+                parts = resume(name, arguments, get_api_key())
+                validated = handled = started
             else:
-                # file_name이 없으면 기본 이름 "uploaded_file"
-
-                if not file_name:
-                    file_name = "uploaded_file"
-
-                raw_data = base64.b64decode(file_base64)
+                entry.validate(arguments)
+                validated = time.perf_counter()
+                response_data = await entry.handler(arguments)
+                handled = time.perf_counter()
+                parts = render(name, response_data, arguments, get_api_key())
+            if labels is not None:
+                observe_phase("tool", labels, "validate", validated - started)
+                observe_phase("tool", labels, "handler", handled - validated)
+                observe_phase("tool", labels, "encode", time.perf_counter() - handled)
+                observe_size("tool", labels, sum(len(part) for part in parts))
+        return [TextContent(type="text", text=part) for part in parts]
 
-                file_obj = BytesIO(raw_data)
-
-                # 마찬가지로 MIME 타입은 "application/octet-stream" 기본
+    except Exception as e:
+        # 에러 발생 시 MCP 쪽에 오류 메시지를 전달하기 위해 RuntimeError로 래핑
+        raise RuntimeError(f"Tool call error: {str(e)}") from e
+    finally:
+        reset_tool_priority(priority_token)
+        reset_tool_policy(policy_token)
+
+
+# --------------------------------------------------------------------------
+# 툴 핸들러 - 인자 타입/필수 여부는 registry가 inputSchema로 먼저 검증
+# --------------------------------------------------------------------------
+def _webhook_target(kind: str, webhook_url: str, use_webhook: bool):
+    """use_webhook이면 내장 수신기에 correlation ID를 등록하고 그 주소를 webhookUrl로 사용"""
+    if not use_webhook:
+        return None, webhook_url
+    if webhook_url:
+        raise ValueError("Use either a webhook URL or use_webhook, not both")
+    return webhooks.register(kind, get_api_key())
+
+
+def _with_correlation(response_data: Any, correlation_id: str = None) -> Any:
+    if correlation_id is None:
+        return response_data
+    if isinstance(response_data, dict):
+        return {**response_data, "correlationId": correlation_id}
+    return {"correlationId": correlation_id, "data": response_data}
+
+
+@registry.register("send_nonstream_chat")
+async def _tool_send_nonstream_chat(arguments: Dict[str, Any]) -> Any:
+    """/api/v2/answer (non-stream) - Storm API Key 기반"""
+    question = arguments["question"].strip()
+    if not question:
+        raise ValueError("question is required")
+
+    webhook_url = arguments.get("webhookUrl", None)
+    correlation_id, webhook_url = _webhook_target(
+        "send_nonstream_chat", webhook_url, arguments.get("use_webhook", False)
+    )
+    try:
+        response_data = await _send_chat(
+            question=question,
+            bucket_ids=arguments.get("bucketIds", None),
+            thread_id=arguments.get("threadId", None),
+            webhook_url=webhook_url,
+            bypass_cache=arguments.get("bypassCache", False),
+        )
+    except BaseException:
+        webhooks.unregister(correlation_id)
+        raise
+    return _with_correlation(response_data, correlation_id)
+
+
+@registry.register("send_stream_chat")
+async def _tool_send_stream_chat(arguments: Dict[str, Any]) -> Any:
+    """/api/v2/answer (stream) - 조각 단위로 MCP 알림 전송"""
+    question = arguments["question"].strip()
+    if not question:
+        raise ValueError("question is required")
+
+    return await _collect_stream_answer(
+        question=question,
+        bucket_ids=arguments.get("bucketIds", None),
+        thread_id=arguments.get("threadId", None),
+    )
+
+
+@registry.register("send_chat_batch")
+async def _tool_send_chat_batch(arguments: Dict[str, Any]) -> Any:
+    """여러 질문을 한 번에 - 중복 제거 + 동시성 제한 병렬 호출"""
+    questions = arguments["questions"]
+    if not questions:
+        raise ValueError("questions is required")
+
+    results = await _send_chat_batch(
+        items=questions,
+        default_bucket_ids=arguments.get("bucketIds", None),
+        concurrency=arguments.get("concurrency", None),
+        bypass_cache=arguments.get("bypassCache", False),
+    )
+    return {
+        "total": len(results),
+        "succeeded": sum(1 for r in results if "result" in r),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results,
+    }
+
+
+def _page_params(arguments: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    for key in ("page", "size"):
+        if arguments.get(key) is not None:
+            params[key] = arguments[key]
+    return params
+
+
+@registry.register("list_agents")
+async def _tool_list_agents(arguments: Dict[str, Any]) -> Any:
+    """/api/v2/agents (GET)"""
+    params = _page_params(arguments, {})
+    if arguments.get("all_pages", False):
+        return await _fetch_all_pages("/api/v2/agents", params)
+    return await _get_cached("/api/v2/agents", params)
+
+
+@registry.register("list_buckets")
+async def _tool_list_buckets(arguments: Dict[str, Any]) -> Any:
+    """/api/v2/buckets (GET) - Storm API Key"""
+    agent_id = arguments["agent_id"].strip()
+    if not agent_id:
+        raise ValueError("agent_id is required")
+
+    params = _page_params(arguments, {"agentId": agent_id})
+    if arguments.get("all_pages", False):
+        return await _fetch_all_pages("/api/v2/buckets", params)
+    return await _get_cached("/api/v2/buckets", params)
+
+
+@registry.register("upload_document_by_file")
+async def _tool_upload_document_by_file(arguments: Dict[str, Any]) -> Any:
+    """
+    /api/v2/documents/by-file (POST)
+      - file_path (로컬 경로) → 로컬 파일을 조각 단위로 읽어 전송
+      - file_base64 (Base64) → 조각 단위로 디코딩하며 전송
+      - file_name (Base64 시 파일명)
+      - bucket_ids (여러 버킷) → 원본을 한 번만 읽어 버킷별로 동시 업로드
+    """
+    bucket_ids = [
+        b.strip()
+        for b in [arguments.get("bucket_id") or "", *arguments.get("bucket_ids", [])]
+        if b.strip()
+    ]
+    bucket_ids = list(dict.fromkeys(bucket_ids))
+    file_path = (arguments.get("file_path") or "").strip()
+    file_base64 = arguments.get("file_base64", None)
+    file_name = arguments.get("file_name", None)
+    webhook_url = arguments.get("webhook_url", None)
+    use_webhook = arguments.get("use_webhook", False)
+
+    if not bucket_ids:
+        raise ValueError("bucket_id or bucket_ids is required")
+
+    # file_path, file_base64 둘 다 없으면 에러
+    if not file_path and not file_base64:
+        raise ValueError("Either file_path or file_base64 must be provided")
+
+    if file_path:
+        source = await UploadSource.from_path(file_path)
+    else:
+        # file_name이 없으면 기본 이름 "uploaded_file"
+        source = UploadSource.from_base64(file_base64, file_name or "uploaded_file")
+
+    if len(bucket_ids) == 1:
+        correlation_id, webhook_url = _webhook_target(
+            "upload_document_by_file", webhook_url, use_webhook
+        )
+        try:
+            response_data = await _upload_document(bucket_ids[0], source, webhook_url)
+        except BaseException:
+            webhooks.unregister(correlation_id)
+            raise
+        return _with_correlation(response_data, correlation_id)
+
+    # 버킷마다 콜백을 따로 기다릴 수 있도록 correlation ID도 버킷별로 등록
+    webhook_targets = {
+        bucket_id: _webhook_target("upload_document_by_file", webhook_url, use_webhook)
+        for bucket_id in bucket_ids
+    }
+    try:
+        results = await _upload_to_buckets(
+            bucket_ids, source, webhook_targets, arguments.get("concurrency", None)
+        )
+    except BaseException:
+        for correlation_id, _ in webhook_targets.values():
+            webhooks.unregister(correlation_id)
+        raise
+    return {
+        "total": len(results),
+        "succeeded": sum(1 for r in results if "result" in r),
+        "failed": sum(1 for r in results if "error" in r),
+        "bytes": source.size,
+        "results": results,
+    }
+
+
+@registry.register("upload_documents_by_directory")
+async def _tool_upload_documents_by_directory(arguments: Dict[str, Any]) -> Any:
+    """디렉토리 일괄 업로드 (병렬 워커 + 재개 가능한 manifest)"""
+    bucket_id = arguments["bucket_id"].strip()
+    directory = arguments["directory"].strip()
+    if not bucket_id:
+        raise ValueError("bucket_id is required")
+    if not directory:
+        raise ValueError("directory is required")
+
+    return await _upload_directory(
+        bucket_id=bucket_id,
+        directory=directory,
+        include=arguments.get("include", None),
+        exclude=arguments.get("exclude", None),
+        concurrency=arguments.get("concurrency", None),
+        manifest_path=arguments.get("manifest_path", None),
+        webhook_url=arguments.get("webhook_url", None),
+    )
+
+
+@registry.register("wait_for_completion")
+async def _tool_wait_for_completion(arguments: Dict[str, Any]) -> Any:
+    """use_webhook 호출의 콜백 대기 (timeout이 지나면 남은 것은 pending으로 반환)"""
+    correlation_ids = arguments["correlation_ids"]
+    if not correlation_ids:
+        raise ValueError("correlation_ids is required")
+    if not webhooks.enabled:
+        raise RuntimeError(
+            "Webhook listener is disabled (set STORM_WEBHOOK_PORT or use sse mode)"
+        )
 
-                files = {"file": (file_name, file_obj, "application/octet-stream")}
+    timeout = min(max(float(arguments.get("timeout", 30)), 0.0), 600.0)
+    return await webhooks.wait(
+        correlation_ids,
+        get_api_key(),
+        timeout=timeout,
+        return_when=arguments.get("return_when", "all"),
+    )
+
+
+@registry.register("wait_for_documents")
+async def _tool_wait_for_documents(arguments: Dict[str, Any]) -> Any:
+    """문서 처리 상태 일괄 추적 (끝난 문서는 빼고, 처리 시간 기반 조회 간격)"""
+    document_ids = [d.strip() for d in arguments["document_ids"] if d.strip()]
+    if not document_ids:
+        raise ValueError("document_ids is required")
+
+    route = os.getenv("STORM_DOCUMENT_STATUS_ENDPOINT", "/api/v2/documents/{id}")
+
+    async def fetch_status(document_id: str) -> Any:
+        return await call_internal_api(
+            method="GET",
+            endpoint=route.replace("{id}", quote(document_id, safe="")),
+            route=route,
+        )
 
-                response_data = await asyncio.to_thread(
-                    call_internal_api,
-                    method="POST",
-                    endpoint="/api/v2/documents/by-file",
-                    data=data,
-                    files=files,
-                )
+    ctx = request_ctx.get(None)
+    progress_token = ctx.meta.progressToken if ctx and ctx.meta else None
 
-            result_text = json.dumps(response_data, ensure_ascii=False, indent=2)
+    async def report(done: int, total: int) -> None:
+        if progress_token is not None:
+            await ctx.session.send_progress_notification(progress_token, done, total)
 
-            return [TextContent(type="text", text=result_text)]
+    timeout = min(max(float(arguments.get("timeout", 120)), 0.0), 1800.0)
+    return await wait_for_documents(
+        document_ids,
+        fetch_status,
+        timeout=timeout,
+        concurrency=arguments.get("concurrency", None),
+        on_progress=report,
+    )
 
-        else:
-            raise ValueError(f"Tool '{name}' not found.")
 
-    except Exception as e:
-        # 에러 발생 시 MCP 쪽에 오류 메시지를 전달하기 위해 RuntimeError로 래핑
-        raise RuntimeError(f"Tool call error: {str(e)}") from e
+# 정의만 있고 핸들러가 없는 툴은 import 시점에 바로 드러나도록
+if registry.missing():
+    raise RuntimeError(f"Unregistered tools: {registry.missing()}")
@@ -1,23 +1,75 @@
+import json
 import mimetypes
+import os
+import typing
+from typing import Dict, List
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
 from mcp.server import Server
-from mcp.types import Resource, Tool, TextContent
-from typing import List, Dict
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import (
+    ListResourcesRequest,
+    ListResourcesResult,
+    Resource,
+    ServerResult,
+    TextContent,
+    Tool,
+)
 
 from storm_mcp_server.core.file_manager import FileSystemManager
 
+# cursor를 받을 수 없는 mcp(1.3.0 등)에서 resources/list가 한 번에 돌려줄 최대 항목 수.
+# 나머지는 list_directory 툴(cursor 페이지)로 조회한다.
+RESOURCE_LIST_MAX = int(os.getenv("STORM_RESOURCE_LIST_MAX", "1000"))
+
+
+def _cursor_supported() -> bool:
+    """
+    설치된 mcp 모델이 resources/list의 params.cursor를 보존하는지.
+    mcp 1.3.0은 params를 RequestParams로 파싱하면서 cursor를 버리므로, 이때 nextCursor를
+    주면 클라이언트가 같은 첫 페이지를 끝없이 다시 받게 된다.
+    """
+    params_type = ListResourcesRequest.model_fields["params"].annotation
+    return any(
+        "cursor" in getattr(t, "model_fields", {})
+        for t in typing.get_args(params_type) or (params_type,)
+    )
+
 
 class FileServer:
     def __init__(self, base_path):
         self.fs = FileSystemManager(base_path)
         self.server = Server("file-server")
 
+    async def run(self, read_stream, write_stream, initialization_options=None):
+        """파일 서버 실행 (시작하면서 파일 이름 인덱스를 백그라운드로 구축)"""
+        self.fs.start_index_build()
+        await self.server.run(
+            read_stream,
+            write_stream,
+            initialization_options or self.server.create_initialization_options(),
+        )
+
     def setup_handlers(self):
         """MCP 핸들러 설정"""
 
-        @self.server.list_resources()
-        async def list_resources() -> List[Resource]:
-            items = await self.fs.list_directory()
-            return [
+        paginate = _cursor_supported()
+
+        async def list_resources(request: ListResourcesRequest) -> ServerResult:
+            # 데코레이터(list_resources)는 cursor를 넘겨주지 않으므로 요청 핸들러로 직접 등록.
+            recursive = os.getenv("STORM_RESOURCE_LIST_RECURSIVE", "0") == "1"
+            if paginate:
+                page = await self.fs.list_directory_page(
+                    cursor=getattr(request.params, "cursor", None),
+                    recursive=recursive,
+                )
+            else:
+                # cursor를 받을 수 없으면 앞의 RESOURCE_LIST_MAX개만 (nextCursor 없음)
+                page = await self.fs.list_directory_page(
+                    limit=RESOURCE_LIST_MAX, recursive=recursive
+                )
+                page["next_cursor"] = None
+            resources = [
                 Resource(
                     uri=f"file:///{item['path']}",
                     name=item["name"],
@@ -28,14 +80,53 @@ class FileServer:
                     ),
                     description=f"{'Directory' if item['type'] == 'directory' else 'File'}: {item['path']}",
                 )
-                for item in items
+                for item in page["items"]
             ]
+            return ServerResult(
+                ListResourcesResult(resources=resources, nextCursor=page["next_cursor"])
+            )
+
+        self.server.request_handlers[ListResourcesRequest] = list_resources
 
         @self.server.read_resource()
-        async def read_resource(uri: str) -> str:
-            path = uri.replace("file:///", "")
-            content, _ = await self.fs.read_file(path)
-            return content
+        async def read_resource(uri) -> List[ReadResourceContents]:
+            # file:///path?offset=0&length=65536 또는 file:///path?lines=100-200
+            parsed = urlparse(str(uri))
+            path = unquote(parsed.path).lstrip("/")
+            query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+            line_start = line_end = None
+            if "lines" in query:
+                start, _, end = query["lines"].partition("-")
+                line_start = int(start)
+                line_end = int(end) if end else None
+
+            chunk = await self.fs.read_range(
+                path,
+                offset=int(query.get("offset", 0)),
+                length=int(query["length"]) if "length" in query else None,
+                line_start=line_start,
+                line_end=line_end,
+            )
+            contents = [
+                ReadResourceContents(
+                    content=chunk["content"], mime_type=chunk["mime_type"]
+                )
+            ]
+            # 일부만 읽은 경우 이어 읽기 정보를 두 번째 컨텐츠로 첨부
+            if query or chunk["truncated"]:
+                meta = {k: v for k, v in chunk.items() if k != "content"}
+                if chunk["next_offset"] is not None:
+                    meta["next"] = (
+                        f"file:///{quote(path)}?offset={chunk['next_offset']}"
+                    )
+                contents.append(
+                    ReadResourceContents(
+                        content=json.dumps(meta, ensure_ascii=False),
+                        mime_type="application/json",
+                    )
+                )
+            return contents
 
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
@@ -58,6 +149,34 @@ class FileServer:
                         "required": ["path", "fileContent"],
                     },
                 ),
+                Tool(
+                    name="list_directory",
+                    description=(
+                        "디렉토리 목록을 페이지 단위로 조회 (recursive면 하위 트리를 "
+                        "필요한 만큼만 순회). 결과의 next_cursor로 다음 페이지 조회"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "path": {
+                                "type": "string",
+                                "description": "조회할 디렉토리 경로 (옵션, 기본 루트)",
+                            },
+                            "recursive": {
+                                "type": "boolean",
+                                "description": "true면 하위 디렉토리까지 깊이 우선으로 (옵션)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "한 번에 반환할 최대 개수 (옵션, 기본 500)",
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "이전 결과의 next_cursor (옵션)",
+                            },
+                        },
+                    },
+                ),
                 Tool(
                     name="search_files",
                     description="파일 검색",
@@ -67,11 +186,44 @@ class FileServer:
                             "pattern": {
                                 "type": "string",
                                 "description": "검색할 키워드",
-                            }
+                            },
+                            "prefix": {
+                                "type": "boolean",
+                                "description": "true면 이름이 키워드로 시작하는 항목만 (옵션)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "한 번에 반환할 최대 개수 (옵션, 기본 100)",
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "건너뛸 개수 - 다음 페이지 조회용 (옵션)",
+                            },
                         },
                         "required": ["pattern"],
                     },
                 ),
+                Tool(
+                    name="search_content",
+                    description=(
+                        "파일 내용 전문 검색 (BM25 순위, 매치 주변 스니펫 포함). "
+                        "업로드 전에 관련 로컬 문서를 찾을 때 사용"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "검색할 단어/문장",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "반환할 최대 결과 수 (옵션, 기본 10)",
+                            },
+                        },
+                        "required": ["query"],
+                    },
+                ),
             ]
 
         @self.server.call_tool()
@@ -86,14 +238,59 @@ class FileServer:
                     TextContent(type="text", text=f"File uploaded successfully: {path}")
                 ]
 
+            elif name == "list_directory":
+                # 디렉토리 목록 (페이지 단위)
+                page = await self.fs.list_directory_page(
+                    arguments.get("path", ""),
+                    cursor=arguments.get("cursor"),
+                    limit=arguments.get("limit"),
+                    recursive=arguments.get("recursive", False),
+                )
+                text_output = "\n".join(
+                    f"[{item['type']}] {item['path']}"
+                    + (f" ({item['size']} bytes)" if item["size"] is not None else "")
+                    for item in page["items"]
+                )
+                if not text_output:
+                    text_output = "Empty directory"
+                if page["next_cursor"]:
+                    text_output += f"\n... next page: cursor={page['next_cursor']}"
+                return [TextContent(type="text", text=text_output)]
+
             elif name == "search_files":
                 # 파일 검색
                 pattern = arguments["pattern"]
-                results = await self.fs.search_files(pattern)
-                if not results:
+                results = await self.fs.search_files(
+                    pattern,
+                    limit=arguments.get("limit", 100),
+                    offset=arguments.get("offset", 0),
+                    prefix=arguments.get("prefix", False),
+                )
+                items = results["items"]
+                if not items:
                     return [TextContent(type="text", text="No files found")]
 
-                text_output = "\n".join(f"[{r['type']}] {r['path']}" for r in results)
+                text_output = "\n".join(f"[{r['type']}] {r['path']}" for r in items)
+                next_offset = results["offset"] + len(items)
+                if next_offset < results["total"]:
+                    text_output += (
+                        f"\n... {results['total']} matches, "
+                        f"next page: offset={next_offset}"
+                    )
+                return [TextContent(type="text", text=text_output)]
+
+            elif name == "search_content":
+                # 파일 내용 검색
+                query = arguments["query"]
+                results = await self.fs.search_content(
+                    query, limit=arguments.get("limit", 10)
+                )
+                if not results:
+                    return [TextContent(type="text", text="No matching content")]
+
+                text_output = "\n\n".join(
+                    f"[{r['score']}] {r['path']}\n    {r['snippet']}" for r in results
+                )
                 return [TextContent(type="text", text=text_output)]
 
             raise ValueError(f"Unknown tool: {name}")
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from storm_mcp_server.core.cache import AnswerCache, TTLCache
+
+
+def test_ttl_cache_set_with_age_keeps_only_remaining_ttl():
+    cache = TTLCache(ttl=10)
+    cache.set("k", "v", age=9.99)
+    assert cache._lookup("k")[1] == "fresh"
+    cache.set("k", "v", age=10.5)
+    assert cache._lookup("k") == (None, "miss")
+
+
+def test_answer_cache_promotes_disk_hits_with_remaining_ttl(tmp_path):
+    db_path = str(tmp_path / "answers.sqlite")
+    writer = AnswerCache(ttl=10, db_path=db_path)
+    asyncio.run(writer.set("k", {"answer": 1}))
+    # 저장한 지 8초 지난 것으로 만듦
+    writer._connect().execute("UPDATE answers SET stored_at = stored_at - 8")
+    writer._connect().commit()
+
+    reader = AnswerCache(ttl=10, db_path=db_path)
+    assert asyncio.run(reader.get("k")) == {"answer": 1}
+    stored_at, _ = reader.memory._data["k"]
+    assert time.monotonic() - stored_at >= 8
+
+
+def test_answer_cache_purges_expired_rows_on_write(tmp_path):
+    cache = AnswerCache(ttl=10, db_path=str(tmp_path / "answers.sqlite"))
+    for i in range(5):
+        asyncio.run(cache.set(f"old{i}", {"answer": i}))
+    db = cache._connect()
+    db.execute("UPDATE answers SET stored_at = stored_at - 60")
+    db.commit()
+    cache._purged_at = 0.0
+
+    asyncio.run(cache.set("new", {"answer": "x"}))
+
+    rows = db.execute("SELECT key FROM answers").fetchall()
+    assert rows == [("new",)]
+    assert cache.purged == 5
@@ -0,0 +1,33 @@
+import asyncio
+
+from storm_mcp_server.tools import tool_handlers
+
+
+def test_cancelled_batch_cancels_remaining_questions(monkeypatch):
+    started = []
+    cancelled = []
+
+    async def send_chat(question, bucket_ids=None, bypass_cache=False):
+        started.append(question)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(question)
+            raise
+
+    monkeypatch.setattr(tool_handlers, "_send_chat", send_chat)
+
+    async def main():
+        items = [{"question": f"q{i}"} for i in range(3)]
+        batch = asyncio.create_task(tool_handlers._send_chat_batch(items))
+        while len(started) < 3:
+            await asyncio.sleep(0)
+        batch.cancel()
+        try:
+            await batch
+        except asyncio.CancelledError:
+            pass
+        # 남은 질문도 취소되고, batch가 끝나기 전에 정리가 끝남
+        assert sorted(cancelled) == ["q0", "q1", "q2"]
+
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import time
+
+from storm_mcp_server.core.content_index import ContentIndex, _iter_tokens
+
+
+def _check_offsets(data: bytes) -> list:
+    tokens = list(_iter_tokens(data))
+    for token, offset in tokens:
+        raw = data[offset : offset + len(token.encode())]
+        assert raw.decode().lower() == token
+    return [token for token, _ in tokens]
+
+
+def test_iter_tokens_offsets_point_at_tokens():
+    data = "Revenue — “café” 매출 보고서, menu item".encode()
+    assert _check_offsets(data) == [
+        "revenue",
+        "café",
+        "매출",
+        "보고서",
+        "menu",
+        "item",
+    ]
+
+
+def test_iter_tokens_offsets_survive_invalid_utf8():
+    data = "가나".encode() + b"\xff\xfe" + "다라 마".encode() + b"\x80abc"
+    assert _check_offsets(data) == ["가나", "다라", "마", "abc"]
+
+
+def test_iter_tokens_is_linear_on_long_non_ascii_lines():
+    data = ("日本語のテキスト、" * 60000).encode()  # 한 줄 약 1.6MB
+    started = time.perf_counter()
+    count = sum(1 for _ in _iter_tokens(data))
+    assert count == 60000
+    assert time.perf_counter() - started < 5
+
+
+def test_search_finds_non_ascii_tokens(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.txt").write_text("매출 보고서\nquarterly revenue\n")
+    index = ContentIndex(root, db_path=tmp_path / "index.sqlite")
+    index.update()
+    results = index.search("보고서", limit=5)
+    assert [r["path"] for r in results] == ["a.txt"]
+    assert "보고서" in results[0]["snippet"]
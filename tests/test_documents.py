@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from storm_mcp_server.core import documents
+from storm_mcp_server.core.documents import (
+    is_permanent_error,
+    next_interval,
+    submitted_at,
+    wait_for_documents,
+)
+from storm_mcp_server.core.internal_api import StormAPIError
+
+
+def test_next_interval_waits_until_median_processing_time():
+    # 처리 시간 중앙값 10초, 가장 오래된 남은 문서는 제출 후 4초 → 6초 뒤
+    assert next_interval(1.0, [4.0, 2.0], [8.0, 10.0, 30.0], 0.5, 30.0) == 6.0
+
+
+def test_next_interval_clamps_estimate():
+    assert next_interval(1.0, [9.9], [10.0], 0.5, 30.0) == 0.5
+    assert next_interval(1.0, [0.0], [100.0], 0.5, 30.0) == 30.0
+
+
+def test_next_interval_backs_off_when_overdue_or_unknown():
+    assert next_interval(2.0, [12.0], [10.0], 0.5, 30.0) == 3.0
+    assert next_interval(2.0, [1.0], [], 0.5, 30.0) == 3.0
+
+
+def test_submitted_at_reads_iso_and_epoch_timestamps():
+    now = time.monotonic()
+    iso = submitted_at({"data": {"createdAt": "2020-01-01T00:00:00+00:00"}})
+    assert iso < now - 86400
+    epoch_ms = submitted_at({"createdAt": (time.time() - 5) * 1000})
+    assert now - 6 < epoch_ms < now - 4
+    assert submitted_at({"status": "done"}) is None
+
+
+def test_is_permanent_error():
+    assert is_permanent_error(StormAPIError(404, "missing"))
+    assert not is_permanent_error(StormAPIError(429, "slow"))
+    assert not is_permanent_error(StormAPIError(503, "down"))
+    assert not is_permanent_error(OSError("reset"))
+
+
+def test_wait_for_documents_uses_processing_time_per_document(monkeypatch):
+    # a는 5초 전에 제출되어 지금 끝났고, b는 방금 제출됨 → 약 5초 뒤에 다시 조회
+    monkeypatch.setattr(documents, "_submissions", documents.OrderedDict())
+    now = time.monotonic()
+    documents._submissions["a"] = now - 5
+    documents._submissions["b"] = now
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    async def fetch(doc_id):
+        if doc_id == "a" or sleeps:
+            return {"status": "completed"}
+        return {"status": "processing"}
+
+    monkeypatch.setattr(documents.asyncio, "sleep", fake_sleep)
+    result = asyncio.run(
+        wait_for_documents(["a", "b"], fetch, timeout=60, min_interval=0.1)
+    )
+
+    assert result["ready"] == 2
+    assert sleeps == [pytest.approx(5.0, abs=0.5)]
@@ -0,0 +1,51 @@
+import asyncio
+
+from storm_mcp_server.core.file_manager import FileSystemManager, encode_list_cursor
+
+
+def _tree(tmp_path):
+    base = tmp_path / "base"
+    (base / "a" / "b").mkdir(parents=True)
+    (base / "real").mkdir()
+    for i in range(3):
+        (base / "a" / f"f{i}.txt").write_text("x")
+        (base / "real" / f"r{i}.txt").write_text("y")
+    (base / "a" / "link").symlink_to(base / "real")
+    return base
+
+
+def test_startup_build_runs_once_and_searches_wait_for_it(tmp_path, monkeypatch):
+    fs = FileSystemManager(_tree(tmp_path))
+    builds = []
+    original = fs.index.build
+
+    def counting_build():
+        builds.append(1)
+        original()
+
+    monkeypatch.setattr(fs.index, "build", counting_build)
+
+    async def main():
+        task = fs.start_index_build()
+        assert fs.start_index_build() is task
+        result = await fs.search_files("f1")
+        await task
+        return result
+
+    result = asyncio.run(main())
+    assert [item["path"] for item in result["items"]] == ["a/f1.txt"]
+    assert builds == [1]
+
+
+def test_search_builds_lazily_without_startup_build(tmp_path):
+    fs = FileSystemManager(_tree(tmp_path))
+    result = asyncio.run(fs.search_files("r2", prefix=True))
+    assert [item["path"] for item in result["items"]] == ["real/r2.txt"]
+
+
+def test_cursor_on_symlink_resumes_after_it(tmp_path):
+    fs = FileSystemManager(_tree(tmp_path))
+    page = asyncio.run(
+        fs.list_directory_page(cursor=encode_list_cursor("a/link"), recursive=True)
+    )
+    assert [item["path"] for item in page["items"]][:2] == ["real", "real/r0.txt"]
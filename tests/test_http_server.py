@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+import pytest
+
+from storm_mcp_server.http_server import create_app, is_loopback
+
+
+@pytest.mark.parametrize(
+    "host, expected",
+    [
+        ("127.0.0.1", True),
+        ("::1", True),
+        ("localhost", True),
+        ("0.0.0.0", False),
+        ("10.0.0.5", False),
+        ("example.com", False),
+    ],
+)
+def test_is_loopback(host, expected):
+    assert is_loopback(host) is expected
+
+
+def test_sse_rejects_sessions_without_api_key_when_required():
+    app = create_app(require_api_key=True)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get("/sse")
+
+    response = asyncio.run(main())
+    assert response.status_code == 401
@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+import pytest
+
+from storm_mcp_server.core import internal_api, resilience
+from storm_mcp_server.core.internal_api import StormAPIError, stream_chat_api
+from storm_mcp_server.core.scheduler import scheduler
+from storm_mcp_server.core.tenants import TenantPool
+
+
+def _pool(handler) -> TenantPool:
+    return TenantPool(lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+@pytest.fixture(autouse=True)
+def _reset_scheduler():
+    yield
+    # 다른 테스트가 Retry-After만큼 기다리거나 열린 서킷을 만나지 않도록
+    scheduler._buckets.clear()
+    resilience._endpoints.clear()
+
+
+def test_stream_429_defers_the_answer_endpoint(monkeypatch):
+    def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "2"}, text="slow down")
+
+    monkeypatch.setattr(internal_api, "tenants", _pool(handler))
+
+    async def main():
+        with pytest.raises(StormAPIError):
+            async for _ in stream_chat_api("hello"):
+                pass
+
+    asyncio.run(main())
+    endpoint = scheduler.stats()["endpoints"]["POST /api/v2/answer"]
+    assert endpoint["blocked_for"] > 1
+
+
+@pytest.mark.parametrize(
+    "error, expected_calls",
+    [
+        (httpx.ReadTimeout("generation too slow"), 1),
+        (httpx.ConnectError("refused"), 3),
+    ],
+)
+def test_answer_post_retries_only_when_request_never_arrived(
+    monkeypatch, error, expected_calls
+):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise error
+
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(internal_api, "tenants", _pool(handler))
+    monkeypatch.setattr("storm_mcp_server.core.resilience.asyncio.sleep", no_sleep)
+    with pytest.raises(type(error)):
+        asyncio.run(internal_api.call_chat_api("hello"))
+    assert len(calls) == expected_calls
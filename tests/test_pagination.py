@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from storm_mcp_server.core.pagination import merge_pages, page_info
+from storm_mcp_server.tools import tool_handlers
+
+
+def _fake_api(total: int, base: int, size: int = 10):
+    """page 번호가 base(0 또는 1)부터 시작하는 목록 API"""
+    calls = []
+
+    async def get(endpoint, params):
+        page = params.get("page", base)
+        calls.append(page)
+        start = (page - base) * size
+        items = list(range(start, min(start + size, total)))
+        return {"data": {"items": items, "page": page, "size": size, "total": total}}
+
+    return get, calls
+
+
+@pytest.mark.parametrize("base", [0, 1])
+def test_fetch_all_pages_merges_every_page(monkeypatch, base):
+    get, calls = _fake_api(total=25, base=base)
+    monkeypatch.setattr(tool_handlers, "_get_cached", get)
+
+    merged = asyncio.run(tool_handlers._fetch_all_pages("/api/v2/agents", {}))
+
+    assert merged["data"]["items"] == list(range(25))
+    assert merged["data"]["total"] == 25
+    assert sorted(calls) == [base, base + 1, base + 2]
+
+
+def test_fetch_all_pages_starts_from_requested_page_zero(monkeypatch):
+    get, calls = _fake_api(total=25, base=0)
+    monkeypatch.setattr(tool_handlers, "_get_cached", get)
+
+    merged = asyncio.run(
+        tool_handlers._fetch_all_pages("/api/v2/agents", {"page": 0, "size": 10})
+    )
+
+    assert merged["data"]["items"] == list(range(25))
+    assert sorted(calls) == [0, 1, 2]
+
+
+def test_page_info_prefers_short_page_when_upstream_caps_size():
+    info = page_info({"items": list(range(20)), "total": 50}, requested_size=100)
+    assert info["size"] == 20
+    assert info["total_pages"] == 3
+
+
+def test_merge_pages_drops_per_page_fields():
+    first = {"data": {"items": [1, 2], "page": 0, "size": 2, "total": 3}}
+    merged = merge_pages(first, [{"data": {"items": [3], "page": 1}}])
+    assert merged == {"data": {"items": [1, 2, 3], "total": 3}}
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+
+from storm_mcp_server.core.scheduler import UpstreamScheduler
+from storm_mcp_server.core.tenants import TenantPool
+
+
+def test_queued_bulk_calls_do_not_block_same_tenant_interactive():
+    async def main():
+        scheduler = UpstreamScheduler(concurrency=64)
+        pool = TenantPool(httpx.AsyncClient, concurrency=1)
+        gate = asyncio.Event()
+        order = []
+
+        async def call(name, priority):
+            async with (
+                pool.acquire("key") as tenant,
+                scheduler.slot("POST /api/v2/answer", priority, tenant=tenant),
+            ):
+                order.append(name)
+                await gate.wait()
+
+        first = asyncio.create_task(call("bulk-0", "bulk"))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(call(f"bulk-{i}", "bulk")) for i in (1, 2)]
+        await asyncio.sleep(0)
+        chat = asyncio.create_task(call("chat", "interactive"))
+        await asyncio.sleep(0)
+
+        tenant = pool.get("key")
+        assert order == ["bulk-0"]
+        # 기다리는 요청은 테넌트 슬롯을 잡지 않음
+        assert tenant.running == 1
+        assert tenant.active == 4
+
+        gate.set()
+        await asyncio.gather(first, chat, *queued)
+        await pool.close_all()
+        return order, tenant
+
+    order, tenant = asyncio.run(main())
+    assert order == ["bulk-0", "chat", "bulk-1", "bulk-2"]
+    assert tenant.running == 0